@@ -0,0 +1,130 @@
+# adaptive.py
+# Adaptive question selection with Rasch/Elo-style ratings on a logit scale.
+# Each question has a difficulty b (questions.rating; NULL until first answered, when the prior
+# from its `difficulty` column applies) and each user an ability theta per category
+# (user_ability). P(correct) = 1 / (1 + exp(b - theta)). After a submit, both sides move by
+# k * (result - expected), with k shrinking as they collect answers. That is one indexed row
+# per question and one per user, never a pass over `scores`.
+# Selection aims at questions the user should get right TARGET_P of the time. It walks the
+# expression index on (category, round, rating, rkey) outwards from that target, one rating
+# band at a time, so the cost depends on k, not on the bank size. Unanswered questions share
+# their prior rating, so a band can be large; each band is read from a random rkey onwards
+# (like rounds.pick_ids), otherwise every new user would get the same quiz.
+import math
+import os
+import random
+from array import array
+
+import rounds
+
+ADAPTIVE = os.environ.get("QUIZ_ADAPTIVE", "1") != "0"
+TARGET_P = 0.7      # aim for questions the user answers correctly this often
+JITTER = 0.25       # logits of noise on the target, so equal abilities don't get identical quizzes
+PRIOR_STEP = 0.5    # logits per `difficulty` level before a question has any answers
+K_USER, K_ITEM, K_MIN, K_DECAY = 0.4, 0.3, 0.05, 20.0
+
+# Effective difficulty; the index and every query use this exact expression so SQLite matches them.
+RATING = f"coalesce(rating, (difficulty - 3) * {PRIOR_STEP})"
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS user_ability (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        category TEXT NOT NULL,
+        theta REAL NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (user_id, category)
+    ) WITHOUT ROWID
+    """,
+]
+INDEXES = [
+    "DROP INDEX IF EXISTS idx_questions_rating",  # (category, round, rating, slot): no random order within a band
+    f"CREATE INDEX IF NOT EXISTS idx_questions_rating_key ON questions(category, round, {RATING}, rkey, slot)",
+]
+
+
+def ensure(conn):
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(questions)")}
+    if 'rating' not in cols:
+        conn.execute("ALTER TABLE questions ADD COLUMN rating REAL")
+    if 'rating_n' not in cols:
+        conn.execute("ALTER TABLE questions ADD COLUMN rating_n INTEGER NOT NULL DEFAULT 0")
+    for stmt in INDEXES:
+        conn.execute(stmt)
+
+
+def _k(base, n):
+    return max(K_MIN, base / (1.0 + n / K_DECAY))
+
+
+def ability(conn, user_id, category):
+    # (theta, answers it is based on); a new user starts at 0 (the middle difficulty)
+    row = conn.execute("SELECT theta, n FROM user_ability WHERE user_id=? AND category=?", (user_id, category)).fetchone()
+    return (row[0], row[1]) if row else (0.0, 0)
+
+
+def target(theta):
+    return theta - math.log(TARGET_P / (1.0 - TARGET_P)) + random.uniform(-JITTER, JITTER)
+
+
+def _band(conn, category, round_number, rating):
+    # (id, slot) of every question at exactly this rating, from a random rkey round to the start
+    start = random.getrandbits(63)
+    for cond in ("rkey >= ?", "rkey < ?"):
+        yield from conn.execute(f"SELECT id, slot FROM questions WHERE category=? AND round=? AND {RATING} = ? "
+                                f"AND {cond} ORDER BY rkey", (category, round_number, rating, start))
+
+
+def pick_ids(conn, category, round_number, k, user_id):
+    # Up to k unseen ids from the round, closest to the user's target difficulty first.
+    # Returns (ids, exhausted) like rounds.pick_ids.
+    theta, _ = ability(conn, user_id, category)
+    goal = target(theta)
+    bits = rounds.load_bits(conn, user_id, category)
+    sql = f"SELECT DISTINCT {RATING} FROM questions WHERE category=? AND round=? AND {RATING} {{}} ? ORDER BY {RATING} {{}}"
+    up = conn.execute(sql.format(">=", "ASC"), (category, round_number, goal))
+    down = conn.execute(sql.format("<", "DESC"), (category, round_number, goal))
+    fresh, stale = [], []
+    try:
+        a, b = up.fetchone(), down.fetchone()
+        while (a or b) and len(fresh) < k:
+            # take whichever band is nearer the goal
+            if b is None or (a is not None and a[0] - goal <= goal - b[0]):
+                (rating,), a = a, up.fetchone()
+            else:
+                (rating,), b = b, down.fetchone()
+            for qid, slot in _band(conn, category, round_number, rating):
+                if slot is not None and rounds.is_seen(bits, slot):
+                    if len(stale) < k: stale.append(qid)
+                else:
+                    fresh.append(qid)
+                    if len(fresh) == k: break
+    finally:
+        up.close(); down.close()
+    if len(fresh) == k:
+        return fresh, False
+    return fresh + stale[:k - len(fresh)], True
+
+
+def update(conn, user_id, category, results):
+    # results: [(question_id, correct bool)] from one submitted quiz. Returns the new theta.
+    if not results:
+        return ability(conn, user_id, category)[0]
+    ids = [qid for qid, _ in results]
+    got = {r[0]: r[1:] for r in conn.execute(
+        f"SELECT id, {RATING}, rating_n FROM questions WHERE id IN ({','.join('?' * len(ids))})", ids)}
+    results = [(qid, ok) for qid, ok in results if qid in got]
+    theta, n_user = ability(conn, user_id, category)
+    b = array('d', (got[qid][0] for qid, _ in results))
+    n_item = array('l', (got[qid][1] for qid, _ in results))
+    resid = array('d', (float(ok) - 1.0 / (1.0 + math.exp(bj - theta)) for (_, ok), bj in zip(results, b)))
+    # all answers in the quiz are scored against the same pre-quiz estimates
+    k_user = _k(K_USER, n_user)
+    theta += k_user * sum(resid)
+    conn.executemany("UPDATE questions SET rating=?, rating_n=rating_n+1 WHERE id=?",
+                     [(b[j] - _k(K_ITEM, n_item[j]) * resid[j], qid) for j, (qid, _) in enumerate(results)])
+    conn.execute("INSERT OR REPLACE INTO user_ability (user_id, category, theta, n) VALUES (?,?,?,?)",
+                 (user_id, category, theta, n_user + len(results)))
+    return theta
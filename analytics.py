@@ -0,0 +1,260 @@
+# analytics.py
+# Bulk statistics over the scores table: distributions, percentile ranks, pass rates, trends,
+# plus per-question item statistics from the attempt_answers log.
+# scores is folded into a small histogram table, score_hist(category, total, score, day) -> n,
+# by one GROUP BY over the rows added since the last refresh (tracked by scores.id). Every
+# statistic is then computed from that histogram with NumPy (pure Python if it isn't installed),
+# so a report over tens of millions of attempts only touches new rows plus a few thousand bins.
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+PASS_MARK = 0.6   # fraction correct that counts as a pass
+BINS = 10         # distribution buckets over 0-100%
+TREND_DAYS = 30
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS score_hist (
+        category TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        score INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (category, total, score, day)
+    ) WITHOUT ROWID
+    """,
+    # final answers of submitted attempts, per question
+    """
+    CREATE TABLE IF NOT EXISTS item_hist (
+        question_id INTEGER PRIMARY KEY,
+        answered INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        time_ms INTEGER NOT NULL
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS analytics_state (key TEXT PRIMARY KEY, value INTEGER)",
+]
+
+# Last logged answer per (attempt, question), aggregated per question.
+_FINAL_ANSWERS = """
+    SELECT a.question_id, count(*) AS answered, sum(a.correct) AS correct, sum(a.time_ms) AS time_ms
+    FROM attempt_answers a
+    WHERE {where}
+      AND a.id = (SELECT max(b.id) FROM attempt_answers b
+                  WHERE b.score_id = a.score_id AND b.question_id = a.question_id)
+    GROUP BY a.question_id
+"""
+
+
+def ensure(conn):
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+
+
+def _write_lock(conn):
+    # The high-water mark is read before anything is written; without the write lock two
+    # overlapping refreshes (say `niksha.py report` while the app is open) would both fold in
+    # the same rows. With the sqlite3 module's default transaction handling an open
+    # transaction has already written, so it holds the lock.
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def _high_water(conn):
+    row = conn.execute("SELECT value FROM analytics_state WHERE key='scores_id'").fetchone()
+    return row[0] if row else 0
+
+
+def refresh(conn):
+    # Fold scores rows newer than the high-water mark into score_hist. Returns rows processed.
+    _write_lock(conn)
+    last = _high_water(conn)
+    top = conn.execute("SELECT max(id) FROM scores").fetchone()[0] or 0
+    if top <= last:
+        return 0
+    n = conn.execute("SELECT count(*) FROM scores WHERE id > ? AND id <= ?", (last, top)).fetchone()[0]
+    conn.execute("""
+        INSERT INTO score_hist (category, total, score, day, n)
+        SELECT coalesce(c.name, ''), total, score, date(s.ts, 'unixepoch', 'localtime'), count(*)
+        FROM scores s LEFT JOIN categories c ON c.id = s.category_id
+        WHERE s.id > ? AND s.id <= ? AND total > 0
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT(category, total, score, day) DO UPDATE SET n = n + excluded.n
+    """, (last, top))
+    conn.execute(f"""
+        INSERT INTO item_hist (question_id, answered, correct, time_ms)
+        SELECT * FROM ({_FINAL_ANSWERS.format(where="a.score_id > ? AND a.score_id <= ?")}) WHERE true
+        ON CONFLICT(question_id) DO UPDATE SET answered = answered + excluded.answered,
+            correct = correct + excluded.correct, time_ms = time_ms + excluded.time_ms
+    """, (last, top))
+    conn.execute("INSERT OR REPLACE INTO analytics_state (key, value) VALUES ('scores_id', ?)", (top,))
+    return n
+
+
+def forget_user(conn, user_id):
+    # Call before deleting a user's scores: subtract the rows already folded into score_hist.
+    _write_lock(conn)
+    conn.execute("""
+        WITH gone AS (
+            SELECT coalesce(c.name, '') AS category, total, score, date(s.ts, 'unixepoch', 'localtime') AS day,
+                   count(*) AS n
+            FROM scores s LEFT JOIN categories c ON c.id = s.category_id
+            WHERE s.user_id = ? AND s.id <= ? AND total > 0 GROUP BY 1, 2, 3, 4)
+        UPDATE score_hist SET n = score_hist.n - gone.n FROM gone
+        WHERE score_hist.category = gone.category AND score_hist.total = gone.total
+          AND score_hist.score = gone.score AND score_hist.day = gone.day
+    """, (user_id, _high_water(conn)))
+    conn.execute("DELETE FROM score_hist WHERE n <= 0")
+    conn.execute(f"""
+        WITH gone AS ({_FINAL_ANSWERS.format(where="a.user_id = ? AND a.score_id <= ?")})
+        UPDATE item_hist SET answered = item_hist.answered - gone.answered,
+            correct = item_hist.correct - gone.correct, time_ms = item_hist.time_ms - gone.time_ms
+        FROM gone WHERE item_hist.question_id = gone.question_id
+    """, (user_id, _high_water(conn)))
+    conn.execute("DELETE FROM item_hist WHERE answered <= 0")
+
+
+def rebuild(conn):
+    conn.execute("DELETE FROM score_hist")
+    conn.execute("DELETE FROM item_hist")
+    conn.execute("DELETE FROM analytics_state WHERE key='scores_id'")
+    return refresh(conn)
+
+
+def _load(conn, category=None):
+    where, params = ("WHERE category = ?", (category,)) if category else ("", ())
+    return conn.execute(f"SELECT category, total, score, day, n FROM score_hist {where}", params).fetchall()
+
+
+# --------------------------
+# statistics from histogram bins
+# --------------------------
+def _summarize_np(rows):
+    cats = np.array([r[0] for r in rows])
+    total = np.array([r[1] for r in rows], dtype=np.float64)
+    score = np.array([r[2] for r in rows], dtype=np.float64)
+    days = np.array([r[3] for r in rows])
+    n = np.array([r[4] for r in rows], dtype=np.int64)
+    pct = score / total
+    out = {}
+    for cat in np.unique(cats):
+        m = cats == cat
+        p, w, d = pct[m], n[m], days[m]
+        order = np.argsort(p, kind="stable")
+        p_sorted, cum = p[order], np.cumsum(w[order])
+        count = int(cum[-1])
+        qs = {f"p{q}": float(p_sorted[np.searchsorted(cum, q / 100.0 * count, side="left")]) for q in (25, 50, 75, 90)}
+        hist = np.bincount(np.minimum((p * BINS).astype(np.int64), BINS - 1), weights=w, minlength=BINS)
+        uday, inv = np.unique(d, return_inverse=True)
+        day_n = np.bincount(inv, weights=w)
+        day_mean = np.bincount(inv, weights=w * p) / day_n
+        out[str(cat)] = {
+            "attempts": count,
+            "mean": float((p * w).sum() / count),
+            "pass_rate": float(w[p >= PASS_MARK].sum() / count),
+            **qs,
+            "distribution": [int(x) for x in hist],
+            "trend": [(str(a), int(b), float(c)) for a, b, c in zip(uday[-TREND_DAYS:], day_n[-TREND_DAYS:], day_mean[-TREND_DAYS:])],
+            "_cdf": (p_sorted.tolist(), cum.tolist()),
+        }
+    return out
+
+
+def _summarize_py(rows):
+    by_cat = {}
+    for cat, total, score, day, n in rows:
+        by_cat.setdefault(cat, []).append((score / total, day, n))
+    out = {}
+    for cat, bins in by_cat.items():
+        bins.sort(key=lambda b: b[0])
+        count = sum(b[2] for b in bins)
+        p_sorted, cum, acc = [], [], 0
+        for p, _, n in bins:
+            acc += n; p_sorted.append(p); cum.append(acc)
+        def quantile(q):
+            target = q / 100.0 * count
+            for p, c in zip(p_sorted, cum):
+                if c >= target: return p
+            return p_sorted[-1]
+        hist = [0] * BINS
+        days = {}
+        for p, day, n in bins:
+            hist[min(int(p * BINS), BINS - 1)] += n
+            dn, dsum = days.get(day, (0, 0.0)); days[day] = (dn + n, dsum + p * n)
+        trend = [(d, dn, dsum / dn) for d, (dn, dsum) in sorted(days.items())][-TREND_DAYS:]
+        out[cat] = {
+            "attempts": count,
+            "mean": sum(p * n for p, _, n in bins) / count,
+            "pass_rate": sum(n for p, _, n in bins if p >= PASS_MARK) / count,
+            **{f"p{q}": quantile(q) for q in (25, 50, 75, 90)},
+            "distribution": hist,
+            "trend": trend,
+            "_cdf": (p_sorted, cum),
+        }
+    return out
+
+
+def summarize(conn, category=None):
+    # {category: {attempts, mean, pass_rate, p25..p90, distribution, trend}}; fractions in 0..1
+    rows = _load(conn, category)
+    if not rows:
+        return {}
+    return _summarize_np(rows) if np is not None else _summarize_py(rows)
+
+
+def percentile_rank(stats, pct):
+    # Share of attempts in this category scoring strictly below `pct` (0..1), from summarize().
+    p_sorted, cum = stats["_cdf"]
+    i = bisect_left(p_sorted, pct)
+    return (cum[i - 1] if i else 0) / stats["attempts"] if stats["attempts"] else 0.0
+
+
+def user_ranks(conn, stats, user_id):
+    # [(category, score, total, percentile_rank)] for the user's best attempt in each category of `stats`
+    rows = conn.execute("""
+        SELECT c.name, b.score, b.total FROM best_scores b JOIN categories c ON c.id = b.category_id
+        WHERE b.user_id = ? AND b.total > 0 ORDER BY c.name
+    """, (user_id,)).fetchall()
+    return [(cat, score, total, percentile_rank(stats[cat], score / total)) for cat, score, total in rows if cat in stats]
+
+
+def item_stats(conn, category=None, limit=20):
+    # [(question_id, text, category, answered, correct_rate, avg_seconds)], hardest first
+    where, params = ("WHERE q.category = ?", [category]) if category else ("", [])
+    return conn.execute(f"""
+        SELECT h.question_id, q.text, q.category, h.answered,
+               CAST(h.correct AS REAL) / h.answered, h.time_ms / 1000.0 / h.answered
+        FROM item_hist h JOIN questions q ON q.id = h.question_id {where}
+        ORDER BY 5 ASC, h.answered DESC LIMIT ?
+    """, params + [limit]).fetchall()
+
+
+def format_items(items):
+    lines = ["hardest questions (final answers of submitted attempts):"] if items else []
+    for qid, text, cat, answered, rate, secs in items:
+        lines.append(f"  #{qid:<7} {rate:>5.0%} correct  {secs:>6.1f}s avg  {answered:>7} answered  [{cat}] {text[:60]}")
+    return "\n".join(lines)
+
+
+def format_ranks(username, ranks):
+    lines = [f"{username}:"] + [f"  {cat}: best {score}/{total}, better than {rank:.0%} of attempts"
+                                for cat, score, total, rank in ranks]
+    return "\n".join(lines if ranks else [f"{username}: no attempts"])
+
+
+def format_report(stats):
+    lines = []
+    for cat, s in sorted(stats.items()):
+        lines.append(f"{cat or '(none)'}: {s['attempts']} attempts, mean {s['mean']:.0%}, pass rate {s['pass_rate']:.0%} "
+                     f"(pass mark {PASS_MARK:.0%})")
+        lines.append(f"  quartiles: p25 {s['p25']:.0%}  p50 {s['p50']:.0%}  p75 {s['p75']:.0%}  p90 {s['p90']:.0%}")
+        peak = max(s["distribution"]) or 1
+        for i, c in enumerate(s["distribution"]):
+            lines.append(f"  {i * 100 // BINS:>3}-{(i + 1) * 100 // BINS:<3}% {c:>10}  {'#' * round(40 * c / peak)}")
+        if s["trend"]:
+            lines.append("  recent days: " + ", ".join(f"{d} {n}x {m:.0%}" for d, n, m in s["trend"][-7:]))
+    return "\n".join(lines)
@@ -0,0 +1,98 @@
+# attempt_log.py
+# Per-answer attempt log with write-behind batching.
+# Every answer click becomes a row in attempt_answers, but record() only appends to an
+# in-memory buffer; a background thread writes the buffer in one transaction when it reaches
+# max_batch rows or every `interval` seconds. Submit and app exit call flush() directly.
+import threading
+import time
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS attempt_answers (
+        id INTEGER PRIMARY KEY,
+        attempt_key TEXT NOT NULL,
+        score_id INTEGER REFERENCES scores(id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL,
+        question_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        choice INTEGER,
+        correct INTEGER NOT NULL,
+        time_ms INTEGER NOT NULL,
+        answered_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_answers_attempt ON attempt_answers(attempt_key)",
+    # final answer per (attempt, question) = max(id); also serves item statistics
+    "CREATE INDEX IF NOT EXISTS idx_answers_score ON attempt_answers(score_id, question_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_answers_question ON attempt_answers(question_id)",
+    # "clear my attempts" deletes by user
+    "CREATE INDEX IF NOT EXISTS idx_answers_user ON attempt_answers(user_id)",
+]
+
+INSERT = ("INSERT INTO attempt_answers (attempt_key, user_id, question_id, position, choice, correct, time_ms, answered_at) "
+          "VALUES (?,?,?,?,?,?,?,?)")
+
+
+def ensure(conn):
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+
+
+class AnswerLog:
+    def __init__(self, repo, max_batch=200, interval=2.0):
+        self.repo = repo
+        self.max_batch = max_batch
+        self.interval = interval
+        self.buffer = []
+        self.lock = threading.Lock()          # guards buffer
+        self.flush_lock = threading.Lock()    # keeps batches in click order
+        self.wake = threading.Event()
+        self.thread = None
+        self.closed = False
+
+    def record(self, attempt_key, user_id, question_id, position, choice, correct, time_ms):
+        # Cheap enough for the Tk thread: no I/O, just an append.
+        row = (attempt_key, user_id, question_id, position, choice, int(bool(correct)), int(time_ms), time.time())
+        with self.lock:
+            self.buffer.append(row)
+            full = len(self.buffer) >= self.max_batch
+            if self.thread is None and not self.closed:
+                self.thread = threading.Thread(target=self._run, name="answer-log", daemon=True)
+                self.thread.start()
+        if full:
+            self.wake.set()
+
+    def _run(self):
+        while not self.closed:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # rows stay buffered; the next flush retries them
+
+    def flush(self):
+        # Write everything buffered so far in one transaction. Returns rows written.
+        with self.flush_lock:
+            with self.lock:
+                rows, self.buffer = self.buffer, []
+            if not rows:
+                return 0
+            try:
+                self.repo.executemany(INSERT, rows)
+            except Exception:
+                with self.lock:
+                    self.buffer[:0] = rows
+                raise
+            return len(rows)
+
+    def pending(self):
+        with self.lock:
+            return len(self.buffer)
+
+    def close(self):
+        self.closed = True
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        self.flush()
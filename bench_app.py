@@ -0,0 +1,465 @@
+# bench_app.py
+# End-to-end benchmark of niksha.py's entry points on a synthetic database, for catching
+# performance regressions. Every timed step goes through the real frame methods: the job pool,
+# the engine, the database and the callbacks back on the "Tk" thread. Asynchronous steps are
+# timed until the last job they started has called back.
+# By default Tk is replaced by a small widget-free stand-in (see "Headless Tk"), so it runs
+# anywhere and measures the app's own work. --tk uses real Tk widgets instead, which needs a
+# display: xvfb-run python bench_app.py --tk
+# Results go to JSON; --baseline compares against an earlier run and exits 1 on regressions.
+# --db keeps the synthetic database between runs (built on first use); each run works on a
+# copy, so the registrations and submissions it makes don't change the next run's data.
+# Run: python bench_app.py [--users 2000] [--scores 50000] [--questions 500] [--repeat 20]
+#                          [--json out.json] [--baseline base.json] [--threshold 0.2] [--tk]
+#      python bench_app.py --compare base.json new.json
+import argparse
+import heapq
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+import passwords
+
+CATEGORIES = ["Children", "Teenagers", "Adults"]
+AGES = {"Children": 10, "Teenagers": 16, "Adults": 30}
+PASSWORD = "bench-pw"
+
+
+# --------------------------
+# Headless Tk: just the parts of tkinter/ttk the frames use
+# --------------------------
+class Dialogs:
+    # messagebox/simpledialog/filedialog that answer at once: "yes", no text, no file
+    showinfo = showerror = showwarning = staticmethod(lambda *a, **k: "ok")
+    askyesno = askokcancel = staticmethod(lambda *a, **k: True)
+    askstring = asksaveasfilename = askopenfilename = staticmethod(lambda *a, **k: None)
+
+
+class Misc:
+    # One after() queue shared by all widgets, like Tk's; update() runs what is due.
+    _queue = []
+    _ids = itertools.count(1)
+    _cancelled = set()
+    errors = []
+
+    def __init__(self, master=None, *args, **kw):
+        self.master = master
+        self.options = dict(kw)
+        self.states = set()
+
+    def __getattr__(self, name):
+        # pack/grid/bind/title/heading/... : accepted and ignored
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *a, **k: None
+
+    def configure(self, *style, **kw):
+        self.options.update(kw)
+    config = configure
+
+    def cget(self, key):
+        return self.options.get(key)
+
+    def state(self, spec=None):
+        for s in spec or ():
+            if s.startswith("!"): self.states.discard(s[1:])
+            else: self.states.add(s)
+        return tuple(self.states)
+
+    def winfo_width(self): return self.options.get("width", 1)
+    def winfo_height(self): return self.options.get("height", 1)
+    def winfo_viewable(self): return True
+
+    def after(self, ms, fn=None, *args):
+        ident = next(Misc._ids)
+        heapq.heappush(Misc._queue, (time.perf_counter() + ms / 1000, ident, fn, args))
+        return ident
+
+    def after_idle(self, fn, *args):
+        return self.after(0, fn, *args)
+
+    def after_cancel(self, ident):
+        Misc._cancelled.add(ident)
+
+    def update(self):
+        now = time.perf_counter()
+        while Misc._queue and Misc._queue[0][0] <= now:
+            _, ident, fn, args = heapq.heappop(Misc._queue)
+            if ident in Misc._cancelled:
+                Misc._cancelled.discard(ident); continue
+            try:
+                fn(*args)
+            except Exception as e:
+                self.report_callback_exception(type(e), e, e.__traceback__)
+    update_idletasks = update
+
+    def report_callback_exception(self, exc, val, tb):
+        traceback.print_exception(exc, val, tb)
+        Misc.errors.append(val)
+
+
+class Tk(Misc):
+    def __init__(self, *args, **kw):
+        super().__init__(None)
+
+
+class Variable:
+    def __init__(self, master=None, value=None):
+        self.value = value
+    def get(self): return self.value
+    def set(self, value): self.value = value
+
+
+class Entry(Misc):
+    def __init__(self, master=None, **kw):
+        super().__init__(master, **kw)
+        self.text = ""
+    def get(self):
+        var = self.options.get("textvariable")
+        return str(var.get()) if var is not None else self.text
+    def insert(self, index, s):
+        i = len(self.text) if index == "end" else int(index)
+        self.text = self.text[:i] + s + self.text[i:]
+    def delete(self, first, last=None):
+        last = len(self.text) if last in ("end", None) else int(last)
+        self.text = self.text[:int(first)] + self.text[last:]
+
+
+class Treeview(Misc):
+    # Keeps the rows in order, so the scoreboard's diffing does its real work.
+    def __init__(self, master=None, **kw):
+        super().__init__(master, **kw)
+        self.order = []
+        self.rows = {}
+        self.top = 0.0
+    def get_children(self, item=""): return tuple(self.order)
+    def exists(self, iid): return iid in self.rows
+    def insert(self, parent, index, iid=None, values=(), **kw):
+        iid = iid or f"I{next(Misc._ids)}"
+        self.order.insert(len(self.order) if index == "end" else int(index), iid)
+        self.rows[iid] = tuple(values)
+        return iid
+    def delete(self, *iids):
+        gone = set(iids)
+        self.order = [i for i in self.order if i not in gone]
+        for i in gone: self.rows.pop(i, None)
+    def move(self, iid, parent, index):
+        self.order.remove(iid); self.order.insert(int(index), iid)
+    def item(self, iid, values=None, **kw):
+        if values is not None: self.rows[iid] = tuple(values)
+        return {"values": self.rows[iid]}
+    def yview(self, *args): return (self.top, 1.0)
+    def yview_moveto(self, fraction): self.top = float(fraction)
+
+
+class PhotoImage:
+    def __init__(self, master=None, width=0, height=0, **kw):
+        self.size = (width, height)
+    def put(self, data, to=None): pass
+
+
+def headless_tkinter():
+    # Module objects to put in sys.modules before niksha is imported.
+    tk = types.ModuleType("tkinter")
+    ttk = types.ModuleType("tkinter.ttk")
+    for name in ("messagebox", "simpledialog", "filedialog"):
+        setattr(tk, name, Dialogs)
+        sys.modules[f"tkinter.{name}"] = Dialogs
+    tk.ttk = ttk
+    tk.Tk, tk.Misc, tk.PhotoImage = Tk, Misc, PhotoImage
+    tk.Canvas = tk.Toplevel = Misc
+    tk.IntVar = tk.StringVar = tk.BooleanVar = tk.DoubleVar = Variable
+    tk.TkVersion = 0.0
+    ttk.Entry = ttk.Spinbox = ttk.Combobox = Entry
+    ttk.Treeview = Treeview
+    ttk.__getattr__ = lambda name: Misc  # Frame, Label, Button, Style, ...
+    sys.modules["tkinter"] = tk
+    sys.modules["tkinter.ttk"] = ttk
+
+
+# --------------------------
+# Synthetic database
+# --------------------------
+def build_db(path, users, scores, questions, seed):
+    # Users all share one password hash (logins clear the verify cache, so each still pays the KDF).
+    from loadtest import seed_questions
+    from quiz_db import Repository
+    rng = random.Random(seed)
+    repo = Repository(path)
+    repo.init_schema()
+    seed_questions(repo, questions)
+    phash = passwords.hash_password(PASSWORD)
+    now = int(time.time())
+    with repo.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (username, email, password_hash, age, gender, category, created, username_norm, email_norm) "
+            "VALUES (?,?,?,?,?,?,?,?,?)",
+            [(f"user{i}", f"user{i}@example.com", phash, AGES[c], "Other", c, now, f"user{i}", f"user{i}@example.com")
+             for i, c in ((i, CATEGORIES[i % 3]) for i in range(users))])
+    ids = [r[0] for r in repo.query("SELECT id FROM users ORDER BY id")]
+    for start in range(0, scores, 5000):
+        repo.add_scores([(rng.choice(ids), rng.randint(0, 10), 10, rng.choice(CATEGORIES),
+                          now - rng.randint(0, 180 * 86400)) for _ in range(start, min(scores, start + 5000))])
+    repo.close()
+
+
+# --------------------------
+# Benchmarks
+# --------------------------
+def settle(app, timeout=60):
+    # Pump the event loop until no job is in flight (callbacks may start follow-up jobs).
+    end = time.perf_counter() + timeout
+    while True:
+        app.update()
+        if not app.jobs.pending:
+            break
+        if time.perf_counter() > end:
+            raise RuntimeError("timed out waiting for background jobs")
+        time.sleep(0.0002)
+    if Misc.errors:
+        raise RuntimeError(f"callback failed: {Misc.errors[0]!r}")
+
+
+def check(ok, what):
+    if not ok:
+        raise RuntimeError(f"benchmark step did not do its job: {what}")
+
+
+class Bench:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.samples = {}
+
+    def time(self, name, fn, setup=None, repeat=None):
+        # fn() is timed `repeat` times after one untimed warm-up; setup() runs untimed before each.
+        for i in range((repeat or self.repeat) + 1):
+            if setup: setup()
+            t = time.perf_counter()
+            fn()
+            dt = time.perf_counter() - t
+            if i: self.samples.setdefault(name, []).append(dt)
+
+    def add(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def results(self):
+        out = {}
+        for name, vals in self.samples.items():
+            vals = sorted(vals)
+            out[name] = {"n": len(vals), "min_ms": vals[0] * 1000,
+                         "median_ms": vals[len(vals) // 2] * 1000,
+                         "p95_ms": vals[min(len(vals) - 1, int(0.95 * len(vals)))] * 1000,
+                         "mean_ms": sum(vals) / len(vals) * 1000}
+        return out
+
+
+def run_suite(niksha, db, workdir, bench, rng):
+    from quiz_db import close_all
+
+    def init_fresh():
+        close_all()
+        niksha.DB = os.path.join(workdir, f"fresh{next(fresh)}.db")
+    fresh = itertools.count()
+    bench.time("init_db.new_file", niksha.init_db, setup=init_fresh, repeat=max(3, bench.repeat // 4))
+    def reopen():
+        close_all(); niksha.DB = db
+    bench.time("init_db.existing", niksha.init_db, setup=reopen)
+    reopen()
+
+    t = time.perf_counter()
+    app = niksha.QuizApp()
+    app.jobs.poll_ms = 1  # the default 25 ms poll would quantize every job timing
+    app.db_ready.result(); settle(app)
+    bench.add("app.start", time.perf_counter() - t)
+
+    def cold_gradient():
+        niksha._gradient_cache.clear()
+    bench.time("create_gradient.cold", lambda: niksha.create_gradient(920, 72, '#2E6BE6', '#234FAB', master=app),
+               setup=cold_gradient)
+    bench.time("create_gradient.cached", lambda: niksha.create_gradient(920, 72, '#2E6BE6', '#234FAB', master=app))
+
+    users = niksha.repo().query_one("SELECT count(*) FROM users")[0]
+    login = app.get_frame(niksha.LoginFrame)
+    def fill_login():
+        app.current_user = None
+        passwords.clear_cache()
+        n = rng.randrange(users)
+        login.ident.delete(0, 'end'); login.ident.insert(0, f"user{n}")
+        login.pw.delete(0, 'end'); login.pw.insert(0, PASSWORD)
+    def try_login():
+        login.try_login(); settle(app)
+        check(app.current_user is not None, "try_login signed in")
+    bench.time("try_login", try_login, setup=fill_login)
+
+    reg = app.get_frame(niksha.RegisterFrame)
+    names = itertools.count()
+    def fill_register():
+        n = next(names)
+        for entry, text in ((reg.username, f"bench{n}"), (reg.email, f"bench{n}@example.com"),
+                            (reg.pw, PASSWORD), (reg.pw2, PASSWORD)):
+            entry.delete(0, 'end'); entry.insert(0, text)
+        reg.age_var.set(rng.choice(list(AGES.values())))
+    def register():
+        reg.register_user(); settle(app)
+        check(reg.status.cget('text').startswith("Registered"), "register_user registered")
+    bench.time("register_user", register, setup=fill_register)
+
+    bench.time("build_rounds", lambda: niksha.build_rounds(rng.choice(CATEGORIES)))
+
+    quiz = app.get_frame(niksha.QuizFrame)
+    def setup_quiz():
+        quiz.setup_quiz(category=rng.choice(CATEGORIES), round_number=rng.randint(1, 3)); settle(app)
+        check(quiz.questions, "setup_quiz loaded questions")
+    bench.time("setup_quiz", setup_quiz)
+
+    def answer_all():
+        # one sample per click: pick an answer, then Next (show_question for the next one)
+        for _ in range(len(quiz.questions) - 1):
+            quiz.var_choice.set(rng.randrange(len(quiz.questions[quiz.current_index]['options'])))
+            t = time.perf_counter()
+            quiz.go_next()
+            bench.add("show_question.next", time.perf_counter() - t)
+        t = time.perf_counter()
+        quiz.goto_question(0)
+        bench.add("show_question.jump", time.perf_counter() - t)
+    for _ in range(max(1, bench.repeat // 5)):
+        setup_quiz(); answer_all()
+
+    board = app.get_frame(niksha.ScoreboardFrame)
+    def new_quiz():
+        setup_quiz(); answer_all()
+    def submit():
+        quiz.submit_quiz(confirm=False); settle(app)
+        check(quiz.session is None, "submit_quiz saved the score")
+    bench.time("submit_quiz", submit, setup=new_quiz)  # includes the scoreboard refresh it leads to
+
+    for view, name in (("All attempts", "load_scores.all"), ("My attempts", "load_scores.mine"),
+                       ("Best: Adults", "load_scores.best")):
+        def load(view=view):
+            board.view_var.set(view); board.load_scores(); settle(app)
+            check(board.pages and board.pages[0], f"load_scores filled {view}")
+        bench.time(name, load)
+    def refresh_unchanged():
+        board.refresh(); settle(app)
+    bench.time("load_scores.unchanged", refresh_unchanged)
+
+    app.jobs.shutdown(wait=True)
+    close_all()
+
+
+# --------------------------
+# Comparison
+# --------------------------
+def compare(base, new, threshold, min_ms):
+    # Flags steps whose median got slower by more than `threshold` (fraction) and `min_ms`.
+    regressions = []
+    for key in ("mode", "sizes"):
+        if base["meta"].get(key) != new["meta"].get(key):
+            print(f"warning: baseline {key} {base['meta'].get(key)} differs from {new['meta'].get(key)}; "
+                  f"numbers are not directly comparable")
+    print(f"{'step':<26}{'baseline ms':>13}{'now ms':>11}{'change':>9}")
+    for name in list(base["results"]) + [n for n in new["results"] if n not in base["results"]]:
+        b, n = base["results"].get(name), new["results"].get(name)
+        if b is None or n is None:
+            print(f"{name:<26}{'-' if b is None else format(b['median_ms'], '.3f'):>13}"
+                  f"{'-' if n is None else format(n['median_ms'], '.3f'):>11}")
+            continue
+        bm, nm = b["median_ms"], n["median_ms"]
+        change = (nm - bm) / bm if bm else 0.0
+        flag = ""
+        if change > threshold and nm - bm > min_ms:
+            flag = "  REGRESSION"; regressions.append(name)
+        elif change < -threshold and bm - nm > min_ms:
+            flag = "  faster"
+        print(f"{name:<26}{bm:>13.3f}{nm:>11.3f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'step':<26}{'n':>5}{'median ms':>12}{'p95 ms':>10}{'min ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<26}{r['n']:>5}{r['median_ms']:>12.3f}{r['p95_ms']:>10.3f}{r['min_ms']:>10.3f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--scores", type=int, default=50000)
+    ap.add_argument("--questions", type=int, default=500, help="synthetic questions per category")
+    ap.add_argument("--repeat", type=int, default=20, help="timed runs per step")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--pw-iterations", type=int, default=1000,
+                    help="PBKDF2 cost for the run (low by default so the app, not the KDF, is measured)")
+    ap.add_argument("--db", help="synthetic database to use; built if missing (default: a temp file)")
+    ap.add_argument("--tk", action="store_true", help="real Tk widgets (needs a display, e.g. xvfb-run)")
+    ap.add_argument("--json", help="write the results here")
+    ap.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    ap.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    ap.add_argument("--min-ms", type=float, default=0.05, help="ignore changes smaller than this")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two results files and exit")
+    args = ap.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f: base = json.load(f)
+        with open(args.compare[1]) as f: new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold, args.min_ms) else 0)
+
+    passwords.PBKDF2_ITERATIONS = args.pw_iterations
+    if not args.tk:
+        headless_tkinter()
+    import niksha
+    import perf
+    niksha.messagebox = niksha.simpledialog = niksha.filedialog = Dialogs  # never block on a dialog
+
+    tmp = tempfile.TemporaryDirectory()
+    source = args.db or os.path.join(tmp.name, "seed.db")
+    seeded = None
+    if not os.path.exists(source):
+        t = time.perf_counter()
+        build_db(source, args.users, args.scores, args.questions, args.seed)
+        seeded = time.perf_counter() - t
+    db = os.path.join(tmp.name, "bench.db")
+    shutil.copyfile(source, db)
+    with sqlite3.connect(db) as conn:  # what is actually in there, when --db was built earlier
+        sizes = {t: conn.execute(f"SELECT count(*) FROM {t}").fetchone()[0] for t in ("users", "scores", "questions")}
+    perf.reset()
+    bench = Bench(args.repeat)
+    try:
+        run_suite(niksha, db, tmp.name, bench, random.Random(args.seed))
+    finally:
+        tmp.cleanup()
+
+    results = bench.results()
+    out = {"meta": {"created": time.time(), "mode": "tk" if args.tk else "headless", "sizes": sizes,
+                    "db": args.db, "seed": args.seed, "repeat": args.repeat, "pw_iterations": args.pw_iterations,
+                    "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                    "platform": platform.platform(), "seed_seconds": seeded},
+           "results": results,
+           "spans": {n: {"count": s["count"], "mean_ms": s["mean_ms"], "p95_ms": s["p95_ms"]}
+                     for n, s in sorted(perf.snapshot().items())}}
+    print(f"{out['meta']['mode']}, {sizes['users']} users, {sizes['scores']} scores, {sizes['questions']} questions"
+          + (f" (seeded in {seeded:.1f}s)" if seeded else ""))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(out, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f: base = json.load(f)
+        print()
+        regressions = compare(base, out, args.threshold, args.min_ms)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# bench_db.py
+# Micro-benchmark: connect-per-call (the old handler pattern) vs the pooled Repository.
+# Run: python bench_db.py [--ops 2000]
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from quiz_db import Repository
+
+LOOKUP = "SELECT id, username, email, password_hash, age, gender, category FROM users WHERE username=? OR email=?"
+INSERT = "INSERT INTO scores (user_id, score, total, category_id, ts) VALUES (?,?,?,?,?)"
+
+
+def seed(repo, users=200):
+    repo.init_schema()
+    with repo.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (username, email, password_hash, age, gender, category, created) VALUES (?,?,?,?,?,?,?)",
+            [(f"user{i}", f"user{i}@example.com", "x", 20, "Other", "Adults", int(time.time()))
+             for i in range(users)])
+        conn.execute("INSERT OR IGNORE INTO categories (id, name) VALUES (1, 'Adults')")
+
+
+def connect_per_call(path, ops):
+    # Mirrors the original handlers: open, execute, commit, close on every click.
+    for i in range(ops):
+        conn = sqlite3.connect(path); cur = conn.cursor()
+        cur.execute(LOOKUP, (f"user{i % 200}", f"user{i % 200}"))
+        cur.fetchone(); conn.close()
+        conn = sqlite3.connect(path); cur = conn.cursor()
+        cur.execute(INSERT, (i % 200 + 1, i % 4, 3, 1, int(time.time())))
+        conn.commit(); conn.close()
+
+
+def pooled(repo, ops):
+    for i in range(ops):
+        repo.query_one(LOOKUP, (f"user{i % 200}", f"user{i % 200}"))
+        repo.insert(INSERT, (i % 200 + 1, i % 4, 3, 1, int(time.time())))
+
+
+def pooled_batched(repo, ops, batch=100):
+    for start in range(0, ops, batch):
+        with repo.transaction() as conn:
+            for i in range(start, min(ops, start + batch)):
+                conn.execute(LOOKUP, (f"user{i % 200}", f"user{i % 200}")).fetchone()
+                conn.execute(INSERT, (i % 200 + 1, i % 4, 3, 1, int(time.time())))
+
+
+def run(name, fn, ops):
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"{name:<22} {ops / dt:>10.0f} ops/sec  ({dt:.3f}s for {ops} lookup+insert pairs)")
+    return ops / dt
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ops", type=int, default=2000)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as d:
+        # separate files so WAL on the pooled DB doesn't affect the baseline
+        base_path = os.path.join(d, "baseline.db")
+        base = Repository(base_path); seed(base); base.close()
+        conn = sqlite3.connect(base_path); conn.execute("PRAGMA journal_mode=DELETE"); conn.close()
+
+        repo = Repository(os.path.join(d, "pooled.db")); seed(repo)
+        slow = run("connect-per-call", lambda: connect_per_call(base_path, args.ops), args.ops)
+        fast = run("pooled repository", lambda: pooled(repo, args.ops), args.ops)
+        batched = run("pooled + batched", lambda: pooled_batched(repo, args.ops), args.ops)
+        repo.close()
+    print(f"speedup: pooled x{fast / slow:.1f}, batched x{batched / slow:.1f}")
+
+
+if __name__ == "__main__":
+    main()
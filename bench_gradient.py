@@ -0,0 +1,52 @@
+# bench_gradient.py
+# Startup-time benchmark: per-row create_line gradient (old) vs cached PhotoImage gradient (new).
+# Needs a display (or Xvfb): xvfb-run python bench_gradient.py [--repeat 50]
+import argparse
+import time
+import tkinter as tk
+
+import niksha
+
+SIZES = [(920, 72, '#2E6BE6', '#234FAB'), (920, 60, '#234FAB', '#2E6BE6')]  # Login + Register headers
+
+
+def legacy_gradient(master, canvas_width, canvas_height, color1, color2):
+    # The original implementation, kept here as the baseline.
+    c = tk.Canvas(master, width=canvas_width, height=canvas_height, highlightthickness=0)
+    r1,g1,b1 = niksha.hex_to_rgb(color1); r2,g2,b2 = niksha.hex_to_rgb(color2)
+    for i in range(canvas_height):
+        t = i / canvas_height
+        r = int(r1 + (r2-r1)*t); g = int(g1 + (g2-g1)*t); b = int(b1 + (b2-b1)*t)
+        c.create_line(0,i,canvas_width,i, fill=f'#{r:02x}{g:02x}{b:02x}')
+    return c
+
+
+def time_build(root, build, repeat):
+    # Build both headers, pack them and force the first paint, `repeat` times.
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        canvases = [build(root, *args) for args in SIZES]
+        for c in canvases: c.pack(fill='x')
+        root.update()
+        for c in canvases: c.destroy()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+    root = tk.Tk(); root.geometry("960x200")
+    old = time_build(root, legacy_gradient, args.repeat)
+    niksha._gradient_cache.clear()
+    cold = time_build(root, lambda m, *a: niksha.create_gradient(*a, master=m), 1)
+    warm = time_build(root, lambda m, *a: niksha.create_gradient(*a, master=m), args.repeat)
+    root.destroy()
+    print(f"per-line canvas      {old * 1000:8.2f} ms per startup (2 headers)")
+    print(f"PhotoImage (cold)    {cold * 1000:8.2f} ms")
+    print(f"PhotoImage (cached)  {warm * 1000:8.2f} ms")
+    print(f"speedup: cold x{old / cold:.1f}, cached x{old / warm:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# bench_passwords.py
+# Pick a password-hashing cost factor against a login-latency budget.
+# Run: python bench_passwords.py [--budget-ms 250] [--scheme pbkdf2_sha256|scrypt]
+import argparse
+import statistics
+import time
+
+import passwords
+
+COSTS = {
+    "pbkdf2_sha256": [50_000, 100_000, 200_000, 240_000, 400_000, 600_000, 1_000_000],
+    "scrypt": [2**12, 2**13, 2**14, 2**15, 2**16],
+}
+
+
+def time_verify(scheme, cost, repeat):
+    stored = passwords.hash_password("correct horse battery staple", scheme=scheme, cost=cost)
+    samples = []
+    for _ in range(repeat):
+        passwords.clear_cache()  # measure the KDF, not the verification cache
+        t0 = time.perf_counter()
+        passwords.verify_password("correct horse battery staple", stored)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scheme", choices=sorted(COSTS), default=passwords.SCHEME)
+    ap.add_argument("--budget-ms", type=float, default=250.0, help="acceptable KDF time per login")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    best = None
+    print(f"{args.scheme}: median verify time per cost factor (budget {args.budget_ms:.0f} ms)")
+    for cost in COSTS[args.scheme]:
+        ms = time_verify(args.scheme, cost, args.repeat) * 1000
+        fits = ms <= args.budget_ms
+        if fits: best = cost
+        print(f"  cost {cost:>9}  {ms:8.1f} ms  {'ok' if fits else 'over budget'}")
+    stored = passwords.hash_password("pw", scheme=args.scheme, cost=COSTS[args.scheme][0])
+    passwords.verify_password("pw", stored)
+    t0 = time.perf_counter(); passwords.verify_password("pw", stored)
+    print(f"  cached re-verify   {(time.perf_counter() - t0) * 1000:8.3f} ms")
+    if best:
+        var = "QUIZ_PBKDF2_ITERATIONS" if args.scheme == "pbkdf2_sha256" else "scrypt N (passwords.SCRYPT_N)"
+        print(f"recommended: {var}={best}")
+    else:
+        print("no cost factor fits the budget; raise --budget-ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# bench_timer.py
+# Quiz timer drift under a busy event loop: the old per-tick countdown vs timers.TimerService.
+# Runs on a simulated Tk loop with a virtual clock: every callback costs some time, and the
+# "app" stalls now and then (DB work, widget rebuilds), so results are reproducible and the
+# run takes well under a second without a display.
+# Run: python bench_timer.py [--limit 300] [--stall-ms 400] [--stall-every 3] [--seed 1]
+import argparse
+import heapq
+import random
+
+from timers import TimerService
+
+
+class SimLoop:
+    # The after()/after_cancel() part of Tk, on virtual time. Callbacks run no earlier than due,
+    # one at a time; each one (and each stall) advances the clock by its cost.
+    def __init__(self, rng, callback_ms, stall_ms, stall_every):
+        self.now = 0.0
+        self.rng = rng
+        self.callback_ms, self.stall_ms, self.stall_every = callback_ms, stall_ms, stall_every
+        self.queue = []
+        self.seq = 0
+        self.cancelled = set()
+        if stall_every:
+            self.after(int(stall_every * 1000), self.stall)
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, fn):
+        self.seq += 1
+        heapq.heappush(self.queue, (self.now + ms / 1000, self.seq, fn))
+        return self.seq
+
+    def after_cancel(self, ident):
+        self.cancelled.add(ident)
+
+    def stall(self):
+        self.now += self.rng.uniform(0.25, 1.0) * self.stall_ms / 1000
+        self.after(int(self.rng.expovariate(1 / self.stall_every) * 1000), self.stall)
+
+    def run_until(self, done, limit):
+        while self.queue and not done() and self.now < limit:
+            due, seq, fn = heapq.heappop(self.queue)
+            if seq in self.cancelled:
+                continue
+            self.now = max(self.now, due)
+            fn()
+            self.now += self.rng.uniform(0, self.callback_ms) / 1000
+
+
+def legacy_countdown(loop, seconds, chains=1):
+    # The old QuizFrame.countdown: -1 per after(1000). chains>1 is a second quiz started
+    # without cancelling the first chain (setup_quiz never cancelled timer_id).
+    state = {"left": seconds, "ended": None}
+    def tick():
+        if state["ended"] is not None: return
+        if state["left"] <= 0:
+            state["ended"] = loop.now; return
+        state["left"] -= 1
+        loop.after(1000, tick)
+    for _ in range(chains):
+        tick()
+    loop.run_until(lambda: state["ended"] is not None, seconds * 10)
+    return state["ended"]
+
+
+def service_countdown(loop, seconds, restarts=0):
+    # TimerService: restarts>0 cancels and restarts the round that many times in the first
+    # second (fast Start Quiz clicks) and counts callbacks from the cancelled timers.
+    timers = TimerService(loop, clock=loop.clock)
+    state = {"ended": None, "stale": 0, "late": [], "every": 0}
+    def expired(mine):
+        if mine is not current[0]: state["stale"] += 1
+        state["ended"] = loop.now
+    def tick(secs):
+        # how long after the whole-second boundary the label was redrawn
+        t = current[0]
+        if t is not None and t.active:
+            state["late"].append(loop.now - (t.deadline - secs))
+    current = [None]
+    def start():
+        if current[0] is not None: current[0].cancel()
+        box = []
+        current[0] = timers.start(seconds, lambda: expired(box[0]), on_tick=tick)
+        box.append(current[0])
+    start()
+    for i in range(restarts):
+        loop.after(100 * (i + 1), start)
+    checkpoints = timers.every(15, lambda: state.__setitem__("every", state["every"] + 1))
+    t0 = loop.now
+    loop.run_until(lambda: state["ended"] is not None, seconds * 10)
+    checkpoints.cancel()
+    started = t0 + (0.1 * restarts if restarts else 0)
+    return state, started
+
+
+def percentile(vals, p):
+    vals = sorted(vals)
+    return vals[min(len(vals) - 1, int(p / 100 * len(vals)))] if vals else 0.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--limit", type=int, default=300, help="quiz time limit in seconds")
+    ap.add_argument("--callback-ms", type=float, default=15, help="max cost of each timer callback")
+    ap.add_argument("--stall-ms", type=float, default=400, help="max length of a busy-loop stall")
+    ap.add_argument("--stall-every", type=float, default=3, help="mean seconds between stalls (0 = never)")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    def loop():
+        return SimLoop(random.Random(args.seed), args.callback_ms, args.stall_ms, args.stall_every)
+
+    print(f"{args.limit} s limit; callbacks up to {args.callback_ms:g} ms; stalls up to {args.stall_ms:g} ms "
+          f"every ~{args.stall_every:g} s")
+    ended = legacy_countdown(loop(), args.limit)
+    print(f"old countdown        ended at {ended:8.2f} s   drift {ended - args.limit:+7.2f} s")
+    ended = legacy_countdown(loop(), args.limit, chains=2)
+    print(f"old, two chains      ended at {ended:8.2f} s   drift {ended - args.limit:+7.2f} s   (second quiz without cancel)")
+    st, started = service_countdown(loop(), args.limit)
+    print(f"TimerService         ended at {st['ended']:8.2f} s   drift {st['ended'] - started - args.limit:+7.3f} s   "
+          f"label late p50 {percentile(st['late'], 50)*1000:.0f} ms, p95 {percentile(st['late'], 95)*1000:.0f} ms, "
+          f"{st['every']} checkpoints")
+    st, started = service_countdown(loop(), args.limit, restarts=5)
+    print(f"TimerService, 5 restarts  drift {st['ended'] - started - args.limit:+7.3f} s   "
+          f"stale expiries {st['stale']} (must be 0)")
+
+
+if __name__ == "__main__":
+    main()
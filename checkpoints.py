@@ -0,0 +1,75 @@
+# checkpoints.py
+# Crash-safe quiz checkpoints: one row per user holding just enough to rebuild the session.
+# Questions are stored as packed 64-bit ids and answers as one byte each (255 = unanswered),
+# so a 200-question round checkpoints in ~2 KB instead of a pickled list of question dicts.
+import struct
+import time
+
+UNANSWERED = 255
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS quiz_checkpoints (
+        user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        attempt_key TEXT NOT NULL,
+        category TEXT NOT NULL,
+        round_number INTEGER NOT NULL,
+        question_ids BLOB NOT NULL,
+        answers BLOB NOT NULL,
+        current_index INTEGER NOT NULL,
+        remaining_seconds INTEGER,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_checkpoints_attempt ON quiz_checkpoints(attempt_key)",
+]
+
+
+def ensure(conn):
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+
+
+def pack_ids(ids):
+    return struct.pack(f"<{len(ids)}q", *ids)
+
+def unpack_ids(blob):
+    return list(struct.unpack(f"<{len(blob) // 8}q", blob))
+
+def pack_answers(answers):
+    return bytes(UNANSWERED if a is None else a for a in answers)
+
+def unpack_answers(blob):
+    return [None if b == UNANSWERED else b for b in blob]
+
+
+def save(conn, user_id, attempt_key, category, round_number, question_ids, answers, current_index, remaining_seconds):
+    # question_ids/answers are already packed (see QuizSession.snapshot). A save that lands after
+    # the attempt was submitted (a background checkpoint racing the submit) writes nothing.
+    conn.execute("""
+        INSERT OR REPLACE INTO quiz_checkpoints
+            (user_id, attempt_key, category, round_number, question_ids, answers, current_index, remaining_seconds, updated_at)
+        SELECT ?,?,?,?,?,?,?,?,? WHERE NOT EXISTS (SELECT 1 FROM scores WHERE attempt_key=?)
+    """, (user_id, attempt_key, category, round_number, question_ids, answers, current_index, remaining_seconds, time.time(),
+          attempt_key))
+
+
+def load(conn, user_id):
+    # Returns a dict with unpacked ids/answers, or None.
+    row = conn.execute("""
+        SELECT attempt_key, category, round_number, question_ids, answers, current_index, remaining_seconds, updated_at
+        FROM quiz_checkpoints WHERE user_id=?
+    """, (user_id,)).fetchone()
+    if not row:
+        return None
+    key, cat, rnd, ids, answers, idx, remaining, updated = row
+    return {'attempt_key': key, 'category': cat, 'round_number': rnd, 'question_ids': unpack_ids(ids),
+            'answers': unpack_answers(answers), 'current_index': idx, 'remaining_seconds': remaining,
+            'updated_at': updated}
+
+
+def delete(conn, user_id=None, attempt_key=None):
+    if attempt_key is not None:
+        conn.execute("DELETE FROM quiz_checkpoints WHERE attempt_key=?", (attempt_key,))
+    else:
+        conn.execute("DELETE FROM quiz_checkpoints WHERE user_id=?", (user_id,))
@@ -0,0 +1,54 @@
+# jobs.py
+# Background job layer: DB work runs on a thread pool, results come back to Tk through a queue.
+# Tk widgets must only be touched from the main thread, so worker threads never call callbacks
+# themselves; the owning widget drains the queue with after() polling while jobs are in flight.
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobRunner:
+    def __init__(self, widget, workers=2, poll_ms=25):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiz-job")
+        self.results = queue.SimpleQueue()
+        self.pending = 0
+        self._poll_id = None
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        # Call from the Tk thread. on_done(result) / on_error(exc) also run on the Tk thread.
+        future = self.executor.submit(fn, *args, **kwargs)
+        self.pending += 1
+        future.add_done_callback(lambda f: self.results.put((f, on_done, on_error)))
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+        return future
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                future, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            exc = future.exception()
+            try:
+                if exc is not None:
+                    if on_error: on_error(exc)
+                    else: raise exc
+                elif on_done:
+                    on_done(future.result())
+            except Exception as e:
+                self.widget.report_callback_exception(type(e), e, e.__traceback__)
+        if self.pending > 0:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def shutdown(self, wait=True):
+        if self._poll_id is not None:
+            try:
+                self.widget.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,132 @@
+# leaderboard.py
+# Indexed leaderboard queries plus a materialized best-score-per-(user, category) table.
+# Every query pages with a keyset cursor (score, ts, id) instead of OFFSET/fixed LIMIT,
+# so fetching page N costs the same as page 1 and never sorts the whole scores table.
+# Rows end with their score id, which scoreboards use as a stable row key. version() tells a
+# client whether anything changed since it last looked, without reading any rows.
+# Times are stored as epoch seconds (see migrations.py) and formatted for display in SQL.
+
+SCHEMA = [
+    # Covering index for the global board: the ORDER BY is served straight off the index
+    # (id is listed explicitly so it is the tie-breaker), no table lookups for the columns shown.
+    "CREATE INDEX IF NOT EXISTS idx_scores_rank ON scores(score, ts, id, user_id, total, category_id)",
+    # Per-user board and "clear my attempts".
+    "CREATE INDEX IF NOT EXISTS idx_scores_user ON scores(user_id, score, ts, id)",
+    """
+    CREATE TABLE IF NOT EXISTS best_scores (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        score INTEGER,
+        total INTEGER,
+        ts INTEGER,
+        score_id INTEGER,
+        PRIMARY KEY (user_id, category_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_best_rank ON best_scores(category_id, score, ts, score_id)",
+    "CREATE TABLE IF NOT EXISTS leaderboard_state (key TEXT PRIMARY KEY, value INTEGER)",
+]
+
+PAGE_SIZE = 50
+
+# what the boards show in the time column
+SHOWN_TIME = "strftime('%Y-%m-%d %H:%M', {0}, 'unixepoch', 'localtime')"
+
+_BACKFILL = """
+    INSERT OR REPLACE INTO best_scores (user_id, category_id, score, total, ts, score_id)
+    SELECT user_id, category_id, score, total, ts, id FROM (
+        SELECT s.*, ROW_NUMBER() OVER (
+            PARTITION BY user_id, category_id ORDER BY score DESC, ts DESC, id DESC) AS rn
+        FROM scores s WHERE category_id IS NOT NULL {where}
+    ) WHERE rn = 1
+"""
+
+_UPSERT = """
+    INSERT INTO best_scores (user_id, category_id, score, total, ts, score_id)
+    VALUES (?,?,?,?,?,?)
+    ON CONFLICT(user_id, category_id) DO UPDATE SET
+        score=excluded.score, total=excluded.total, ts=excluded.ts, score_id=excluded.score_id
+    WHERE excluded.score > best_scores.score
+       OR (excluded.score = best_scores.score AND excluded.ts >= best_scores.ts)
+"""
+
+
+def ensure(conn):
+    # Create indexes and the materialized table; backfill it the first time it appears.
+    existed = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='best_scores'").fetchone()
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+    if not existed:
+        conn.execute(_BACKFILL.format(where=""))
+
+
+def backfill(conn, lo, hi):
+    # Best rows for users lo < id <= hi; lets a migration rebuild the table in chunks.
+    conn.execute(_BACKFILL.format(where="AND user_id > ? AND user_id <= ?"), (lo, hi))
+
+
+def record(conn, score_id, user_id, score, total, category_id, ts):
+    # Called in the same transaction as the scores insert so the two can't drift apart.
+    conn.execute(_UPSERT, (user_id, category_id, score, total, ts, score_id))
+
+
+def rebuild_user(conn, user_id):
+    # After a user's scores were deleted; counts as a removal for version().
+    conn.execute("DELETE FROM best_scores WHERE user_id=?", (user_id,))
+    conn.execute(_BACKFILL.format(where="AND user_id = ?"), (user_id,))
+    conn.execute("INSERT INTO leaderboard_state (key, value) VALUES ('removals', 1) "
+                 "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+
+
+def version(conn):
+    # (high-water scores.id, removals so far): changes whenever any board could have changed.
+    top = conn.execute("SELECT max(id) FROM scores").fetchone()[0] or 0
+    row = conn.execute("SELECT value FROM leaderboard_state WHERE key='removals'").fetchone()
+    return top, row[0] if row else 0
+
+
+def _page(conn, sql, key, where, params, after, limit):
+    # after: (score, ts, id) of the last row of the previous page, or None for page 1
+    clauses = list(where)
+    params = list(params)
+    if after is not None:
+        clauses.append(f"({key}) < (?, ?, ?)")
+        params.extend(after)
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    rows = conn.execute(sql.format(where=where_sql), params + [limit]).fetchall()
+    cursor = tuple(rows[-1][-3:]) if len(rows) == limit else None
+    return [r[:-3] + r[-1:] for r in rows], cursor
+
+
+_ATTEMPTS = f"""
+    SELECT u.username, s.score, s.total, c.name, {SHOWN_TIME.format('s.ts')}, s.score, s.ts, s.id
+    FROM (SELECT id, user_id, score, total, category_id, ts
+          FROM scores {{where}}
+          ORDER BY score DESC, ts DESC, id DESC LIMIT ?) s
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN categories c ON c.id = s.category_id
+    ORDER BY s.score DESC, s.ts DESC, s.id DESC
+"""
+
+
+def top(conn, after=None, limit=PAGE_SIZE):
+    # All attempts, best first.
+    return _page(conn, _ATTEMPTS, "score, ts, id", [], [], after, limit)
+
+
+def for_user(conn, user_id, after=None, limit=PAGE_SIZE):
+    # One user's attempts, best first.
+    return _page(conn, _ATTEMPTS, "score, ts, id", ["user_id = ?"], [user_id], after, limit)
+
+
+def for_category(conn, category, after=None, limit=PAGE_SIZE):
+    # Best attempt per user within one category.
+    return _page(conn, f"""
+        SELECT u.username, b.score, b.total, ?, {SHOWN_TIME.format('b.ts')}, b.score, b.ts, b.score_id
+        FROM (SELECT user_id, score, total, ts, score_id
+              FROM best_scores {{where}}
+              ORDER BY score DESC, ts DESC, score_id DESC LIMIT ?) b
+        JOIN users u ON b.user_id = u.id
+        ORDER BY b.score DESC, b.ts DESC, b.score_id DESC
+    """, "score, ts, score_id", ["category_id = (SELECT id FROM categories WHERE name = ?)"], [category, category],
+                 after, limit)
@@ -0,0 +1,163 @@
+# loadtest.py
+# Load-generation harness for the headless quiz engine against the SQLite backend.
+# Simulates many concurrent users registering, logging in, taking rounds and submitting,
+# then reports p50/p95/p99 latency and throughput per operation.
+# With --server the same sessions go over HTTP to an in-process server.py (its worker pool,
+# caches and JSON round-trips included) instead of calling the engine directly.
+# Run: python loadtest.py --users 2000 --concurrency 200 [--server] [--db load.db] [--json out.json]
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import passwords
+from quiz_client import RemoteEngine
+from quiz_db import Repository
+from quiz_engine import QuizEngine
+from server import QuizServer
+
+CATEGORIES = ["Children", "Teenagers", "Adults"]
+
+
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100.0 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def timed(self, op, fn, *args):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception:
+            with self.lock:
+                self.errors[op] = self.errors.get(op, 0) + 1
+            raise
+        finally:
+            dt = time.perf_counter() - t0
+            with self.lock:
+                self.samples.setdefault(op, []).append(dt)
+
+    def report(self, wall):
+        out = {}
+        for op, vals in self.samples.items():
+            vals = sorted(vals)
+            out[op] = {
+                "count": len(vals), "errors": self.errors.get(op, 0),
+                "p50_ms": percentile(vals, 50) * 1000, "p95_ms": percentile(vals, 95) * 1000,
+                "p99_ms": percentile(vals, 99) * 1000, "max_ms": vals[-1] * 1000,
+                "throughput": len(vals) / wall[op] if wall.get(op) else 0.0,
+            }
+        return out
+
+
+def seed_questions(repo, per_category):
+    # Synthetic bank so round sampling runs against a realistically sized store.
+    with repo.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO questions (category, round, difficulty, text, options, answer) VALUES (?,?,?,?,?,?)",
+            [(cat, i % 3 + 1, i % 5 + 1, f"{cat} synthetic question {i}", '["A","B","C","D"]', i % 4)
+             for cat in CATEGORIES for i in range(per_category)])
+    repo.plan_rounds()
+
+
+def simulate(engine, rec, n, rounds):
+    # One user's session: login, then take and submit `rounds` rounds, then view the board.
+    name = f"load{n}"
+    user = rec.timed("login", engine.login, name, "pw-" + name)
+    for _ in range(rounds):
+        session = rec.timed("start_round", engine.start_round, user, user['category'], random.randint(1, 3))
+        for i, q in enumerate(session.questions):
+            session.answer(i, random.randrange(len(q['options'])))
+        rec.timed("submit", engine.submit, session)
+    rec.timed("leaderboard", engine.leaderboard)
+
+
+def run_phase(name, fn, items, concurrency, wall):
+    t0 = time.perf_counter()
+    errors = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for f in [ex.submit(fn, i) for i in items]:
+            if f.exception() is not None:
+                errors += 1
+    wall[name] = time.perf_counter() - t0
+    return errors
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=100, help="simulated users in flight at once")
+    ap.add_argument("--rounds", type=int, default=2, help="rounds each user takes")
+    ap.add_argument("--questions", type=int, default=5000, help="synthetic questions per category")
+    ap.add_argument("--pool", type=int, default=8, help="connection pool size")
+    ap.add_argument("--pw-iterations", type=int, default=1000,
+                    help="PBKDF2 cost for the run (low by default so the DB, not the KDF, is measured)")
+    ap.add_argument("--db", help="database file (default: a fresh temp file)")
+    ap.add_argument("--json", help="write the report here as JSON")
+    ap.add_argument("--server", action="store_true", help="drive a local quiz server over HTTP")
+    ap.add_argument("--workers", type=int, default=8, help="server DB worker threads (with --server)")
+    args = ap.parse_args()
+
+    passwords.PBKDF2_ITERATIONS = args.pw_iterations
+    tmp = None
+    if not args.db:
+        tmp = tempfile.TemporaryDirectory(); args.db = os.path.join(tmp.name, "load.db")
+    repo = Repository(args.db, pool_size=args.pool, question_cache=50000 if args.server else 0)
+    repo.init_schema()
+    if args.questions:
+        seed_questions(repo, args.questions)
+    server = None
+    if args.server:
+        server = QuizServer(repo, port=0, workers=args.workers, queue=args.concurrency * 4)
+        engine = RemoteEngine(server.start_in_thread())
+    else:
+        engine = QuizEngine(repo)
+    rec = Recorder()
+    wall = {}
+
+    def register(n):
+        name = f"load{n}"
+        rec.timed("register", engine.register, name, f"{name}@example.com", "pw-" + name,
+                  random.choice([10, 16, 30]), "Other")
+
+    failed = run_phase("register", register, range(args.users), args.concurrency, wall)
+    t0 = time.perf_counter()
+    failed += run_phase("session", lambda n: simulate(engine, rec, n, args.rounds), range(args.users),
+                        args.concurrency, wall)
+    session_wall = time.perf_counter() - t0
+    for op in ("login", "start_round", "submit", "leaderboard"):
+        wall[op] = session_wall  # these ops interleave, so they share the phase's wall time
+    report = rec.report(wall)
+    if server: server.stop()
+    repo.close()
+    if tmp: tmp.cleanup()
+
+    print(f"{args.users} users, concurrency {args.concurrency}, {args.rounds} rounds each, pool {args.pool}"
+          + (f", over HTTP ({args.workers} server workers)" if args.server else ""))
+    print(f"{'op':<12} {'count':>7} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'ops/s':>9}")
+    for op in ("register", "login", "start_round", "submit", "leaderboard"):
+        r = report.get(op)
+        if not r: continue
+        print(f"{op:<12} {r['count']:>7} {r['errors']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['max_ms']:>9.2f} {r['throughput']:>9.0f}")
+    if failed:
+        print(f"{failed} simulated users failed")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "ops": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# migrations.py
+# Versioned schema migrations, tracked in PRAGMA user_version.
+#   1  the original layout: ISO-text timestamps, category names repeated in every scores row
+#   2  users.created / scores.ts as integer epoch seconds, scores.category_id -> categories,
+#      ON DELETE CASCADE from scores/best_scores to users
+# Repository.init_schema() runs pending migrations before anything else, and a brand-new file
+# is created at the latest version directly. Tables are rebuilt online. A <table>_new copy is
+# filled CHUNK rows per transaction. Triggers on the old table mirror whatever other
+# connections write meanwhile. The swap at the end (drop, rename) is one short transaction.
+# Progress is kept in migration_state: a table already swapped is skipped on a rerun, a
+# half-copied one picks up where it stopped, and the step's keys are cleared together with
+# the user_version bump.
+# `python niksha.py migrate` runs this ahead of time and reports size and query times
+# before and after.
+import os
+import time
+
+import leaderboard
+
+LATEST = 2
+CHUNK = 5000
+
+STATE = "CREATE TABLE IF NOT EXISTS migration_state (key TEXT PRIMARY KEY, value INTEGER)"
+
+# Frozen v2 DDL: later versions change quiz_db.SCHEMA, not these.
+V2_CATEGORIES = "CREATE TABLE IF NOT EXISTS categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+V2_USERS = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE,
+        email TEXT UNIQUE,
+        password_hash TEXT,
+        age INTEGER,
+        gender TEXT,
+        category TEXT,
+        created INTEGER,
+        username_norm TEXT,
+        email_norm TEXT
+    )
+"""
+V2_SCORES = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        score INTEGER,
+        total INTEGER,
+        category_id INTEGER REFERENCES categories(id),
+        ts INTEGER
+    )
+"""
+# ISO text written by datetime.now().isoformat() is local time; 'utc' converts it to epoch
+EPOCH = "CAST(strftime('%s', {col}, 'utc') AS INTEGER)"
+
+
+def version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def detect(conn):
+    # user_version 0 is either a brand-new file (gets the latest layout) or a v1 database.
+    v = version(conn)
+    if v:
+        return v
+    legacy = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='scores'").fetchone()
+    return 1 if legacy else LATEST
+
+
+def _columns(conn, table):
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _state(conn, key, value=None):
+    if value is None:
+        row = conn.execute("SELECT value FROM migration_state WHERE key=?", (key,)).fetchone()
+        return row[0] if row else 0
+    conn.execute("INSERT OR REPLACE INTO migration_state (key, value) VALUES (?,?)", (key, value))
+
+
+def copy_online(conn, table, create, columns, exprs, chunk, progress, prepare=None, trigger_prelude=""):
+    # Rebuild `table` as create.format(name=...) with columns = exprs evaluated over each old
+    # row ({r} is the row alias). prepare(lo, hi) runs in each chunk's transaction first.
+    new = table + "_new"
+    cols = ", ".join(columns)
+    def select(r):
+        return ", ".join(e.format(r=r) for e in exprs)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(STATE)
+    if _state(conn, f"{table}.swapped"):
+        conn.commit()
+        return
+    if not _state(conn, f"{table}.copied"):
+        # nothing of a previous attempt to resume: start from an empty copy
+        for op in ("ins", "upd", "del"):
+            conn.execute(f"DROP TRIGGER IF EXISTS mig_{table}_{op}")
+        conn.execute(f"DROP TABLE IF EXISTS {new}")
+    conn.execute(create.format(name=new))
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS mig_{table}_ins AFTER INSERT ON {table} BEGIN
+        {trigger_prelude.format(r="NEW")}
+        INSERT OR REPLACE INTO {new} ({cols}) VALUES ({select("NEW")}); END""")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS mig_{table}_upd AFTER UPDATE ON {table} BEGIN
+        {trigger_prelude.format(r="NEW")}
+        DELETE FROM {new} WHERE id = OLD.id;
+        INSERT OR REPLACE INTO {new} ({cols}) VALUES ({select("NEW")}); END""")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS mig_{table}_del AFTER DELETE ON {table} BEGIN
+        DELETE FROM {new} WHERE id = OLD.id; END""")
+    conn.commit()
+
+    last = _state(conn, f"{table}.copied")
+    top = conn.execute(f"SELECT max(id) FROM {table}").fetchone()[0] or 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        hi = conn.execute(f"SELECT max(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+                          (last, chunk)).fetchone()[0]
+        if hi is None:
+            conn.commit()
+            break
+        if prepare: prepare(last, hi)
+        # OR IGNORE: a row the triggers already mirrored is at least as new as this copy
+        conn.execute(f"INSERT OR IGNORE INTO {new} ({cols}) SELECT {select('o')} FROM {table} o WHERE o.id > ? AND o.id <= ?",
+                     (last, hi))
+        _state(conn, f"{table}.copied", hi)
+        conn.commit()
+        last = hi
+        progress(table, min(hi, top), top)
+
+    # swap: everything written since the triggers went in is already in the copy
+    conn.execute("BEGIN IMMEDIATE")
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (table,)).fetchone()
+    for op in ("ins", "upd", "del"):
+        conn.execute(f"DROP TRIGGER IF EXISTS mig_{table}_{op}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {new} RENAME TO {table}")
+    if seq:  # AUTOINCREMENT never reuses ids, even those of rows deleted before the copy
+        conn.execute("UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name=?", (seq[0], table))
+    conn.execute("DELETE FROM migration_state WHERE key=?", (f"{table}.copied",))
+    _state(conn, f"{table}.swapped", 1)
+    conn.commit()
+
+
+def _v2(conn, chunk, progress):
+    conn.execute(V2_CATEGORIES)
+    cols = _columns(conn, "users")
+    norm = ["{r}." + c if c in cols else "NULL" for c in ("username_norm", "email_norm")]  # NULL: filled in by init_schema
+    copy_online(conn, "users", V2_USERS,
+                ["id", "username", "email", "password_hash", "age", "gender", "category", "created",
+                 "username_norm", "email_norm"],
+                ["{r}.id", "{r}.username", "{r}.email", "{r}.password_hash", "{r}.age", "{r}.gender", "{r}.category",
+                 EPOCH.format(col="{r}.created_at")] + norm, chunk, progress)
+
+    def categories(lo, hi):
+        conn.execute("INSERT OR IGNORE INTO categories (name) SELECT DISTINCT category FROM scores "
+                     "WHERE id > ? AND id <= ? AND category IS NOT NULL", (lo, hi))
+    copy_online(conn, "scores", V2_SCORES,
+                ["id", "user_id", "score", "total", "category_id", "ts"],
+                ["{r}.id", "{r}.user_id", "{r}.score", "{r}.total",
+                 "(SELECT id FROM categories WHERE name = {r}.category)", f"coalesce({EPOCH.format(col='{r}.timestamp')}, 0)"],
+                chunk, progress, prepare=categories,
+                trigger_prelude="INSERT OR IGNORE INTO categories (name) SELECT {r}.category WHERE {r}.category IS NOT NULL;")
+
+    # derived tables are rebuilt by their current code rather than converted
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DROP TABLE IF EXISTS best_scores")
+    for stmt in leaderboard.SCHEMA:
+        conn.execute(stmt)
+    conn.commit()
+    last, top = 0, conn.execute("SELECT max(id) FROM users").fetchone()[0] or 0
+    while last < top:
+        conn.execute("BEGIN IMMEDIATE")
+        leaderboard.backfill(conn, last, last + chunk)
+        conn.commit()
+        last += chunk
+        progress("best_scores", min(last, top), top)
+
+
+MIGRATIONS = [
+    (2, "integer timestamps, category ids, foreign keys", _v2),
+]
+
+
+def upgrade(repo, chunk=CHUNK, progress=None):
+    # Apply pending migrations; returns the names of the ones applied.
+    progress = progress or (lambda table, done, total: None)
+    applied = []
+    with repo.pool.connection() as conn:
+        current = detect(conn)
+        if current >= LATEST:
+            if version(conn) != current:
+                conn.execute(f"PRAGMA user_version={current}")
+            return applied
+        # DROP TABLE on a connection with foreign keys on would cascade into child tables
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            for target, name, step in MIGRATIONS:
+                if current >= target:
+                    continue
+                step(conn, chunk, progress)
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(STATE)
+                conn.execute("DELETE FROM migration_state")
+                conn.execute(f"PRAGMA user_version={target}")
+                conn.commit()
+                applied.append(name)
+                current = target
+        finally:
+            if conn.in_transaction: conn.rollback()
+            conn.execute("PRAGMA foreign_keys=ON")
+    return applied
+
+
+# ---- before/after report ----
+DAY = 86400
+PROBES = {
+    1: [
+        ("top 50", "SELECT id, user_id, score, total, category, timestamp FROM scores "
+                   "ORDER BY score DESC, timestamp DESC, id DESC LIMIT 50", lambda now: ()),
+        ("one user's attempts", "SELECT id, score, total, category, timestamp FROM scores WHERE user_id = "
+                                "(SELECT user_id FROM scores ORDER BY id LIMIT 1) ORDER BY score DESC, timestamp DESC LIMIT 50",
+         lambda now: ()),
+        ("last 30 days", "SELECT count(*), avg(score) FROM scores WHERE timestamp >= ?",
+         lambda now: (time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now - 30 * DAY)),)),
+        ("attempts per category", "SELECT category, count(*) FROM scores GROUP BY category", lambda now: ()),
+    ],
+    2: [
+        ("top 50", "SELECT id, user_id, score, total, category_id, ts FROM scores "
+                   "ORDER BY score DESC, ts DESC, id DESC LIMIT 50", lambda now: ()),
+        ("one user's attempts", "SELECT id, score, total, category_id, ts FROM scores WHERE user_id = "
+                                "(SELECT user_id FROM scores ORDER BY id LIMIT 1) ORDER BY score DESC, ts DESC LIMIT 50",
+         lambda now: ()),
+        ("last 30 days", "SELECT count(*), avg(score) FROM scores WHERE ts >= ?", lambda now: (int(now - 30 * DAY),)),
+        ("attempts per category", "SELECT c.name, n FROM (SELECT category_id, count(*) AS n FROM scores GROUP BY category_id) s "
+                                  "JOIN categories c ON c.id = s.category_id", lambda now: ()),
+    ],
+}
+
+
+def measure(repo, repeat=5):
+    # {version, file_bytes, used_bytes, tables: {name: bytes}, queries: {label: best ms}}
+    with repo.pool.connection() as conn:
+        # fold the WAL back into the main file; whatever a busy reader keeps there is counted below
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        v = detect(conn)
+        page = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        try:
+            tables = dict(conn.execute("SELECT name, sum(pgsize) FROM dbstat WHERE name IN ('users', 'scores') "
+                                       "OR name LIKE 'idx_scores%' GROUP BY name").fetchall())
+        except Exception:  # SQLite built without the dbstat table
+            tables = {}
+        queries = {}
+        has_scores = conn.execute("SELECT 1 FROM sqlite_master WHERE name='scores'").fetchone()
+        for label, sql, params in PROBES.get(v, []) if has_scores else []:
+            best = None
+            for _ in range(repeat):
+                t = time.perf_counter()
+                conn.execute(sql, params(time.time())).fetchall()
+                dt = time.perf_counter() - t
+                best = dt if best is None else min(best, dt)
+            queries[label] = best * 1000
+    size = sum(os.path.getsize(p) for p in (repo.path, repo.path + "-wal") if os.path.exists(p))
+    return {"version": v, "file_bytes": size, "used_bytes": (pages - free) * page, "tables": tables, "queries": queries}
+
+
+def format_report(before, after):
+    w = 28
+    lines = [f"schema version {before['version']} -> {after['version']}",
+             f"{'':<{w}}{'before':>14}{'after':>14}",
+             f"{'file size':<{w}}{before['file_bytes']:>14,}{after['file_bytes']:>14,}",
+             f"{'bytes in use':<{w}}{before['used_bytes']:>14,}{after['used_bytes']:>14,}"]
+    for name in sorted(set(before['tables']) | set(after['tables'])):
+        lines.append(f"{name:<{w}}{before['tables'].get(name, 0):>14,}{after['tables'].get(name, 0):>14,}")
+    labels = list(before['queries']) + [q for q in after['queries'] if q not in before['queries']]
+    for label in labels:
+        b, a = before['queries'].get(label, float('nan')), after['queries'].get(label, float('nan'))
+        lines.append(f"{label + ' (ms)':<{w}}{b:>14.2f}{a:>14.2f}")
+    return "\n".join(lines)
@@ -1,564 +1,1224 @@
-# quiz_app_colored.py
-# Run: python quiz_app_colored.py
-# A Tkinter-based quiz app: Login, Registration, Category-based quiz, scoreboard (SQLite).
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-import sqlite3
-import hashlib
-import datetime
-import random
-
-DB = "quiz_app_colored.db"
-
-# --------------------------
-# Database helpers
-# --------------------------
-def init_db():
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            email TEXT UNIQUE,
-            password_hash TEXT,
-            age INTEGER,
-            gender TEXT,
-            category TEXT,
-            created_at TEXT
-        )
-    """)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS scores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            score INTEGER,
-            total INTEGER,
-            category TEXT,
-            timestamp TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-def hash_pw(pw: str) -> str:
-    return hashlib.sha256(pw.encode('utf-8')).hexdigest()
-
-# --------------------------
-# A small sample question bank (extendable)
-# each question: {'q':..., 'options':[...], 'answer': index}
-# --------------------------
-QUESTION_BANK = {
-    "Children": [
-        {'q': "Which animal says 'moo'?", 'options': ['Dog','Cow','Cat','Sheep'], 'answer': 1},
-        {'q': "How many legs does a spider have?", 'options': ['6','8','4','10'], 'answer': 1},
-        {'q': "Which of these is a primary color?", 'options': ['Green','Purple','Red','Brown'], 'answer': 2},
-    ],
-    "Teenagers": [
-        {'q': "Which tech is used to secure websites (HTTPS)?", 'options': ['FTP','SSL/TLS','SMTP','POP3'], 'answer': 1},
-        {'q': "What does 2FA stand for?", 'options': ['Two-Factor Auth','Two-File Auth','Two-Fold Access','None'], 'answer': 0},
-        {'q': "Which subject studies living things?", 'options': ['Physics','Chemistry','Biology','Math'], 'answer': 2},
-    ],
-    "Adults": [
-        {'q': "Which index commonly measures inflation?", 'options': ['CPI','GDP','GNP','PPI'], 'answer': 0},
-        {'q': "Which of these is renewable energy?", 'options': ['Coal','Solar','Oil','Natural Gas'], 'answer': 1},
-        {'q': "What is diversification in investing mainly for?", 'options': ['Increase taxes','Reduce risk','Guarantee profit','Increase fees'], 'answer': 1},
-    ]
-}
-
-def build_rounds(cat):
-    bank = QUESTION_BANK.get(cat, []).copy()
-    random.shuffle(bank)
-    n = len(bank)
-    if n == 0:
-        return [[], [], []]
-    k = max(1, n//3)
-    r1 = bank[:k]
-    r2 = bank[k:k+k]
-    r3 = bank[k+k:]
-    # Ensure some content in rounds
-    if not r2 and n>1:
-        r2 = bank[1:2]
-        r1 = [bank[0]]
-        r3 = bank[2:]
-    return [r1, r2, r3]
-
-# --------------------------
-# Simple gradient helper (Canvas)
-# --------------------------
-def create_gradient(canvas_width, canvas_height, color1, color2):
-    c = tk.Canvas(width=canvas_width, height=canvas_height, highlightthickness=0)
-    def hex_to_rgb(h): h=h.lstrip('#'); return int(h[0:2],16), int(h[2:4],16), int(h[4:6],16)
-    r1,g1,b1 = hex_to_rgb(color1); r2,g2,b2 = hex_to_rgb(color2)
-    for i in range(canvas_height):
-        t = i / canvas_height
-        r = int(r1 + (r2-r1)*t); g = int(g1 + (g2-g1)*t); b = int(b1 + (b2-b1)*t)
-        c.create_line(0,i,canvas_width,i, fill=f'#{r:02x}{g:02x}{b:02x}')
-    return c
-
-# --------------------------
-# Main application
-# --------------------------
-class QuizApp(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Beautiful Quiz App")
-        self.geometry("960x680")
-        self.minsize(860,620)
-
-        # Colors & styles
-        self.colors = {
-            'bg': '#EAF4FF',
-            'card': '#FFFFFF',
-            'accent': '#2E6BE6',
-            'accent_dark': '#234FAB',
-            'muted': '#25343B',
-            'success': '#2AA876',
-            'danger': '#E05A5A'
-        }
-        self.font_main = ('Segoe UI', 11)
-        self.font_title = ('Segoe UI', 18, 'bold')
-
-        self.configure(bg=self.colors['bg'])
-        self.style = ttk.Style(self)
-        try:
-            self.style.theme_use('clam')
-        except:
-            pass
-        self.style.configure("TFrame", background=self.colors['bg'])
-        self.style.configure("Card.TFrame", background=self.colors['card'])
-        self.style.configure("TLabel", background=self.colors['bg'], foreground=self.colors['muted'], font=self.font_main)
-        self.style.configure("Accent.TLabel", background=self.colors['card'], foreground=self.colors['accent_dark'], font=self.font_main)
-        self.style.configure("Title.TLabel", background=self.colors['accent'], foreground='white', font=self.font_title)
-        self.style.configure("TButton", font=('Segoe UI',10,'bold'), padding=6)
-        self.style.map("TButton", background=[('active', self.colors['accent_dark'])])
-
-        init_db()
-        self.current_user = None
-        self.frames = {}
-        self.create_frames()
-        self.show_frame(LoginFrame)
-
-    def create_frames(self):
-        container = ttk.Frame(self)
-        container.pack(fill='both', expand=True, padx=12, pady=12)
-        for F in (LoginFrame, RegisterFrame, HomeFrame, QuizFrame, ScoreboardFrame):
-            frame = F(parent=container, controller=self)
-            self.frames[F] = frame
-            frame.grid(row=0, column=0, sticky='nsew')
-
-    def show_frame(self, frame_class):
-        frame = self.frames[frame_class]
-        frame.tkraise()
-        if hasattr(frame, 'on_show'):
-            frame.on_show()
-
-# --------------------------
-# Login Page
-# --------------------------
-class LoginFrame(ttk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent, padding=14)
-        self.controller = controller
-
-        grad = create_gradient(920, 72, controller.colors['accent'], controller.colors['accent_dark'])
-        grad_frame = ttk.Frame(self, style="Card.TFrame")
-        grad_frame.pack(fill='x', pady=(0,10))
-        grad.master = grad_frame
-        grad.pack(fill='x')
-        title = ttk.Label(grad, text="Welcome to Beautiful Quiz", style="Title.TLabel")
-        grad.create_window(460,36,window=title)
-
-        card = ttk.Frame(self, style="Card.TFrame", padding=16)
-        card.pack(padx=8, pady=8, fill='x')
-
-        ttk.Label(card, text="Username or Email:", style="Accent.TLabel").grid(row=0, column=0, sticky='w')
-        self.ident = ttk.Entry(card, width=36); self.ident.grid(row=0, column=1, pady=6, padx=8)
-
-        ttk.Label(card, text="Password:", style="Accent.TLabel").grid(row=1, column=0, sticky='w')
-        self.pw = ttk.Entry(card, width=36, show='*'); self.pw.grid(row=1, column=1, pady=6, padx=8)
-
-        btns = ttk.Frame(card, style="Card.TFrame"); btns.grid(row=2, column=0, columnspan=2, pady=10)
-        login_btn = ttk.Button(btns, text="Login", command=self.try_login); login_btn.grid(row=0,column=0,padx=6)
-        reg_btn = ttk.Button(btns, text="Register →", command=lambda: controller.show_frame(RegisterFrame)); reg_btn.grid(row=0,column=1,padx=6)
-
-        forgot_btn = ttk.Button(card, text="Forgot password?", command=self.forgot_password); forgot_btn.grid(row=3,column=0,columnspan=2,pady=(6,0))
-        self.message = ttk.Label(self, text="", foreground=controller.colors['danger'])
-        self.message.pack(pady=6)
-
-    def try_login(self):
-        ident = self.ident.get().strip(); pw = self.pw.get().strip()
-        if not ident or not pw:
-            self.message.config(text="Enter username/email and password.")
-            return
-        conn = sqlite3.connect(DB); cur = conn.cursor()
-        cur.execute("SELECT id, username, email, password_hash, age, gender, category FROM users WHERE username=? OR email=?", (ident,ident))
-        row = cur.fetchone(); conn.close()
-        if not row:
-            self.message.config(text="User not found. Please register.")
-            return
-        uid, username, email, phash, age, gender, category = row
-        if hash_pw(pw) != phash:
-            self.message.config(text="Incorrect password.")
-            return
-        self.controller.current_user = {'id':uid,'username':username,'email':email,'age':age,'gender':gender,'category':category}
-        self.ident.delete(0,'end'); self.pw.delete(0,'end'); self.message.config(text="")
-        self.controller.show_frame(HomeFrame)
-
-    def forgot_password(self):
-        email = simpledialog.askstring("Forgot password", "Enter your registered email:")
-        if not email: return
-        conn = sqlite3.connect(DB); cur = conn.cursor()
-        cur.execute("SELECT id FROM users WHERE email=?", (email,))
-        row = cur.fetchone()
-        if not row:
-            conn.close(); messagebox.showerror("Not found", "No user with that email."); return
-        uid = row[0]
-        newpw = simpledialog.askstring("Reset password", "Enter new password:", show='*')
-        if not newpw:
-            conn.close(); return
-        cur.execute("UPDATE users SET password_hash=? WHERE id=?", (hash_pw(newpw), uid))
-        conn.commit(); conn.close()
-        messagebox.showinfo("Success", "Password reset. Please login with new password.")
-
-# --------------------------
-# Registration Page
-# --------------------------
-class RegisterFrame(ttk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent, padding=12)
-        self.controller = controller
-        grad = create_gradient(920, 60, controller.colors['accent_dark'], controller.colors['accent'])
-        grad_frame = ttk.Frame(self, style="Card.TFrame")
-        grad_frame.pack(fill='x', pady=(0,8))
-        grad.master = grad_frame; grad.pack(fill='x')
-        title = ttk.Label(grad, text="Create an Account", style="Title.TLabel"); grad.create_window(460,30,window=title)
-
-        card = ttk.Frame(self, style="Card.TFrame", padding=14); card.pack(padx=8,pady=8,fill='x')
-
-        ttk.Label(card, text="Username:", style="Accent.TLabel").grid(row=0,column=0, sticky='w')
-        self.username = ttk.Entry(card, width=36); self.username.grid(row=0,column=1,pady=6, padx=8)
-
-        ttk.Label(card, text="Email:", style="Accent.TLabel").grid(row=1,column=0, sticky='w')
-        self.email = ttk.Entry(card, width=36); self.email.grid(row=1,column=1,pady=6, padx=8)
-
-        ttk.Label(card, text="Password:", style="Accent.TLabel").grid(row=2,column=0, sticky='w')
-        self.pw = ttk.Entry(card, width=36, show='*'); self.pw.grid(row=2,column=1,pady=6, padx=8)
-
-        ttk.Label(card, text="Confirm Password:", style="Accent.TLabel").grid(row=3,column=0, sticky='w')
-        self.pw2 = ttk.Entry(card, width=36, show='*'); self.pw2.grid(row=3,column=1,pady=6, padx=8)
-
-        ttk.Label(card, text="Age:", style="Accent.TLabel").grid(row=4,column=0, sticky='w')
-        self.age_var = tk.IntVar(value=18)
-        self.age_spin = ttk.Spinbox(card, from_=8, to=100, textvariable=self.age_var, width=6); self.age_spin.grid(row=4,column=1, sticky='w', pady=6, padx=8)
-
-        ttk.Label(card, text="Gender:", style="Accent.TLabel").grid(row=5,column=0, sticky='w')
-        self.gender_var = tk.StringVar(value='Male')
-        gframe = ttk.Frame(card, style="Card.TFrame"); gframe.grid(row=5,column=1, sticky='w')
-        ttk.Radiobutton(gframe, text='Male', variable=self.gender_var, value='Male').pack(side='left', padx=6)
-        ttk.Radiobutton(gframe, text='Female', variable=self.gender_var, value='Female').pack(side='left', padx=6)
-        ttk.Radiobutton(gframe, text='Other', variable=self.gender_var, value='Other').pack(side='left', padx=6)
-
-        ttk.Label(card, text="(Category determined by age: 8-12 Children, 13-19 Teenagers, 20-40 Adults)", wraplength=680).grid(row=6,column=0,columnspan=2,pady=(8,6))
-
-        btns = ttk.Frame(card); btns.grid(row=7,column=0,columnspan=2,pady=8)
-        ttk.Button(btns, text="Register", command=self.register_user).pack(side='left', padx=6)
-        ttk.Button(btns, text="Back to Login", command=lambda: controller.show_frame(LoginFrame)).pack(side='left', padx=6)
-
-        self.status = ttk.Label(self, text="", foreground=controller.colors['success']); self.status.pack(pady=6)
-        now = datetime.datetime.now().strftime("%A, %d %B %Y — %I:%M %p")
-        footer = ttk.Label(self, text=f"Registration time: {now}", font=('Segoe UI',9)); footer.pack(side='bottom', pady=8)
-
-    def determine_category(self, age):
-        age = int(age)
-        if 8 <= age <= 12:
-            return "Children"
-        if 13 <= age <= 19:
-            return "Teenagers"
-        if 20 <= age <= 40:
-            return "Adults"
-        return "Adults"
-
-    def register_user(self):
-        u = self.username.get().strip(); e = self.email.get().strip(); p = self.pw.get().strip(); p2 = self.pw2.get().strip()
-        try:
-            age = int(self.age_spin.get())
-        except:
-            messagebox.showerror("Invalid", "Enter a valid age.")
-            return
-        gender = self.gender_var.get()
-        if not (u and e and p):
-            messagebox.showerror("Missing", "Please fill all fields.")
-            return
-        if p != p2:
-            messagebox.showerror("Password", "Passwords do not match.")
-            return
-        cat = self.determine_category(age)
-        conn = sqlite3.connect(DB); cur = conn.cursor()
-        try:
-            cur.execute("INSERT INTO users (username, email, password_hash, age, gender, category, created_at) VALUES (?,?,?,?,?,?,?)",
-                        (u,e,hash_pw(p),age,gender,cat,datetime.datetime.now().isoformat()))
-            conn.commit()
-            self.status.config(text=f"Registered successfully as {cat}. You can login now.")
-            # clear
-            self.username.delete(0,'end'); self.email.delete(0,'end'); self.pw.delete(0,'end'); self.pw2.delete(0,'end')
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Duplicate", "Username or email already exists.")
-        finally:
-            conn.close()
-
-# --------------------------
-# Home / Category Selection
-# --------------------------
-class HomeFrame(ttk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent, padding=12)
-        self.controller = controller
-        header = ttk.Label(self, text="Dashboard — Select Quiz", font=self.controller.font_title, foreground=self.controller.colors['accent_dark'])
-        header.pack(pady=(6,10), anchor='w')
-
-        self.user_label = ttk.Label(self, text="", font=self.controller.font_main)
-        self.user_label.pack(pady=6, anchor='w')
-
-        card = ttk.Frame(self, style="Card.TFrame", padding=12)
-        card.pack(padx=6, pady=6, fill='x')
-
-        ttk.Label(card, text="Category:", style="Accent.TLabel").grid(row=0, column=0, sticky='w')
-        self.cat_var = tk.StringVar(value='Children')
-        self.cat_combo = ttk.Combobox(card, textvariable=self.cat_var, values=['Children','Teenagers','Adults'], state='readonly', width=20)
-        self.cat_combo.grid(row=0, column=1, padx=12, pady=6, sticky='w')
-
-        ttk.Label(card, text="Round:", style="Accent.TLabel").grid(row=1, column=0, sticky='w')
-        self.round_var = tk.StringVar(value='1')
-        self.round_combo = ttk.Combobox(card, textvariable=self.round_var, values=['1','2','3'], state='readonly', width=6)
-        self.round_combo.grid(row=1, column=1, padx=12, pady=6, sticky='w')
-
-        ttk.Label(card, text="Time limit (mins):", style="Accent.TLabel").grid(row=2, column=0, sticky='w')
-        self.time_entry = ttk.Entry(card, width=8); self.time_entry.insert(0,"0")
-        self.time_entry.grid(row=2, column=1, padx=12, pady=6, sticky='w')
-
-        btns = ttk.Frame(card); btns.grid(row=3, column=0, columnspan=2, pady=10)
-        ttk.Button(btns, text="Start Quiz", command=self.start_quiz).pack(side='left', padx=6)
-        ttk.Button(btns, text="Scoreboard", command=lambda: controller.show_frame(ScoreboardFrame)).pack(side='left', padx=6)
-        ttk.Button(btns, text="Logout", command=self.logout).pack(side='left', padx=6)
-
-        self.info_label = ttk.Label(self, text="", font=('Segoe UI',9)); self.info_label.pack(pady=8, anchor='w')
-
-    def on_show(self):
-        u = self.controller.current_user
-        if not u:
-            self.controller.show_frame(LoginFrame)
-            return
-        self.user_label.config(text=f"Hello, {u['username']} (Age: {u['age']}, Category: {u['category']})")
-        now = datetime.datetime.now().strftime("%A, %d %B %Y — %I:%M %p")
-        self.info_label.config(text=f"Current date & time: {now}")
-
-    def start_quiz(self):
-        cat = self.cat_var.get(); rnd = int(self.round_var.get())
-        try:
-            tmin = float(self.time_entry.get())
-        except:
-            messagebox.showerror("Invalid", "Enter a valid number for time limit.")
-            return
-        qframe = self.controller.frames[QuizFrame]
-        qframe.setup_quiz(category=cat, round_number=rnd, time_limit_minutes=tmin)
-        self.controller.show_frame(QuizFrame)
-
-    def logout(self):
-        self.controller.current_user = None
-        self.controller.show_frame(LoginFrame)
-
-# --------------------------
-# Quiz Page (category-based)
-# --------------------------
-class QuizFrame(ttk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent, padding=10)
-        self.controller = controller
-        self.questions = []
-        self.answers = []
-        self.current_index = 0
-        self.var_choice = tk.IntVar(value=-1)
-        self.timer_seconds = 0
-        self.timer_running = False
-        self.timer_id = None
-
-        header = ttk.Label(self, text="Quiz", font=self.controller.font_title, foreground=self.controller.colors['accent_dark'])
-        header.pack(pady=(2,8), anchor='w')
-
-        top = ttk.Frame(self); top.pack(fill='x', pady=(0,8))
-        self.progress_label = ttk.Label(top, text="Q 0 / 0"); self.progress_label.pack(side='left', padx=6)
-        self.time_label = ttk.Label(top, text=""); self.time_label.pack(side='right', padx=6)
-
-        self.qcard = ttk.Frame(self, style="Card.TFrame", padding=12); self.qcard.pack(fill='both', expand=True, padx=6, pady=6)
-        self.q_text = ttk.Label(self.qcard, text="", wraplength=820, font=('Segoe UI',12)); self.q_text.pack(pady=(6,12), anchor='w')
-        self.options_frame = ttk.Frame(self.qcard, style="Card.TFrame"); self.options_frame.pack(pady=6, anchor='w')
-
-        nav = ttk.Frame(self); nav.pack(pady=8)
-        self.prev_btn = ttk.Button(nav, text="◀ Previous", command=self.go_prev); self.prev_btn.grid(row=0,column=0,padx=6)
-        self.next_btn = ttk.Button(nav, text="Next ▶", command=self.go_next); self.next_btn.grid(row=0,column=1,padx=6)
-        self.submit_btn = ttk.Button(nav, text="Submit Quiz", command=self.submit_quiz); self.submit_btn.grid(row=0,column=2,padx=6)
-
-        self.qjump_frame = ttk.Frame(self, padding=6); self.qjump_frame.pack(pady=6, fill='x')
-        self.feedback = ttk.Label(self, text="", foreground=self.controller.colors['accent_dark']); self.feedback.pack(pady=6)
-
-    def setup_quiz(self, category='Children', round_number=1, time_limit_minutes=0):
-        rounds = build_rounds(category)
-        sel = rounds[round_number-1] if len(rounds)>=round_number else []
-        self.questions = sel.copy() if sel else QUESTION_BANK.get(category, []).copy()
-        random.shuffle(self.questions)
-        self.answers = [None] * len(self.questions)
-        self.current_index = 0
-        self.var_choice.set(-1)
-        self.build_qjump()
-        self.show_question()
-        # timer
-        self.timer_running = False
-        self.time_label.config(text="")
-        if time_limit_minutes and time_limit_minutes>0:
-            self.timer_seconds = int(time_limit_minutes*60)
-            self.timer_running = True
-            self.countdown()
-
-    def build_qjump(self):
-        for w in self.qjump_frame.winfo_children(): w.destroy()
-        ttk.Label(self.qjump_frame, text="Jump to:").pack(side='left', padx=(0,8))
-        for i in range(len(self.questions)):
-            b = ttk.Button(self.qjump_frame, text=str(i+1), width=3, command=lambda idx=i: self.goto_question(idx))
-            b.pack(side='left', padx=3, pady=3)
-
-    def show_question(self):
-        if not self.questions:
-            self.q_text.config(text="No questions for this category/round.")
-            self.progress_label.config(text="Q 0 / 0")
-            return
-        q = self.questions[self.current_index]
-        self.q_text.config(text=f"{self.current_index+1}. {q['q']}")
-        for w in self.options_frame.winfo_children(): w.destroy()
-        self.var_choice.set(-1 if self.answers[self.current_index] is None else self.answers[self.current_index])
-        for idx, opt in enumerate(q['options']):
-            r = ttk.Radiobutton(self.options_frame, text=opt, variable=self.var_choice, value=idx, command=self.save_choice)
-            r.pack(anchor='w', pady=4)
-        self.update_nav(); self.progress_label.config(text=f"Q {self.current_index+1} / {len(self.questions)}")
-        self.refresh_qjump_buttons(); self.feedback.config(text="")
-
-    def save_choice(self):
-        v = self.var_choice.get()
-        self.answers[self.current_index] = (None if v==-1 else int(v))
-        self.refresh_qjump_buttons()
-
-    def refresh_qjump_buttons(self):
-        children = self.qjump_frame.winfo_children()
-        # skip first label
-        for idx, widget in enumerate(children[1:], start=0):
-            if isinstance(widget, ttk.Button):
-                txt = str(idx+1)
-                if self.answers[idx] is not None: txt = f"{idx+1} *"
-                widget.config(text=txt)
-
-    def update_nav(self):
-        if self.current_index == 0: self.prev_btn.state(['disabled'])
-        else: self.prev_btn.state(['!disabled'])
-        if self.current_index >= len(self.questions)-1: self.next_btn.state(['disabled'])
-        else: self.next_btn.state(['!disabled'])
-
-    def go_prev(self):
-        self.save_choice()
-        if self.current_index>0:
-            self.current_index -= 1; self.show_question()
-
-    def go_next(self):
-        self.save_choice()
-        if self.current_index < len(self.questions)-1:
-            self.current_index += 1; self.show_question()
-
-    def goto_question(self, idx):
-        self.save_choice()
-        if 0 <= idx < len(self.questions):
-            self.current_index = idx; self.show_question()
-
-    def submit_quiz(self):
-        if not self.questions:
-            messagebox.showinfo("No quiz","No questions available."); return
-        if not messagebox.askyesno("Submit","Submit quiz now?"): return
-        self.timer_running=False
-        if self.timer_id: self.after_cancel(self.timer_id); self.timer_id=None
-        score=0; total=len(self.questions)
-        for i,q in enumerate(self.questions):
-            ans = self.answers[i]
-            if ans is not None and ans == q['answer']: score += 1
-        # save score
-        user = self.controller.current_user
-        conn = sqlite3.connect(DB); cur = conn.cursor()
-        cur.execute("INSERT INTO scores (user_id, score, total, category, timestamp) VALUES (?,?,?,?,?)",
-                    (user['id'], score, total, user['category'], datetime.datetime.now().isoformat()))
-        conn.commit(); conn.close()
-        messagebox.showinfo("Result", f"You scored {score}/{total}")
-        self.controller.show_frame(ScoreboardFrame)
-
-    def countdown(self):
-        if not self.timer_running:
-            self.time_label.config(text="")
-            return
-        mins, secs = divmod(self.timer_seconds, 60)
-        self.time_label.config(text=f"Time left: {mins:02d}:{secs:02d}")
-        if self.timer_seconds <= 0:
-            self.timer_running=False; messagebox.showinfo("Time's up","Auto-submitting quiz."); self.submit_quiz(); return
-        self.timer_seconds -= 1
-        self.timer_id = self.after(1000, self.countdown)
-
-# --------------------------
-# Scoreboard
-# --------------------------
-class ScoreboardFrame(ttk.Frame):
-    def __init__(self, parent, controller):
-        super().__init__(parent, padding=10)
-        self.controller = controller
-        header = ttk.Label(self, text="Scoreboard — Top Scores", font=self.controller.font_title, foreground=self.controller.colors['accent_dark'])
-        header.pack(pady=(6,8), anchor='w')
-
-        cols = ('user','score','total','cat','time')
-        self.tree = ttk.Treeview(self, columns=cols, show='headings', height=12)
-        for c,w in [('user',220), ('score',80), ('total',80), ('cat',140), ('time',200)]:
-            self.tree.heading(c, text=c.capitalize()); self.tree.column(c, width=w, anchor='center')
-        self.tree.pack(padx=8, pady=12, fill='x')
-
-        btns = ttk.Frame(self); btns.pack(pady=8)
-        ttk.Button(btns, text="Back to Home", command=lambda: controller.show_frame(HomeFrame)).pack(side='left', padx=6)
-        ttk.Button(btns, text="Refresh", command=self.load_scores).pack(side='left', padx=6)
-        ttk.Button(btns, text="Clear My Attempts", command=self.clear_my_attempts).pack(side='left', padx=6)
-
-    def on_show(self):
-        self.load_scores()
-
-    def load_scores(self):
-        for r in self.tree.get_children(): self.tree.delete(r)
-        conn = sqlite3.connect(DB); cur = conn.cursor()
-        cur.execute("""
-            SELECT u.username, s.score, s.total, s.category, s.timestamp
-            FROM scores s JOIN users u ON s.user_id = u.id
-            ORDER BY s.score DESC, s.timestamp DESC
-            LIMIT 50
-        """)
-        rows = cur.fetchall(); conn.close()
-        for r in rows: self.tree.insert('', 'end', values=r)
-
-    def clear_my_attempts(self):
-        u = self.controller.current_user
-        if not u: messagebox.showerror("Not logged in","Login first."); return
-        if not messagebox.askyesno("Confirm","Clear all your attempts?"): return
-        conn = sqlite3.connect(DB); cur = conn.cursor()
-        cur.execute("DELETE FROM scores WHERE user_id=?", (u['id'],)); conn.commit(); conn.close()
-        messagebox.showinfo("Cleared","Your attempts cleared."); self.load_scores()
-
-# --------------------------
-# Run
-# --------------------------
-def main():
-    init_db()
-    app = QuizApp()
-    app.mainloop()
-
-if __name__ == '__main__':
-    main()
+# quiz_app_colored.py
+# Run: python quiz_app_colored.py
+# A Tkinter-based quiz app: Login, Registration, Category-based quiz, scoreboard (SQLite).
+import time
+_IMPORT_T0 = time.perf_counter()
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import datetime
+import os
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from quiz_db import DB, get_repo, close_all
+from jobs import JobRunner
+from questions import ROUNDS, ROUND_SIZE
+from quiz_engine import QuizEngine, QuizError, RESET_CODE_TTL, determine_category
+import analytics
+import migrations
+import perf
+from timers import TimerService
+
+# --------------------------
+# Database helpers
+# --------------------------
+REMOTE = None  # quiz_client.RemoteEngine when started with --server URL
+
+def repo():
+    return get_repo(DB)
+
+def init_db():
+    if REMOTE: return REMOTE.ping()  # remote mode: no local database, just check the server answers
+    repo().init_schema()
+
+def engine():
+    # Quiz logic lives in quiz_engine.py; frames only collect input and render results.
+    return REMOTE or QuizEngine(repo())
+
+def local_only(what):
+    # Admin-style screens read the database directly; in remote mode they stay on the server.
+    if REMOTE: messagebox.showinfo("Not available", f"{what} is only available on the server machine.")
+    return REMOTE is not None
+
+# --------------------------
+# Questions live in SQLite (see questions.py); QUESTION_BANK there seeds a new database.
+# --------------------------
+def build_rounds(cat, k=ROUND_SIZE):
+    # k questions from each of the category's stored rounds; the rounds never overlap.
+    return [repo().round_questions(cat, r, k)[0] for r in range(1, ROUNDS+1)]
+
+# --------------------------
+# Gradient helper (Canvas + cached PhotoImage)
+# The header is a single image item instead of one canvas line per pixel row, so Tk has
+# one item to redraw on expose/resize. Images are memoized by (width, height, color1, color2).
+# --------------------------
+GRADIENT_CACHE_SIZE = 16
+_gradient_cache = OrderedDict()
+
+def hex_to_rgb(h):
+    h = h.lstrip('#'); return int(h[0:2],16), int(h[2:4],16), int(h[4:6],16)
+
+def gradient_rows(height, color1, color2):
+    # One '#rrggbb' per pixel row, same interpolation as the old per-line version.
+    r1,g1,b1 = hex_to_rgb(color1); r2,g2,b2 = hex_to_rgb(color2)
+    dr, dg, db = r2-r1, g2-g1, b2-b1
+    ts = [i / height for i in range(height)]
+    return [f'#{int(r1 + dr*t):02x}{int(g1 + dg*t):02x}{int(b1 + db*t):02x}' for t in ts]
+
+@perf.timed("ui.gradient_image")
+def gradient_image(width, height, color1, color2, master=None):
+    key = (width, height, color1, color2)
+    img = _gradient_cache.get(key)
+    if img is not None:
+        _gradient_cache.move_to_end(key)
+        return img
+    img = tk.PhotoImage(master=master, width=width, height=height)
+    # A 1-pixel-wide column tiled across the full width: one bulk put() per image.
+    column = ' '.join('{%s}' % c for c in gradient_rows(height, color1, color2))
+    img.put(column, to=(0, 0, width, height))
+    _gradient_cache[key] = img
+    while len(_gradient_cache) > GRADIENT_CACHE_SIZE:
+        _gradient_cache.popitem(last=False)  # canvases keep their own reference, so this is safe
+    return img
+
+@perf.timed("ui.create_gradient")
+def create_gradient(canvas_width, canvas_height, color1, color2, master=None):
+    c = tk.Canvas(master, width=canvas_width, height=canvas_height, highlightthickness=0)
+    c.gradient_size = (canvas_width, canvas_height)
+    c.gradient_img = gradient_image(canvas_width, canvas_height, color1, color2, master=c)
+    item = c.create_image(0, 0, image=c.gradient_img, anchor='nw')
+    c.tag_lower(item)
+    pending = []
+    def rerender():
+        pending.clear()
+        size = (max(1, c.winfo_width()), max(1, c.winfo_height()))
+        if size == c.gradient_size: return
+        c.gradient_size = size
+        c.gradient_img = gradient_image(size[0], size[1], color1, color2, master=c)
+        c.itemconfigure(item, image=c.gradient_img)
+    def on_resize(event):
+        # coalesce a burst of <Configure> events into one re-render once Tk is idle
+        if not pending: pending.append(c.after_idle(rerender))
+    c.bind('<Configure>', on_resize)
+    return c
+
+# --------------------------
+# Startup profiling (python niksha.py --profile-startup)
+# --------------------------
+class StartupProfile:
+    def __init__(self, t0=None):
+        self.t0 = _IMPORT_T0 if t0 is None else t0
+        self.steps = []
+
+    @contextmanager
+    def step(self, label):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, time.perf_counter() - t))
+
+    def mark(self, label, seconds):
+        self.steps.append((label, seconds))
+
+    def report(self, out=None):
+        out = out or sys.stderr
+        print("startup profile:", file=out)
+        for label, secs in self.steps:
+            print(f"  {label:<28} {secs*1000:8.1f} ms", file=out)
+        print(f"  {'total (import -> now)':<28} {(time.perf_counter()-self.t0)*1000:8.1f} ms", file=out)
+
+# --------------------------
+# Main application
+# --------------------------
+class QuizApp(tk.Tk):
+    def __init__(self, profile=None):
+        self.profile = profile or StartupProfile()
+        with self.profile.step("Tk root"):
+            super().__init__()
+        self.title("Beautiful Quiz App")
+        self.geometry("960x680")
+        self.minsize(860,620)
+
+        # Colors & styles
+        self.colors = {
+            'bg': '#EAF4FF',
+            'card': '#FFFFFF',
+            'accent': '#2E6BE6',
+            'accent_dark': '#234FAB',
+            'muted': '#25343B',
+            'success': '#2AA876',
+            'danger': '#E05A5A'
+        }
+        self.font_main = ('Segoe UI', 11)
+        self.font_title = ('Segoe UI', 18, 'bold')
+
+        with self.profile.step("style setup"):
+            self.setup_style()
+
+        # Schema work runs on the job pool; run_job() waits for it before any DB job.
+        self.jobs = JobRunner(self)
+        self.timers = TimerService(self)  # every countdown in the app shares one after() chain
+        self.db_ready = self.jobs.executor.submit(init_db)
+        self.current_user = None
+        self.frames = {}
+        self.container = ttk.Frame(self)
+        self.container.pack(fill='both', expand=True, padx=12, pady=12)
+        self.perf_overlay = None
+        self.bind_all('<F12>', lambda e: self.toggle_perf_overlay())
+        self.show_frame(LoginFrame)
+
+    def setup_style(self):
+        self.configure(bg=self.colors['bg'])
+        self.style = ttk.Style(self)
+        try:
+            self.style.theme_use('clam')
+        except:
+            pass
+        self.style.configure("TFrame", background=self.colors['bg'])
+        self.style.configure("Card.TFrame", background=self.colors['card'])
+        self.style.configure("TLabel", background=self.colors['bg'], foreground=self.colors['muted'], font=self.font_main)
+        self.style.configure("Accent.TLabel", background=self.colors['card'], foreground=self.colors['accent_dark'], font=self.font_main)
+        self.style.configure("Title.TLabel", background=self.colors['accent'], foreground='white', font=self.font_title)
+        self.style.configure("TButton", font=('Segoe UI',10,'bold'), padding=6)
+        self.style.map("TButton", background=[('active', self.colors['accent_dark'])])
+
+    def get_frame(self, frame_class):
+        # Frames are built the first time they are needed, not all at startup.
+        frame = self.frames.get(frame_class)
+        if frame is None:
+            with self.profile.step(f"build {frame_class.__name__}"):
+                frame = frame_class(parent=self.container, controller=self)
+                frame.grid(row=0, column=0, sticky='nsew')
+            self.frames[frame_class] = frame
+        return frame
+
+    def show_frame(self, frame_class):
+        frame = self.get_frame(frame_class)
+        frame.tkraise()
+        if hasattr(frame, 'on_show'):
+            frame.on_show()
+
+    def run_job(self, fn, *args, on_done=None, on_error=None, busy=(), quiet=False):
+        # Run DB work on the job pool; `busy` widgets stay disabled until the result is back.
+        # quiet=True is for background saves the user didn't ask for: no busy cursor.
+        for w in busy: w.state(['disabled'])
+        if not quiet: self.config(cursor='watch')
+        def finish():
+            for w in busy: w.state(['!disabled'])
+            if not quiet and not self.jobs.pending: self.config(cursor='')
+        # "job.<fn>" spans run from submit to the callback, so they include queueing and polling
+        label, t0 = "job." + getattr(fn, '__qualname__', type(fn).__name__), perf.now()
+        def done(result):
+            perf.record(label, perf.now() - t0)
+            finish()
+            if on_done: on_done(result)
+        def failed(exc):
+            perf.record(label, perf.now() - t0)
+            finish()
+            (on_error or self.show_job_error)(exc)
+        def task():
+            self.db_ready.result()  # re-raises if schema setup failed
+            return fn(*args)
+        return self.jobs.submit(task, on_done=done, on_error=failed)
+
+    def show_job_error(self, exc):
+        messagebox.showerror("Database error", f"Could not complete the request:\n{exc}")
+
+    def toggle_perf_overlay(self):
+        # F12: live span statistics (see perf.py)
+        if self.perf_overlay is None:
+            self.perf_overlay = PerfOverlay(self)
+        elif self.perf_overlay.winfo_viewable():
+            self.perf_overlay.hide()
+        else:
+            self.perf_overlay.show()
+
+# --------------------------
+# Perf overlay (F12): one row per span name, refreshed while visible
+# --------------------------
+SPARK = ' ▁▂▃▄▅▆▇█'
+
+def sparkline(counts):
+    peak = max(counts) or 1
+    return ''.join(SPARK[0] if c == 0 else SPARK[max(1, round(c / peak * (len(SPARK)-1)))] for c in counts)
+
+class PerfOverlay(tk.Toplevel):
+    REFRESH_MS = 500
+
+    def __init__(self, controller):
+        super().__init__(controller)
+        self.controller = controller
+        self.title("Performance")
+        self.geometry("820x420")
+        self.protocol('WM_DELETE_WINDOW', self.hide)  # F12 closes it too, through the app-wide toggle
+        top = ttk.Frame(self, padding=6); top.pack(fill='x')
+        self.recent_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text="Last 10 s only", variable=self.recent_var).pack(side='left')
+        ttk.Button(top, text="Export JSON…", command=self.export).pack(side='right', padx=4)
+        ttk.Button(top, text="Reset", command=self.reset).pack(side='right', padx=4)
+        self.lag_label = ttk.Label(top, text=""); self.lag_label.pack(side='left', padx=12)
+        cols = ('count', 'p50', 'p95', 'max', 'hist')
+        self.tree = ttk.Treeview(self, columns=cols, show='tree headings')
+        self.tree.heading('#0', text='Span'); self.tree.column('#0', width=260)
+        for c, w in [('count', 70), ('p50', 80), ('p95', 80), ('max', 80)]:
+            self.tree.heading(c, text=c if c == 'count' else f"{c} ms"); self.tree.column(c, width=w, anchor='e')
+        self.tree.heading('hist', text="histogram 0.1 ms … >1 s"); self.tree.column('hist', width=200)
+        self.tree.pack(fill='both', expand=True, padx=6, pady=(0,6))
+        self.rows = {}
+        self.refresh_id = None
+        self.show()
+
+    def show(self):
+        self.deiconify(); self.lift()
+        if self.refresh_id is None:
+            self.due = perf.now(); self.refresh()
+
+    def hide(self):
+        if self.refresh_id is not None:
+            self.after_cancel(self.refresh_id); self.refresh_id = None
+        self.withdraw()
+
+    def refresh(self):
+        # How late this callback ran is the Tk loop's own latency: record it as a span too.
+        perf.record("tk.loop_lag", max(0.0, perf.now() - self.due))
+        stats = perf.snapshot(window=10 if self.recent_var.get() else None)
+        for name in sorted(stats):
+            st = stats[name]
+            values = (st['count'], f"{st['p50_ms']:.2f}", f"{st['p95_ms']:.2f}", f"{st['max_ms']:.1f}", sparkline(st['histogram']))
+            item = self.rows.get(name)
+            if item is None:
+                self.rows[name] = self.tree.insert('', 'end', text=name, values=values)
+            else:
+                self.tree.item(item, values=values)
+        for name in [n for n in self.rows if n not in stats]:
+            self.tree.delete(self.rows.pop(name))
+        lag = stats.get("tk.loop_lag")
+        self.lag_label.config(text=f"Tk loop lag p95 {lag['p95_ms']:.1f} ms" if lag else "")
+        self.due = perf.now() + self.REFRESH_MS / 1000
+        self.refresh_id = self.after(self.REFRESH_MS, self.refresh)
+
+    def reset(self):
+        perf.reset()
+
+    def export(self):
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = filedialog.asksaveasfilename(parent=self, defaultextension='.json', initialfile=f"quiz-perf-{stamp}.json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            perf.export(path)
+
+# --------------------------
+# Login Page
+# --------------------------
+class LoginFrame(ttk.Frame):
+    def __init__(self, parent, controller):
+        super().__init__(parent, padding=14)
+        self.controller = controller
+
+        grad_frame = ttk.Frame(self, style="Card.TFrame")
+        grad_frame.pack(fill='x', pady=(0,10))
+        grad = create_gradient(920, 72, controller.colors['accent'], controller.colors['accent_dark'], master=grad_frame)
+        grad.pack(fill='x')
+        title = ttk.Label(grad, text="Welcome to Beautiful Quiz", style="Title.TLabel")
+        grad.create_window(460,36,window=title)
+
+        card = ttk.Frame(self, style="Card.TFrame", padding=16)
+        card.pack(padx=8, pady=8, fill='x')
+
+        ttk.Label(card, text="Username or Email:", style="Accent.TLabel").grid(row=0, column=0, sticky='w')
+        self.ident = ttk.Entry(card, width=36); self.ident.grid(row=0, column=1, pady=6, padx=8)
+
+        ttk.Label(card, text="Password:", style="Accent.TLabel").grid(row=1, column=0, sticky='w')
+        self.pw = ttk.Entry(card, width=36, show='*'); self.pw.grid(row=1, column=1, pady=6, padx=8)
+
+        btns = ttk.Frame(card, style="Card.TFrame"); btns.grid(row=2, column=0, columnspan=2, pady=10)
+        self.login_btn = ttk.Button(btns, text="Login", command=self.try_login); self.login_btn.grid(row=0,column=0,padx=6)
+        reg_btn = ttk.Button(btns, text="Register →", command=lambda: controller.show_frame(RegisterFrame)); reg_btn.grid(row=0,column=1,padx=6)
+
+        self.forgot_btn = ttk.Button(card, text="Forgot password?", command=self.forgot_password); self.forgot_btn.grid(row=3,column=0,columnspan=2,pady=(6,0))
+        self.message = ttk.Label(self, text="", foreground=controller.colors['danger'])
+        self.message.pack(pady=6)
+
+    def try_login(self):
+        ident = self.ident.get().strip(); pw = self.pw.get().strip()
+        if not ident or not pw:
+            self.message.config(text="Enter username/email and password.")
+            return
+        def done(user):
+            self.controller.current_user = user
+            self.ident.delete(0,'end'); self.pw.delete(0,'end'); self.message.config(text="")
+            self.controller.run_job(engine().resume, user, on_done=lambda found: self.offer_resume(user, found),
+                                    on_error=lambda exc: self.controller.show_frame(HomeFrame))
+        def failed(exc):
+            if isinstance(exc, QuizError): self.message.config(text=str(exc))
+            else: self.message.config(text=""); self.controller.show_job_error(exc)
+        self.message.config(text="Signing in…")
+        self.controller.run_job(engine().login, ident, pw, on_done=done, on_error=failed, busy=(self.login_btn,))
+
+    def offer_resume(self, user, found):
+        # found: (session, remaining_seconds) from an unfinished quiz, or None
+        if found is None:
+            self.controller.show_frame(HomeFrame); return
+        session, remaining = found
+        answered = sum(a is not None for a in session.answers)
+        left = f", {remaining//60:02d}:{remaining%60:02d} left" if remaining is not None else ""
+        if messagebox.askyesno("Resume quiz", f"You have an unfinished {session.category} round {session.round_number} quiz "
+                               f"({answered}/{len(session.questions)} answered{left}).\nResume it?"):
+            self.controller.get_frame(QuizFrame).start_quiz(session, remaining_seconds=remaining)
+            self.controller.show_frame(QuizFrame)
+        else:
+            self.controller.run_job(engine().discard_checkpoint, user, quiet=True, on_error=lambda exc: None)
+            self.controller.show_frame(HomeFrame)
+
+    def forgot_password(self):
+        if local_only("Password reset"): return
+        # The reset code comes from an administrator: python niksha.py reset-code USER
+        email = simpledialog.askstring("Forgot password", "Enter your registered email:")
+        if not email: return
+        code = simpledialog.askstring("Forgot password", "Enter the reset code from your administrator:")
+        if not code: return
+        newpw = simpledialog.askstring("Reset password", "Enter new password:", show='*')
+        if not newpw: return
+        def failed(exc):
+            if isinstance(exc, QuizError): messagebox.showerror("Reset failed", str(exc))
+            else: self.controller.show_job_error(exc)
+        self.controller.run_job(engine().reset_password, email, code, newpw, busy=(self.forgot_btn,), on_error=failed,
+                                on_done=lambda _: messagebox.showinfo("Success", "Password reset. Please login with new password."))
+
+# --------------------------
+# Registration Page
+# --------------------------
+class RegisterFrame(ttk.Frame):
+    def __init__(self, parent, controller):
+        super().__init__(parent, padding=12)
+        self.controller = controller
+        grad_frame = ttk.Frame(self, style="Card.TFrame")
+        grad_frame.pack(fill='x', pady=(0,8))
+        grad = create_gradient(920, 60, controller.colors['accent_dark'], controller.colors['accent'], master=grad_frame)
+        grad.pack(fill='x')
+        title = ttk.Label(grad, text="Create an Account", style="Title.TLabel"); grad.create_window(460,30,window=title)
+
+        card = ttk.Frame(self, style="Card.TFrame", padding=14); card.pack(padx=8,pady=8,fill='x')
+
+        ttk.Label(card, text="Username:", style="Accent.TLabel").grid(row=0,column=0, sticky='w')
+        self.username = ttk.Entry(card, width=36); self.username.grid(row=0,column=1,pady=6, padx=8)
+
+        ttk.Label(card, text="Email:", style="Accent.TLabel").grid(row=1,column=0, sticky='w')
+        self.email = ttk.Entry(card, width=36); self.email.grid(row=1,column=1,pady=6, padx=8)
+
+        ttk.Label(card, text="Password:", style="Accent.TLabel").grid(row=2,column=0, sticky='w')
+        self.pw = ttk.Entry(card, width=36, show='*'); self.pw.grid(row=2,column=1,pady=6, padx=8)
+
+        ttk.Label(card, text="Confirm Password:", style="Accent.TLabel").grid(row=3,column=0, sticky='w')
+        self.pw2 = ttk.Entry(card, width=36, show='*'); self.pw2.grid(row=3,column=1,pady=6, padx=8)
+
+        ttk.Label(card, text="Age:", style="Accent.TLabel").grid(row=4,column=0, sticky='w')
+        self.age_var = tk.IntVar(value=18)
+        self.age_spin = ttk.Spinbox(card, from_=8, to=100, textvariable=self.age_var, width=6); self.age_spin.grid(row=4,column=1, sticky='w', pady=6, padx=8)
+
+        ttk.Label(card, text="Gender:", style="Accent.TLabel").grid(row=5,column=0, sticky='w')
+        self.gender_var = tk.StringVar(value='Male')
+        gframe = ttk.Frame(card, style="Card.TFrame"); gframe.grid(row=5,column=1, sticky='w')
+        ttk.Radiobutton(gframe, text='Male', variable=self.gender_var, value='Male').pack(side='left', padx=6)
+        ttk.Radiobutton(gframe, text='Female', variable=self.gender_var, value='Female').pack(side='left', padx=6)
+        ttk.Radiobutton(gframe, text='Other', variable=self.gender_var, value='Other').pack(side='left', padx=6)
+
+        ttk.Label(card, text="(Category determined by age: 8-12 Children, 13-19 Teenagers, 20-40 Adults)", wraplength=680).grid(row=6,column=0,columnspan=2,pady=(8,6))
+
+        btns = ttk.Frame(card); btns.grid(row=7,column=0,columnspan=2,pady=8)
+        self.register_btn = ttk.Button(btns, text="Register", command=self.register_user); self.register_btn.pack(side='left', padx=6)
+        ttk.Button(btns, text="Back to Login", command=lambda: controller.show_frame(LoginFrame)).pack(side='left', padx=6)
+
+        self.status = ttk.Label(self, text="", foreground=controller.colors['success']); self.status.pack(pady=6)
+        now = datetime.datetime.now().strftime("%A, %d %B %Y — %I:%M %p")
+        footer = ttk.Label(self, text=f"Registration time: {now}", font=('Segoe UI',9)); footer.pack(side='bottom', pady=8)
+
+    def determine_category(self, age):
+        return determine_category(age)
+
+    def register_user(self):
+        u = self.username.get().strip(); e = self.email.get().strip(); p = self.pw.get().strip(); p2 = self.pw2.get().strip()
+        try:
+            age = int(self.age_spin.get())
+        except:
+            messagebox.showerror("Invalid", "Enter a valid age.")
+            return
+        gender = self.gender_var.get()
+        if not (u and e and p):
+            messagebox.showerror("Missing", "Please fill all fields.")
+            return
+        if p != p2:
+            messagebox.showerror("Password", "Passwords do not match.")
+            return
+        cat = self.determine_category(age)
+        def done(_):
+            self.status.config(text=f"Registered successfully as {cat}. You can login now.")
+            # clear
+            self.username.delete(0,'end'); self.email.delete(0,'end'); self.pw.delete(0,'end'); self.pw2.delete(0,'end')
+        def failed(exc):
+            self.status.config(text="")
+            if isinstance(exc, QuizError):
+                messagebox.showerror("Duplicate", str(exc))
+            else:
+                self.controller.show_job_error(exc)
+        self.status.config(text="Registering…")
+        self.controller.run_job(engine().register, u, e, p, age, gender,
+                                on_done=done, on_error=failed, busy=(self.register_btn,))
+
+# --------------------------
+# Home / Category Selection
+# --------------------------
+class HomeFrame(ttk.Frame):
+    def __init__(self, parent, controller):
+        super().__init__(parent, padding=12)
+        self.controller = controller
+        header = ttk.Label(self, text="Dashboard — Select Quiz", font=self.controller.font_title, foreground=self.controller.colors['accent_dark'])
+        header.pack(pady=(6,10), anchor='w')
+
+        self.user_label = ttk.Label(self, text="", font=self.controller.font_main)
+        self.user_label.pack(pady=6, anchor='w')
+
+        card = ttk.Frame(self, style="Card.TFrame", padding=12)
+        card.pack(padx=6, pady=6, fill='x')
+
+        ttk.Label(card, text="Category:", style="Accent.TLabel").grid(row=0, column=0, sticky='w')
+        self.cat_var = tk.StringVar(value='Children')
+        self.cat_combo = ttk.Combobox(card, textvariable=self.cat_var, values=['Children','Teenagers','Adults'], state='readonly', width=20)
+        self.cat_combo.grid(row=0, column=1, padx=12, pady=6, sticky='w')
+
+        ttk.Label(card, text="Round:", style="Accent.TLabel").grid(row=1, column=0, sticky='w')
+        self.round_var = tk.StringVar(value='1')
+        self.round_combo = ttk.Combobox(card, textvariable=self.round_var, values=['1','2','3'], state='readonly', width=6)
+        self.round_combo.grid(row=1, column=1, padx=12, pady=6, sticky='w')
+
+        ttk.Label(card, text="Time limit (mins):", style="Accent.TLabel").grid(row=2, column=0, sticky='w')
+        self.time_entry = ttk.Entry(card, width=8); self.time_entry.insert(0,"0")
+        self.time_entry.grid(row=2, column=1, padx=12, pady=6, sticky='w')
+
+        ttk.Label(card, text="Per question (secs):", style="Accent.TLabel").grid(row=3, column=0, sticky='w')
+        self.qtime_entry = ttk.Entry(card, width=8); self.qtime_entry.insert(0,"0")
+        self.qtime_entry.grid(row=3, column=1, padx=12, pady=6, sticky='w')
+
+        btns = ttk.Frame(card); btns.grid(row=4, column=0, columnspan=2, pady=10)
+        ttk.Button(btns, text="Start Quiz", command=self.start_quiz).pack(side='left', padx=6)
+        ttk.Button(btns, text="Scoreboard", command=lambda: controller.show_frame(ScoreboardFrame)).pack(side='left', padx=6)
+        ttk.Button(btns, text="Analytics", command=lambda: local_only("Analytics") or controller.show_frame(AnalyticsFrame)).pack(side='left', padx=6)
+        ttk.Button(btns, text="Logout", command=self.logout).pack(side='left', padx=6)
+
+        self.info_label = ttk.Label(self, text="", font=('Segoe UI',9)); self.info_label.pack(pady=8, anchor='w')
+
+    def on_show(self):
+        u = self.controller.current_user
+        if not u:
+            self.controller.show_frame(LoginFrame)
+            return
+        self.user_label.config(text=f"Hello, {u['username']} (Age: {u['age']}, Category: {u['category']})")
+        now = datetime.datetime.now().strftime("%A, %d %B %Y — %I:%M %p")
+        self.info_label.config(text=f"Current date & time: {now}")
+
+    def start_quiz(self):
+        cat = self.cat_var.get(); rnd = int(self.round_var.get())
+        try:
+            tmin = float(self.time_entry.get()); qsecs = float(self.qtime_entry.get() or 0)
+        except:
+            messagebox.showerror("Invalid", "Enter a valid number for time limit.")
+            return
+        qframe = self.controller.get_frame(QuizFrame)
+        qframe.setup_quiz(category=cat, round_number=rnd, time_limit_minutes=tmin, question_seconds=qsecs)
+        self.controller.show_frame(QuizFrame)
+
+    def logout(self):
+        self.controller.current_user = None
+        self.controller.show_frame(LoginFrame)
+
+# --------------------------
+# Widget pool: recycle a fixed set of widgets instead of destroy/recreate
+# --------------------------
+class WidgetPool:
+    def __init__(self, parent, factory, **pack_opts):
+        self.parent = parent
+        self.factory = factory  # factory(parent, slot) -> widget
+        self.pack_opts = pack_opts
+        self.widgets = []
+        self.opts = []  # last options pushed to each widget
+        self.visible = 0
+
+    def set(self, slot, **opts):
+        # Only options that actually changed are sent to Tk.
+        while len(self.widgets) <= slot:
+            self.widgets.append(self.factory(self.parent, len(self.widgets))); self.opts.append({})
+        last = self.opts[slot]
+        changed = {k: v for k, v in opts.items() if last.get(k) != v}
+        if changed:
+            self.widgets[slot].configure(**changed); last.update(changed)
+        return self.widgets[slot]
+
+    def show(self, n):
+        # Pack/unpack just the slots whose visibility changed; order is kept because
+        # slots are always shown as a prefix.
+        for w in self.widgets[n:self.visible]: w.pack_forget()
+        for w in self.widgets[self.visible:n]: w.pack(**self.pack_opts)
+        self.visible = n
+
+# --------------------------
+# Quiz Page (category-based)
+# --------------------------
+JUMP_WINDOW = 15  # jump buttons shown at once; long quizzes page through them
+CHECKPOINT_EVERY = 15  # seconds between quiz checkpoints
+
+def clock_text(secs):
+    mins, secs = divmod(secs, 60)
+    return f"{mins:02d}:{secs:02d}"
+
+class QuizFrame(ttk.Frame):
+    def __init__(self, parent, controller):
+        super().__init__(parent, padding=10)
+        self.controller = controller
+        self.session = None
+        self.questions = []
+        self.answers = []
+        self.current_index = 0
+        self.var_choice = tk.IntVar(value=-1)
+        # timers.Timer handles on controller.timers; stop_timers() cancels all three
+        self.round_timer = None     # whole-quiz limit (None = untimed)
+        self.question_timer = None  # per-question limit, restarted by show_question
+        self.checkpoint_timer = None
+        self.question_seconds = 0
+        self.changes = 0           # bumped on every answer/navigation; compared against the last checkpoint
+        self.saved_changes = 0
+        self.submitting = False    # no checkpoints while the submit job is in flight
+
+        header = ttk.Label(self, text="Quiz", font=self.controller.font_title, foreground=self.controller.colors['accent_dark'])
+        header.pack(pady=(2,8), anchor='w')
+
+        top = ttk.Frame(self); top.pack(fill='x', pady=(0,8))
+        self.progress_label = ttk.Label(top, text="Q 0 / 0"); self.progress_label.pack(side='left', padx=6)
+        self.time_label = ttk.Label(top, text=""); self.time_label.pack(side='right', padx=6)
+
+        self.qcard = ttk.Frame(self, style="Card.TFrame", padding=12); self.qcard.pack(fill='both', expand=True, padx=6, pady=6)
+        self.q_text = ttk.Label(self.qcard, text="", wraplength=820, font=('Segoe UI',12)); self.q_text.pack(pady=(6,12), anchor='w')
+        self.options_frame = ttk.Frame(self.qcard, style="Card.TFrame"); self.options_frame.pack(pady=6, anchor='w')
+
+        nav = ttk.Frame(self); nav.pack(pady=8)
+        self.prev_btn = ttk.Button(nav, text="◀ Previous", command=self.go_prev); self.prev_btn.grid(row=0,column=0,padx=6)
+        self.next_btn = ttk.Button(nav, text="Next ▶", command=self.go_next); self.next_btn.grid(row=0,column=1,padx=6)
+        self.submit_btn = ttk.Button(nav, text="Submit Quiz", command=self.submit_quiz); self.submit_btn.grid(row=0,column=2,padx=6)
+
+        self.option_pool = WidgetPool(self.options_frame, lambda parent, slot: ttk.Radiobutton(
+            parent, variable=self.var_choice, value=slot, command=self.save_choice), anchor='w', pady=4)
+
+        self.qjump_frame = ttk.Frame(self, padding=6); self.qjump_frame.pack(pady=6, fill='x')
+        ttk.Label(self.qjump_frame, text="Jump to:").pack(side='left', padx=(0,8))
+        self.jump_prev = ttk.Button(self.qjump_frame, text="«", width=2, command=lambda: self.page_qjump(-1))
+        self.jump_prev.pack(side='left', padx=3)
+        jump_slots = ttk.Frame(self.qjump_frame); jump_slots.pack(side='left')
+        self.jump_next = ttk.Button(self.qjump_frame, text="»", width=2, command=lambda: self.page_qjump(1))
+        self.jump_next.pack(side='left', padx=3)
+        self.jump_range = ttk.Label(self.qjump_frame, text=""); self.jump_range.pack(side='left', padx=8)
+        self.jump_pool = WidgetPool(jump_slots, lambda parent, slot: ttk.Button(
+            parent, width=4, command=lambda: self.goto_question(self.jump_start + slot)), side='left', padx=3, pady=3)
+        self.jump_start = 0
+        self.feedback = ttk.Label(self, text="", foreground=self.controller.colors['accent_dark']); self.feedback.pack(pady=6)
+
+    def setup_quiz(self, category='Children', round_number=1, time_limit_minutes=0, question_seconds=0):
+        # Questions are sampled on the job pool; the quiz starts once they arrive.
+        self.stop_timers()
+        self.session = None; self.questions = []; self.answers = []
+        self.q_text.config(text="Loading questions…")
+        self.option_pool.show(0); self.jump_pool.show(0); self.jump_range.config(text="")
+        self.controller.run_job(engine().start_round, self.controller.current_user, category, round_number,
+                                on_done=lambda session: self.start_quiz(session, time_limit_minutes, question_seconds=question_seconds),
+                                busy=(self.submit_btn,))
+
+    def start_quiz(self, session, time_limit_minutes=0, remaining_seconds=None, question_seconds=0):
+        # questions/answers alias the session's lists, so the engine sees every click.
+        # remaining_seconds restores a checkpointed timer (None = untimed) instead of the limit.
+        self.stop_timers()
+        self.session = session
+        self.questions = session.questions
+        self.answers = session.answers
+        self.current_index = session.current_index
+        self.var_choice.set(-1)
+        self.time_label.config(text="")
+        if remaining_seconds is None and time_limit_minutes and time_limit_minutes>0:
+            remaining_seconds = time_limit_minutes*60
+        timers = self.controller.timers
+        if remaining_seconds is not None and self.questions:
+            self.round_timer = timers.start(remaining_seconds, self.round_expired, on_tick=lambda s: self.show_time())
+        self.question_seconds = question_seconds if question_seconds and question_seconds > 0 else 0
+        self.changes = 1; self.saved_changes = 0
+        self.submitting = False
+        if self.questions:
+            self.checkpoint_timer = timers.every(CHECKPOINT_EVERY, self.checkpoint)
+        self.build_qjump()
+        self.show_question()
+        self.show_time()
+
+    def stop_timers(self):
+        timers = self.controller.timers
+        for t in (self.round_timer, self.question_timer, self.checkpoint_timer): timers.cancel(t)
+        self.round_timer = self.question_timer = self.checkpoint_timer = None
+
+    def show_time(self):
+        parts = []
+        if self.round_timer: parts.append(f"Time left: {clock_text(self.round_timer.seconds_left())}")
+        if self.question_timer: parts.append(f"This question: {clock_text(self.question_timer.seconds_left())}")
+        self.time_label.config(text="   ".join(parts))
+
+    def round_expired(self):
+        self.round_timer = None
+        self.stop_timers(); self.show_time()
+        messagebox.showinfo("Time's up","Auto-submitting quiz.")
+        self.submit_quiz(confirm=False)
+
+    def question_expired(self):
+        # Out of time for this question: move on, or submit after the last one.
+        self.question_timer = None
+        if self.current_index < len(self.questions)-1:
+            self.go_next()
+        else:
+            self.stop_timers(); self.show_time()
+            self.submit_quiz(confirm=False)
+
+    def build_qjump(self):
+        # At most JUMP_WINDOW pooled buttons, whatever the quiz length.
+        self.jump_start = 0
+        self.refresh_qjump_buttons()
+
+    def page_qjump(self, step):
+        start = self.jump_start + step*JUMP_WINDOW
+        if 0 <= start < len(self.questions):
+            self.jump_start = start; self.refresh_qjump_buttons()
+
+    def show_question(self):
+        if not self.questions:
+            self.q_text.config(text="No questions for this category/round.")
+            self.progress_label.config(text="Q 0 / 0")
+            return
+        q = self.questions[self.current_index]
+        self.session.visit(self.current_index)
+        if self.session.current_index != self.current_index:
+            self.session.current_index = self.current_index; self.changes += 1
+        if self.question_seconds:
+            # a fresh per-question clock every time a question is shown
+            self.controller.timers.cancel(self.question_timer); self.question_timer = None
+            self.question_timer = self.controller.timers.start(self.question_seconds, self.question_expired,
+                                                               on_tick=lambda s: self.show_time())
+            self.show_time()
+        self.q_text.config(text=f"{self.current_index+1}. {q['q']}")
+        self.var_choice.set(-1 if self.answers[self.current_index] is None else self.answers[self.current_index])
+        for idx, opt in enumerate(q['options']):
+            self.option_pool.set(idx, text=opt)
+        self.option_pool.show(len(q['options']))
+        self.update_nav(); self.progress_label.config(text=f"Q {self.current_index+1} / {len(self.questions)}")
+        # keep the current question inside the visible jump window
+        start = self.current_index - self.current_index % JUMP_WINDOW
+        if start != self.jump_start:
+            self.jump_start = start; self.refresh_qjump_buttons()
+        self.feedback.config(text="")
+
+    def save_choice(self):
+        v = self.var_choice.get()
+        if not self.answers or self.submitting: return
+        before = self.answers[self.current_index]
+        self.session.answer(self.current_index, v)
+        if self.answers[self.current_index] != before: self.changes += 1
+        self.refresh_qjump_buttons(only=self.current_index)
+
+    def jump_text(self, idx):
+        return f"{idx+1} *" if self.answers[idx] is not None else str(idx+1)
+
+    def refresh_qjump_buttons(self, only=None):
+        # only=idx updates just that question's button (if it is in the visible window)
+        start, n = self.jump_start, len(self.questions)
+        if only is not None:
+            if start <= only < start + self.jump_pool.visible:
+                self.jump_pool.set(only - start, text=self.jump_text(only))
+            return
+        end = min(n, start + JUMP_WINDOW)
+        for idx in range(start, end):
+            self.jump_pool.set(idx - start, text=self.jump_text(idx))
+        self.jump_pool.show(end - start)
+        self.jump_prev.state(['!disabled'] if start > 0 else ['disabled'])
+        self.jump_next.state(['!disabled'] if end < n else ['disabled'])
+        self.jump_range.config(text=f"{start+1}–{end} of {n}" if n > JUMP_WINDOW else "")
+
+    def update_nav(self):
+        if self.current_index == 0: self.prev_btn.state(['disabled'])
+        else: self.prev_btn.state(['!disabled'])
+        if self.current_index >= len(self.questions)-1: self.next_btn.state(['disabled'])
+        else: self.next_btn.state(['!disabled'])
+
+    def go_prev(self):
+        self.save_choice()
+        if self.current_index>0:
+            self.current_index -= 1; self.show_question()
+
+    def go_next(self):
+        self.save_choice()
+        if self.current_index < len(self.questions)-1:
+            self.current_index += 1; self.show_question()
+
+    def goto_question(self, idx):
+        self.save_choice()
+        if 0 <= idx < len(self.questions):
+            self.current_index = idx; self.show_question()
+
+    def submit_quiz(self, confirm=True):
+        if not self.questions or self.session is None:
+            messagebox.showinfo("No quiz","No questions available."); return
+        if confirm and not messagebox.askyesno("Submit","Submit quiz now?"): return
+        self.stop_timers()  # includes the checkpoint timer
+        self.submitting = True
+        def done(result):
+            score, total = result
+            self.session = None  # submitted: the checkpoint went with it
+            self.feedback.config(text="")
+            messagebox.showinfo("Result", f"You scored {score}/{total}")
+            self.controller.show_frame(ScoreboardFrame)
+        def failed(exc):
+            self.submitting = False
+            self.update_nav(); self.refresh_qjump_buttons()  # busy re-enabled them all
+            self.feedback.config(text="Could not save your score — press Submit to retry.")
+            self.controller.show_job_error(exc)
+        self.feedback.config(text="Saving your score…")
+        # answering or moving on while the score is saved would log answers the score never sees
+        busy = (self.submit_btn, self.prev_btn, self.next_btn, self.jump_prev, self.jump_next,
+                *self.option_pool.widgets[:self.option_pool.visible], *self.jump_pool.widgets[:self.jump_pool.visible])
+        self.controller.run_job(engine().submit, self.session, on_done=done, on_error=failed, busy=busy)
+
+    def checkpoint(self, sync=False):
+        # Save questions ids/answers/position/time left so the quiz survives a crash.
+        # Runs every CHECKPOINT_EVERY seconds off the timer service, and on close.
+        # Untimed quizzes are only rewritten when something changed; timed ones always, for the clock.
+        if self.session is None or not self.questions or self.submitting: return
+        if not self.round_timer and self.changes == self.saved_changes: return
+        snap = self.session.snapshot(self.round_timer.seconds_left() if self.round_timer else None)
+        self.saved_changes = self.changes
+        if sync:
+            engine().save_checkpoint(snap); return
+        self.controller.run_job(engine().save_checkpoint, snap, quiet=True, on_error=lambda exc: None)
+
+# --------------------------
+# Scoreboard
+# --------------------------
+SCOREBOARD_VIEWS = ['All attempts', 'My attempts'] + [f'Best: {c}' for c in ('Children','Teenagers','Adults')]
+SCORE_PAGES = 4  # pages kept in the Treeview; scrolling pages the rest in and out
+
+class ScoreboardFrame(ttk.Frame):
+    # The Treeview holds a window of at most SCORE_PAGES keyset pages (items keyed by score id).
+    # Scrolling near either end fetches the neighbouring page and drops the one furthest away.
+    # Refresh first compares leaderboard.version() with the last one seen and, only if it
+    # moved, re-reads the window and applies the difference: inserts, moves, deletes.
+    def __init__(self, parent, controller):
+        super().__init__(parent, padding=10)
+        self.controller = controller
+        header = ttk.Label(self, text="Scoreboard — Top Scores", font=self.controller.font_title, foreground=self.controller.colors['accent_dark'])
+        header.pack(pady=(6,8), anchor='w')
+
+        top = ttk.Frame(self); top.pack(fill='x', padx=8)
+        ttk.Label(top, text="View:").pack(side='left')
+        self.view_var = tk.StringVar(value=SCOREBOARD_VIEWS[0])
+        view_combo = ttk.Combobox(top, textvariable=self.view_var, values=SCOREBOARD_VIEWS, state='readonly', width=22)
+        view_combo.pack(side='left', padx=8)
+        view_combo.bind('<<ComboboxSelected>>', lambda e: self.load_scores())
+        self.load_seq = 0
+        self.status = ttk.Label(top, text=""); self.status.pack(side='right')
+
+        board = ttk.Frame(self); board.pack(padx=8, pady=12, fill='x')
+        cols = ('user','score','total','cat','time')
+        self.tree = ttk.Treeview(board, columns=cols, show='headings', height=12)
+        for c,w in [('user',220), ('score',80), ('total',80), ('cat',140), ('time',200)]:
+            self.tree.heading(c, text=c.capitalize()); self.tree.column(c, width=w, anchor='center')
+        self.scrollbar = ttk.Scrollbar(board, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side='left', fill='x', expand=True); self.scrollbar.pack(side='right', fill='y')
+
+        btns = ttk.Frame(self); btns.pack(pady=8)
+        ttk.Button(btns, text="Back to Home", command=lambda: controller.show_frame(HomeFrame)).pack(side='left', padx=6)
+        self.refresh_btn = ttk.Button(btns, text="Refresh", command=self.refresh); self.refresh_btn.pack(side='left', padx=6)
+        self.clear_btn = ttk.Button(btns, text="Clear My Attempts", command=self.clear_my_attempts); self.clear_btn.pack(side='left', padx=6)
+        self.reset_window(None)
+
+    def reset_window(self, key):
+        self.view_key = key     # (view, user id) the window was loaded for
+        self.version = None     # leaderboard.version() the window reflects
+        self.starts = [None]    # starts[i]: keyset cursor that page i begins after
+        self.first = 0          # index of the first page in the window
+        self.pages = []         # [[iid, ...], ...] for the pages in the window, top to bottom
+        self.next = None        # cursor after the last page in the window (None = end of board)
+        self.values = {}        # iid -> values currently shown
+        self.paging = False
+
+    def on_show(self):
+        self.refresh()
+
+    @staticmethod
+    def fetch_page(view, user, after):
+        # runs on the job pool
+        if view == 'My attempts':
+            return engine().scores('mine', user, after=after)
+        if view.startswith('Best: '):
+            return engine().scores('best', category=view[len('Best: '):], after=after)
+        return engine().scores('all', after=after)
+
+    @classmethod
+    def fetch_window(cls, view, user, after, pages, known):
+        # runs on the job pool: (version, None) if nothing changed since `known`, else
+        # (version, ([(after, rows), ...], next cursor)). The version is read first, so the rows
+        # are at least that new.
+        version = engine().board_version()
+        if version == known:
+            return version, None
+        out = []
+        for _ in range(pages):
+            rows, cursor = cls.fetch_page(view, user, after)
+            out.append((after, rows)); after = cursor
+            if cursor is None: break
+        return version, (out, after)
+
+    def load_scores(self):
+        # view changed: start over at the top
+        self.refresh(reset=True)
+
+    def refresh(self, reset=False):
+        user = self.controller.current_user
+        key = (self.view_var.get(), user['id'] if user else None)
+        if reset or key != self.view_key:
+            children = self.tree.get_children()
+            if children: self.tree.delete(*children)
+            self.reset_window(key)
+        self.load_seq += 1; seq = self.load_seq
+        def done(result):
+            if seq != self.load_seq: return
+            self.version, window = result
+            self.paging = False
+            if window is not None: self.apply_window(*window)
+            self.status.config(text="" if self.pages and self.pages[0] else "No attempts yet.")
+        def failed(exc):
+            if seq != self.load_seq: return
+            self.paging = False
+            self.status.config(text="Failed to load scores.", foreground=self.controller.colors['danger'])
+        self.status.config(text="Loading…", foreground=self.controller.colors['muted'])
+        self.paging = True  # no scroll paging while the window is being re-read
+        self.controller.run_job(self.fetch_window, key[0], user, self.starts[self.first], max(1, len(self.pages)),
+                                self.version, on_done=done, on_error=failed, busy=(self.refresh_btn,))
+
+    def apply_window(self, pages, next_cursor):
+        # Make the Treeview show exactly these pages, touching only rows that differ.
+        want = [(str(r[-1]), tuple(r[:-1])) for _, rows in pages for r in rows]
+        wanted = {iid for iid, _ in want}
+        children = self.tree.get_children()
+        stale = [iid for iid in children if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale: self.values.pop(iid, None)
+        order = [iid for iid in children if iid in wanted]
+        present = set(order)
+        for i, (iid, vals) in enumerate(want):
+            if iid not in present:
+                self.tree.insert('', i, iid=iid, values=vals); order.insert(i, iid); present.add(iid)
+            elif order[i] != iid:
+                self.tree.move(iid, '', i); order.remove(iid); order.insert(i, iid)
+            if self.values.get(iid) != vals:
+                if iid in self.values: self.tree.item(iid, values=vals)
+                self.values[iid] = vals
+        del self.starts[self.first:]
+        self.starts.extend(after for after, _ in pages)
+        self.pages = [[str(r[-1]) for r in rows] for _, rows in pages]
+        self.next = next_cursor
+
+    # ---- windowed scrolling ----
+    def on_scroll(self, lo, hi):
+        self.scrollbar.set(lo, hi)
+        if self.paging or self.view_key is None: return
+        if float(hi) > 0.95 and self.next is not None:
+            self.page(down=True)
+        elif float(lo) < 0.05 and self.first > 0:
+            self.page(down=False)
+
+    def page(self, down):
+        self.paging = True
+        seq = self.load_seq
+        index = self.first + len(self.pages) if down else self.first - 1
+        after = self.next if down else self.starts[index]
+        def done(result):
+            if seq != self.load_seq: return  # a refresh replaced the window meanwhile
+            self.paging = False
+            rows, cursor = result
+            rows = [r for r in rows if not self.tree.exists(str(r[-1]))]  # the board moved under us
+            total = len(self.tree.get_children())
+            top = round(float(self.tree.yview()[0]) * total)  # first visible row
+            at = 'end' if down else 0
+            for r in (rows if down else reversed(rows)):
+                iid = str(r[-1]); self.values[iid] = tuple(r[:-1])
+                self.tree.insert('', at, iid=iid, values=self.values[iid])
+            iids = [str(r[-1]) for r in rows]
+            if down:
+                self.pages.append(iids); self.next = cursor
+                if len(self.starts) <= index: self.starts.append(after)
+            else:
+                self.pages.insert(0, iids); self.first -= 1; top += len(iids)
+            if len(self.pages) > SCORE_PAGES:
+                # drop the page furthest from the view, keeping the visible rows where they are
+                dropped = self.pages.pop(0) if down else self.pages.pop()
+                self.tree.delete(*dropped)
+                for iid in dropped: self.values.pop(iid, None)
+                if down:
+                    self.first += 1; top -= len(dropped)
+                else:
+                    self.next = self.starts[self.first + len(self.pages)]
+            total = len(self.tree.get_children())
+            if total: self.tree.yview_moveto(max(0, top) / total)
+        def failed(exc):
+            if seq == self.load_seq: self.paging = False
+        self.controller.run_job(self.fetch_page, self.view_key[0], self.controller.current_user, after,
+                                on_done=done, on_error=failed, quiet=True)
+
+    def clear_my_attempts(self):
+        u = self.controller.current_user
+        if not u: messagebox.showerror("Not logged in","Login first."); return
+        if not messagebox.askyesno("Confirm","Clear all your attempts?"): return
+        def done(_):
+            messagebox.showinfo("Cleared","Your attempts cleared."); self.refresh()
+        self.controller.run_job(engine().clear_scores, u, on_done=done, busy=(self.clear_btn,))
+
+# --------------------------
+# Analytics (aggregates from analytics.py, refreshed incrementally)
+# --------------------------
+class AnalyticsFrame(ttk.Frame):
+    def __init__(self, parent, controller):
+        super().__init__(parent, padding=10)
+        self.controller = controller
+        header = ttk.Label(self, text="Analytics — Score Statistics", font=self.controller.font_title, foreground=self.controller.colors['accent_dark'])
+        header.pack(pady=(6,8), anchor='w')
+
+        top = ttk.Frame(self); top.pack(fill='x', padx=8)
+        ttk.Label(top, text="Category:").pack(side='left')
+        self.cat_var = tk.StringVar(value='Children')
+        cat_combo = ttk.Combobox(top, textvariable=self.cat_var, values=['Children','Teenagers','Adults'], state='readonly', width=16)
+        cat_combo.pack(side='left', padx=8)
+        cat_combo.bind('<<ComboboxSelected>>', lambda e: self.render())
+        self.status = ttk.Label(top, text=""); self.status.pack(side='right')
+
+        card = ttk.Frame(self, style="Card.TFrame", padding=12); card.pack(fill='x', padx=8, pady=8)
+        self.summary = ttk.Label(card, text="", style="Accent.TLabel", justify='left'); self.summary.pack(anchor='w')
+
+        lists = ttk.Frame(self); lists.pack(fill='both', expand=True, padx=8)
+        self.dist = ttk.Treeview(lists, columns=('range','count','bar'), show='headings', height=10)
+        for c,w in [('range',90), ('count',90), ('bar',260)]:
+            self.dist.heading(c, text=c.capitalize()); self.dist.column(c, width=w, anchor='w' if c=='bar' else 'center')
+        self.dist.pack(side='left', fill='both', expand=True, padx=(0,6))
+        self.trend = ttk.Treeview(lists, columns=('day','attempts','mean'), show='headings', height=10)
+        for c,w in [('day',120), ('attempts',90), ('mean',90)]:
+            self.trend.heading(c, text=c.capitalize()); self.trend.column(c, width=w, anchor='center')
+        self.trend.pack(side='left', fill='both', expand=True)
+
+        ttk.Label(self, text="Hardest questions").pack(anchor='w', padx=8, pady=(8,0))
+        self.items = ttk.Treeview(self, columns=('question','correct','time','answered'), show='headings', height=5)
+        for c,w in [('question',420), ('correct',90), ('time',90), ('answered',90)]:
+            self.items.heading(c, text=c.capitalize()); self.items.column(c, width=w, anchor='w' if c=='question' else 'center')
+        self.items.pack(fill='x', padx=8)
+
+        btns = ttk.Frame(self); btns.pack(pady=8)
+        ttk.Button(btns, text="Back to Home", command=lambda: controller.show_frame(HomeFrame)).pack(side='left', padx=6)
+        self.refresh_btn = ttk.Button(btns, text="Refresh", command=self.load); self.refresh_btn.pack(side='left', padx=6)
+        self.stats = {}; self.item_rows = {}; self.ranks = {}
+
+    @staticmethod
+    def fetch(user_id=None):
+        # runs on the job pool: refresh aggregates, then read them
+        stats = repo().score_stats()
+        ranks = {cat: (score, total, rank) for cat, score, total, rank in repo().user_ranks(user_id, stats)} if user_id else {}
+        return stats, {c: repo().question_stats(c, limit=10) for c in ('Children','Teenagers','Adults')}, ranks
+
+    def on_show(self):
+        u = self.controller.current_user
+        if u: self.cat_var.set(u['category'])
+        self.load()
+
+    def load(self):
+        def done(result):
+            self.stats, self.item_rows, self.ranks = result; self.status.config(text=""); self.render()
+        def failed(exc):
+            self.status.config(text="Failed to load statistics.")
+        self.status.config(text="Updating…")
+        u = self.controller.current_user
+        self.controller.run_job(self.fetch, u['id'] if u else None, on_done=done, on_error=failed, busy=(self.refresh_btn,))
+
+    def render(self):
+        for t in (self.dist, self.trend, self.items):
+            for r in t.get_children(): t.delete(r)
+        for qid, text, cat, answered, rate, secs in self.item_rows.get(self.cat_var.get(), []):
+            self.items.insert('', 'end', values=(text, f"{rate:.0%}", f"{secs:.1f}s", answered))
+        s = self.stats.get(self.cat_var.get())
+        if not s:
+            self.summary.config(text="No attempts in this category yet."); return
+        mine = self.ranks.get(self.cat_var.get())
+        self.summary.config(text=(f"{s['attempts']} attempts · mean {s['mean']:.0%} · pass rate {s['pass_rate']:.0%} "
+                                  f"(pass mark {analytics.PASS_MARK:.0%})\n"
+                                  f"Percentiles: 25th {s['p25']:.0%} · median {s['p50']:.0%} · 75th {s['p75']:.0%} · 90th {s['p90']:.0%}"
+                                  + (f"\nYour best: {mine[0]}/{mine[1]} · better than {mine[2]:.0%} of attempts" if mine else "")))
+        peak = max(s['distribution']) or 1
+        for i, c in enumerate(s['distribution']):
+            lo, hi = i*100//analytics.BINS, (i+1)*100//analytics.BINS
+            self.dist.insert('', 'end', values=(f"{lo}-{hi}%", c, '█' * round(30*c/peak)))
+        for day, n, mean in reversed(s['trend']):
+            self.trend.insert('', 'end', values=(day, n, f"{mean:.0%}"))
+
+# handlers and on_show/render hooks are "ui.<Frame>.<method>" spans
+for _cls in (QuizApp, LoginFrame, RegisterFrame, HomeFrame, QuizFrame, ScoreboardFrame, AnalyticsFrame):
+    perf.instrument(_cls, f"ui.{_cls.__name__}", skip=('run_job', 'toggle_perf_overlay', 'jump_text'))
+
+# --------------------------
+# Run
+# --------------------------
+def cli(argv):
+    # Command-line tools: python niksha.py import FILE | export FILE | report | rounds | migrate | reset-code USER
+    # (FILE may be '-')
+    import argparse
+    import json
+    import question_io
+    ap = argparse.ArgumentParser(prog='niksha.py', description="Quiz app question bank tools.")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    imp = sub.add_parser('import', help="stream a CSV/JSONL question file into the database")
+    imp.add_argument('file'); imp.add_argument('--format', choices=['csv','jsonl'])
+    imp.add_argument('--chunk', type=int, default=question_io.CHUNK, help="rows per transaction")
+    exp = sub.add_parser('export', help="stream the question bank out as CSV/JSONL")
+    exp.add_argument('file'); exp.add_argument('--format', choices=['csv','jsonl'])
+    exp.add_argument('--category')
+    rpt = sub.add_parser('report', help="score statistics per category (incremental refresh)")
+    rpt.add_argument('--category'); rpt.add_argument('--json', action='store_true')
+    rpt.add_argument('--rebuild', action='store_true', help="recompute from all scores instead of new rows only")
+    rpt.add_argument('--user', action='append', default=[], metavar='NAME',
+                     help="also show this user's best scores and their percentile ranks (repeatable)")
+    rnds = sub.add_parser('rounds', help="show how each category is split into rounds")
+    rnds.add_argument('--category')
+    rnds.add_argument('--rebuild', action='store_true', help="re-deal the rounds from scratch (seen history is kept)")
+    rnds.add_argument('--seed', type=int, help="seed for --rebuild (default QUIZ_ROUND_SEED)")
+    mig = sub.add_parser('migrate', help="upgrade the database layout now and report size/query times")
+    mig.add_argument('--chunk', type=int, default=migrations.CHUNK, help="rows copied per transaction")
+    mig.add_argument('--vacuum', action='store_true', help="VACUUM afterwards to give the freed pages back")
+    rst = sub.add_parser('reset-code', help="issue a one-time code a user needs to reset their password")
+    rst.add_argument('user', help="username or email")
+    args = ap.parse_args(argv)
+    if args.cmd == 'migrate':
+        return migrate(args)
+    init_db()
+    try:
+        if args.cmd == 'import':
+            st = question_io.import_questions(repo(), args.file, args.format, chunk=args.chunk)
+            print(f"read {st['read']}, inserted {st['inserted']}, duplicates {st['duplicates']}, "
+                  f"invalid {st['invalid']} in {st['seconds']:.2f}s ({st['rows_per_sec']:.0f} rows/sec)", file=sys.stderr)
+        elif args.cmd == 'report':
+            t0 = time.perf_counter()
+            with repo().transaction() as conn:
+                n = (analytics.rebuild if args.rebuild else analytics.refresh)(conn)
+            stats = repo().score_stats(args.category, refresh=False)
+            users = [(name, repo().find_user(name)) for name in args.user]
+            ranks = [(name, row[1] if row else None, repo().user_ranks(row[0], stats) if row else []) for name, row in users]
+            if args.json:
+                out = {c: {k: v for k, v in s.items() if not k.startswith('_')} for c, s in stats.items()}
+                out['questions'] = [dict(zip(('id','text','category','answered','correct_rate','avg_seconds'), r))
+                                    for r in repo().question_stats(args.category)]
+                out['users'] = [{'user': name, 'found': username is not None,
+                                 'ranks': [dict(zip(('category','score','total','percentile_rank'), r)) for r in rows]}
+                                for name, username, rows in ranks]
+                print(json.dumps(out, indent=2))
+            else:
+                print(analytics.format_report(stats) or "No attempts yet.")
+                items = repo().question_stats(args.category)
+                if items: print(analytics.format_items(items))
+                for name, username, rows in ranks:
+                    print(analytics.format_ranks(username, rows) if username else f"{name}: no such user")
+            print(f"processed {n} new score rows in {time.perf_counter()-t0:.2f}s", file=sys.stderr)
+        elif args.cmd == 'reset-code':
+            try:
+                username, code = engine().issue_reset_code(args.user)
+            except QuizError as exc:
+                print(exc, file=sys.stderr); return 1
+            print(code)
+            print(f"reset code for {username}, valid for {RESET_CODE_TTL // 60} minutes", file=sys.stderr)
+        elif args.cmd == 'rounds':
+            if args.rebuild:
+                n = repo().plan_rounds(args.category, rebuild=True, seed=args.seed)
+                print(f"re-dealt {n} questions", file=sys.stderr)
+            sizes = {}
+            for cat, rnd, diff, n in repo().round_sizes(args.category):
+                sizes.setdefault((cat, rnd), []).append(f"d{diff}:{n}")
+            for (cat, rnd), parts in sizes.items():
+                print(f"{cat:<12} round {rnd}: {' '.join(parts)}")
+        else:
+            st = question_io.export_questions(repo(), args.file, args.format, category=args.category)
+            print(f"exported {st['written']} questions in {st['seconds']:.2f}s ({st['rows_per_sec']:.0f} rows/sec)", file=sys.stderr)
+    finally:
+        close_all()
+    return 0
+
+def migrate(args):
+    # Runs before init_db() so the "before" numbers are taken on the old layout.
+    line = {'table': None}  # table whose progress line is still open
+    def progress(table, done, total):
+        # one line per table, ended when the table is done (or, if rows vanished mid-copy, when the next starts)
+        if line['table'] not in (None, table): print(file=sys.stderr)
+        line['table'] = None if done >= total else table
+        print(f"\r{table}: {done}/{total}", end='\n' if done >= total else '', file=sys.stderr, flush=True)
+    try:
+        before = migrations.measure(repo())
+        t0 = time.perf_counter()
+        applied = migrations.upgrade(repo(), chunk=args.chunk, progress=progress)
+        init_db()
+        if line['table']: print(file=sys.stderr)
+        if args.vacuum:
+            with repo().pool.connection() as conn:
+                conn.execute("VACUUM")
+        print(f"applied {len(applied)} migration(s) in {time.perf_counter()-t0:.2f}s"
+              + "".join(f"\n  {name}" for name in applied), file=sys.stderr)
+        print(migrations.format_report(before, migrations.measure(repo())))
+    finally:
+        close_all()
+    return 0
+
+def main():
+    # python niksha.py [--profile-startup] [--server http://host:8765] | <cli command>
+    # F12 toggles the perf overlay; QUIZ_PERF_OUT=file.json dumps the spans on exit.
+    global REMOTE
+    import argparse
+    # add_help=False: --help (and anything else not listed here) is for cli()
+    ap = argparse.ArgumentParser(prog='niksha.py', add_help=False, allow_abbrev=False)
+    ap.add_argument('--profile-startup', action='store_true')
+    ap.add_argument('--server', metavar='URL', default=os.environ.get('QUIZ_SERVER'))
+    opts, argv = ap.parse_known_args(sys.argv[1:])
+    if argv:
+        sys.exit(cli(argv))
+    profile_startup = opts.profile_startup
+    if opts.server:
+        from quiz_client import RemoteEngine
+        REMOTE = RemoteEngine(opts.server)
+    profile = StartupProfile()
+    profile.mark("import", _IMPORT_DONE - _IMPORT_T0)
+    app = QuizApp(profile=profile)
+    if profile_startup:
+        with profile.step("first paint"):
+            app.update()
+        with profile.step("schema (background)"):
+            app.db_ready.result()
+        profile.report()
+    try:
+        app.mainloop()
+    finally:
+        app.jobs.shutdown(wait=True)
+        quiz = app.frames.get(QuizFrame)
+        if quiz is not None:
+            try: quiz.checkpoint(sync=True)  # closing mid-quiz keeps the latest answers
+            except Exception: pass
+        close_all()
+        if os.environ.get('QUIZ_PERF_OUT'):
+            perf.export(os.environ['QUIZ_PERF_OUT'])  # spans of the whole session, for offline analysis
+
+_IMPORT_DONE = time.perf_counter()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# passwords.py
+# Salted password hashing (PBKDF2-HMAC-SHA256 or scrypt, both from hashlib).
+# Stored format:  pbkdf2_sha256$<iterations>$<salt b64>$<hash b64>
+#                 scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>
+# Legacy rows are a bare unsalted sha256 hex digest; verify() accepts them and asks for a rehash.
+# These calls are deliberately slow: run them on the job pool, never on the Tk thread.
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+
+SCHEME = os.environ.get("QUIZ_PW_SCHEME", "pbkdf2_sha256")
+PBKDF2_ITERATIONS = int(os.environ.get("QUIZ_PBKDF2_ITERATIONS", "240000"))
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2**14, 8, 1
+SALT_BYTES = 16
+CACHE_SIZE = 256
+
+
+def _b64(b):
+    return base64.b64encode(b).decode("ascii")
+
+
+def hash_password(pw, scheme=None, cost=None):
+    # cost: iterations for pbkdf2_sha256, N (power of two) for scrypt
+    scheme = scheme or SCHEME
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "pbkdf2_sha256":
+        it = cost or PBKDF2_ITERATIONS
+        dk = hashlib.pbkdf2_hmac("sha256", pw.encode("utf-8"), salt, it)
+        return f"pbkdf2_sha256${it}${_b64(salt)}${_b64(dk)}"
+    if scheme == "scrypt":
+        n = cost or SCRYPT_N
+        dk = hashlib.scrypt(pw.encode("utf-8"), salt=salt, n=n, r=SCRYPT_R, p=SCRYPT_P,
+                            maxmem=256 * n * SCRYPT_R, dklen=32)
+        return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(dk)}"
+    raise ValueError(f"unknown password scheme {scheme!r}")
+
+
+def _derive(pw, stored):
+    # Recompute the digest for `pw` with the parameters embedded in `stored`.
+    parts = stored.split("$")
+    if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+        it, salt, dk = int(parts[1]), base64.b64decode(parts[2]), base64.b64decode(parts[3])
+        return hashlib.pbkdf2_hmac("sha256", pw.encode("utf-8"), salt, it, len(dk)), dk
+    if parts[0] == "scrypt" and len(parts) == 6:
+        n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+        salt, dk = base64.b64decode(parts[4]), base64.b64decode(parts[5])
+        return hashlib.scrypt(pw.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r, dklen=len(dk)), dk
+    if len(stored) == 64 and "$" not in stored:
+        # legacy unsalted sha256
+        return hashlib.sha256(pw.encode("utf-8")).hexdigest().encode(), stored.encode()
+    raise ValueError("unrecognized password hash format")
+
+
+def needs_rehash(stored):
+    parts = (stored or "").split("$")
+    if parts[0] != SCHEME:
+        return True
+    if SCHEME == "pbkdf2_sha256":
+        return int(parts[1]) < PBKDF2_ITERATIONS
+    return int(parts[1]) < SCRYPT_N
+
+
+# Successful verifications are remembered so re-checking the same password against the same
+# stored hash skips the KDF. Keys are HMACs under a per-process secret, never the password;
+# a reset changes the stored hash, which makes the old entry unreachable.
+_cache_key = os.urandom(32)
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_id(pw, stored):
+    return hmac.new(_cache_key, stored.encode() + b"\0" + pw.encode("utf-8"), hashlib.sha256).digest()
+
+
+def verify_password(pw, stored):
+    # Returns (ok, needs_rehash). Safe to call from worker threads.
+    if not stored:
+        return False, False
+    key = _cache_id(pw, stored)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return True, needs_rehash(stored)
+    try:
+        got, want = _derive(pw, stored)
+    except ValueError:
+        return False, False
+    ok = hmac.compare_digest(got, want)
+    if ok:
+        with _cache_lock:
+            _cache[key] = True
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return ok, ok and needs_rehash(stored)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,149 @@
+# perf.py
+# Lightweight timing spans for the app, the engine and the database layer.
+# Every span name keeps its last RING durations in a ring buffer (percentiles and histograms
+# come from those), plus a running count/total/max over the whole run. Recording a span is
+# two perf_counter() calls and a deque append, so it stays on in normal use; QUIZ_PERF=0
+# turns it off.
+#   with perf.span("db.migrate"): ...
+#   @perf.timed("ui.gradient")
+#   perf.instrument(Repository, "db")   # every public method of a class
+# export() writes everything to JSON for offline analysis (niksha.py's F12 overlay shows it live).
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("QUIZ_PERF", "1") != "0"
+RING = 512
+# histogram bucket upper edges in seconds; the last bucket is everything slower
+EDGES = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+now = time.perf_counter
+
+
+class Stats:
+    __slots__ = ("ring", "count", "total", "max")
+
+    def __init__(self):
+        self.ring = deque(maxlen=RING)  # (end time, seconds)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+_stats = {}
+_lock = threading.Lock()
+_t0 = now()
+
+
+def record(name, seconds):
+    with _lock:
+        st = _stats.get(name)
+        if st is None:
+            st = _stats[name] = Stats()
+        st.ring.append((now(), seconds))
+        st.count += 1
+        st.total += seconds
+        if seconds > st.max: st.max = seconds
+
+
+@contextmanager
+def span(name):
+    if not ENABLED:
+        yield; return
+    t = now()
+    try:
+        yield
+    finally:
+        record(name, now() - t)
+
+
+def timed(name=None):
+    # Decorator; the span is named after the function unless given a name.
+    def wrap(fn):
+        label = name or fn.__qualname__
+        if inspect.isgeneratorfunction(getattr(fn, "__wrapped__", None)):
+            # a @contextmanager factory: time the whole with-block, not just building the manager
+            @functools.wraps(fn)
+            @contextmanager
+            def cm(*args, **kwargs):
+                with span(label), fn(*args, **kwargs) as value:
+                    yield value
+            return cm
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            t = now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, now() - t)
+        return wrapper
+    return wrap
+
+
+def instrument(cls, prefix, skip=()):
+    # Wrap each public method defined on cls (not inherited ones) in a "<prefix>.<method>" span.
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or attr in skip:
+            continue
+        if isinstance(value, (staticmethod, classmethod)):
+            setattr(cls, attr, type(value)(timed(f"{prefix}.{attr}")(value.__func__)))
+        elif inspect.isfunction(value):
+            setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+    return cls
+
+
+def _pct(sorted_vals, p):
+    return sorted_vals[min(len(sorted_vals) - 1, int(p / 100.0 * len(sorted_vals)))] if sorted_vals else 0.0
+
+
+def histogram(durations):
+    counts = [0] * (len(EDGES) + 1)
+    for d in durations:
+        i = 0
+        while i < len(EDGES) and d > EDGES[i]:
+            i += 1
+        counts[i] += 1
+    return counts
+
+
+def snapshot(window=None):
+    # {name: summary} with percentiles over the ring; window=seconds keeps only recent spans.
+    cutoff = now() - window if window else None
+    with _lock:
+        items = [(n, st.count, st.total, st.max, [d for t, d in st.ring if cutoff is None or t >= cutoff])
+                 for n, st in _stats.items()]
+    out = {}
+    for name, count, total, peak, recent in items:
+        vals = sorted(recent)
+        out[name] = {"count": count, "total_s": total, "mean_ms": total / count * 1000, "max_ms": peak * 1000,
+                     "recent": len(vals), "p50_ms": _pct(vals, 50) * 1000, "p95_ms": _pct(vals, 95) * 1000,
+                     "p99_ms": _pct(vals, 99) * 1000, "histogram": histogram(vals)}
+    return out
+
+
+def spans(name=None):
+    # Raw (offset from start in seconds, duration in seconds) pairs still in the rings.
+    with _lock:
+        return {n: [(round(t - _t0, 6), d) for t, d in st.ring]
+                for n, st in _stats.items() if name is None or n == name}
+
+
+def export(path):
+    data = {"created": time.time(), "uptime_s": now() - _t0, "ring": RING,
+            "histogram_edges_s": list(EDGES), "summary": snapshot(), "spans": spans()}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+    return path
+
+
+def reset():
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,173 @@
+# question_io.py
+# Streaming import/export of question banks as CSV or JSONL.
+# Rows are read one at a time and written in chunked transactions (executemany), so memory
+# stays flat whatever the file size. Duplicates are skipped by content hash.
+#
+# Record fields (CSV header or JSON keys):
+#   category, question (or q/text), options, answer, [round], [difficulty], [tags]
+# In CSV, options/tags are '|'-separated (or a JSON list); option1..optionN columns also work.
+import csv
+import json
+import sys
+import time
+from contextlib import nullcontext
+
+import questions
+import rounds
+
+CHUNK = 5000
+MAX_VARS = 900  # host parameters per statement; SQLite before 3.32 allows at most 999
+INSERT = ("INSERT OR IGNORE INTO questions (category, round, difficulty, text, options, answer, content_hash, slot) "
+          "VALUES (?,?,?,?,?,?,?,?)")
+TAG = ("INSERT OR IGNORE INTO question_tags (tag, category, rkey, question_id) "
+       "SELECT ?, category, rkey, id FROM questions WHERE content_hash=?")
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _split(value):
+    if isinstance(value, list):
+        return value
+    value = (value or "").strip()
+    if value.startswith("["):
+        return json.loads(value)
+    return [v.strip() for v in value.split("|") if v.strip()] if value else []
+
+
+def read_records(fp, fmt):
+    # Yields (line number, raw dict); malformed JSON lines come through as (n, ValueError).
+    if fmt == "csv":
+        for n, rec in enumerate(csv.DictReader(fp), start=2):
+            yield n, rec
+        return
+    for n, line in enumerate(fp, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield n, json.loads(line)
+        except ValueError as e:
+            yield n, e
+
+
+def validate(rec):
+    # Normalizes one raw record into an INSERT row plus its tags; raises ValueError if invalid.
+    if isinstance(rec, Exception):
+        raise ValueError(f"bad JSON: {rec}")
+    category = (rec.get("category") or "").strip()
+    text = (rec.get("question") or rec.get("q") or rec.get("text") or "").strip()
+    if "options" in rec:
+        options = _split(rec["options"])
+    else:
+        options = [rec[k] for k in sorted((k for k in rec if k and k.startswith("option") and rec[k]),
+                                          key=lambda k: int(k[6:] or 0))]
+    if not category or not text:
+        raise ValueError("category and question are required")
+    if len(options) < 2:
+        raise ValueError("need at least two options")
+    try:
+        answer = int(rec.get("answer"))
+    except (TypeError, ValueError):
+        raise ValueError(f"answer must be an integer index, got {rec.get('answer')!r}")
+    if not 0 <= answer < len(options):
+        raise ValueError(f"answer index {answer} out of range for {len(options)} options")
+    rnd = rec.get("round")
+    rnd = int(rnd) if rnd not in (None, "") else None  # None: the round scheduler places it
+    diff = rec.get("difficulty")
+    diff = int(diff) if diff not in (None, "") else 1
+    h = questions.content_hash(category, text, options, answer)
+    row = (category, rnd, diff, text, json.dumps([str(o) for o in options]), answer, h)
+    return row, [(t, h) for t in _split(rec.get("tags"))]
+
+
+def import_questions(repo, path, fmt=None, chunk=CHUNK, errors=sys.stderr, max_errors=20):
+    fmt = detect_format(path, fmt)
+    stats = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0}
+    rows, tags = [], []
+    placer = rounds.Placer()  # rows go in already dealt into rounds
+    t0 = time.perf_counter()
+
+    def flush():
+        with repo.transaction() as conn:
+            # known duplicates are dropped before placement so they don't take a slot
+            hashes = [r[-1] for r in rows]
+            known = set()
+            for i in range(0, len(hashes), MAX_VARS):
+                part = hashes[i:i + MAX_VARS]
+                known.update(h for (h,) in conn.execute(f"SELECT content_hash FROM questions WHERE content_hash IN "
+                                                        f"({','.join('?' * len(part))})", part))
+            planned = []
+            for cat, rnd, diff, *rest in rows:
+                if rest[-1] in known: continue
+                known.add(rest[-1])
+                rnd, slot = placer.place(conn, cat, diff, rnd)
+                planned.append((cat, rnd, diff, *rest, slot))
+            before = conn.total_changes
+            conn.executemany(INSERT, planned)
+            added = conn.total_changes - before
+            placer.save(conn)
+            if tags:
+                conn.executemany(TAG, tags)
+        stats["inserted"] += added
+        stats["duplicates"] += len(rows) - added
+        rows.clear(); tags.clear()
+
+    with (nullcontext(sys.stdin) if path == "-" else open(path, newline="", encoding="utf-8")) as fp:
+        for n, rec in read_records(fp, fmt):
+            stats["read"] += 1
+            try:
+                row, row_tags = validate(rec)
+            except (ValueError, AttributeError) as e:
+                stats["invalid"] += 1
+                if errors and stats["invalid"] <= max_errors:
+                    print(f"{path}:{n}: skipped: {e}", file=errors)
+                continue
+            rows.append(row); tags.extend(row_tags)
+            if len(rows) >= chunk:
+                flush()
+        if rows:
+            flush()
+    stats["seconds"] = time.perf_counter() - t0
+    stats["rows_per_sec"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+EXPORT = """
+    SELECT q.id, q.category, q.round, q.difficulty, q.text, q.options, q.answer,
+           (SELECT group_concat(tag, '|') FROM question_tags t WHERE t.question_id = q.id)
+    FROM questions q {where} ORDER BY q.id
+"""
+
+
+def export_questions(repo, path, fmt=None, category=None, chunk=CHUNK):
+    fmt = detect_format(path, fmt)
+    where, params = ("WHERE q.category = ?", (category,)) if category else ("", ())
+    count = 0
+    t0 = time.perf_counter()
+    with (nullcontext(sys.stdout) if path == "-" else open(path, "w", newline="", encoding="utf-8")) as out:
+        writer = None
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["category", "question", "options", "answer", "round", "difficulty", "tags"])
+        with repo.pool.connection() as conn:
+            cur = conn.execute(EXPORT.format(where=where), params)
+            while True:
+                batch = cur.fetchmany(chunk)
+                if not batch:
+                    break
+                for qid, cat, rnd, diff, text, options, answer, tags in batch:
+                    if writer:
+                        opts = json.loads(options)
+                        # fall back to a JSON list when an option itself contains the separator
+                        opts = options if any("|" in o for o in opts) else "|".join(opts)
+                        writer.writerow([cat, text, opts, answer, rnd, diff, tags or ""])
+                    else:
+                        out.write(json.dumps({"category": cat, "question": text, "options": json.loads(options),
+                                              "answer": answer, "round": rnd, "difficulty": diff,
+                                              "tags": tags.split("|") if tags else []}, ensure_ascii=False) + "\n")
+                count += len(batch)
+    dt = time.perf_counter() - t0
+    return {"written": count, "seconds": dt, "rows_per_sec": count / dt if dt else 0.0}
@@ -0,0 +1,130 @@
+# questions.py
+# SQLite-backed question store. Round membership is assigned by rounds.py (questions.slot is
+# its per-category ordinal) and quizzes are drawn by rounds.pick_ids / adaptive.pick_ids.
+# Every question gets a random 63-bit `rkey`; those pickers start at a random key and walk
+# the index from there (wrapping around) instead of loading and shuffling a whole round.
+# Tags are stored for import/export round-trips.
+import hashlib
+import json
+
+# A small sample bank, loaded into an empty database on first run.
+# each question: {'q':..., 'options':[...], 'answer': index}
+QUESTION_BANK = {
+    "Children": [
+        {'q': "Which animal says 'moo'?", 'options': ['Dog','Cow','Cat','Sheep'], 'answer': 1},
+        {'q': "How many legs does a spider have?", 'options': ['6','8','4','10'], 'answer': 1},
+        {'q': "Which of these is a primary color?", 'options': ['Green','Purple','Red','Brown'], 'answer': 2},
+    ],
+    "Teenagers": [
+        {'q': "Which tech is used to secure websites (HTTPS)?", 'options': ['FTP','SSL/TLS','SMTP','POP3'], 'answer': 1},
+        {'q': "What does 2FA stand for?", 'options': ['Two-Factor Auth','Two-File Auth','Two-Fold Access','None'], 'answer': 0},
+        {'q': "Which subject studies living things?", 'options': ['Physics','Chemistry','Biology','Math'], 'answer': 2},
+    ],
+    "Adults": [
+        {'q': "Which index commonly measures inflation?", 'options': ['CPI','GDP','GNP','PPI'], 'answer': 0},
+        {'q': "Which of these is renewable energy?", 'options': ['Coal','Solar','Oil','Natural Gas'], 'answer': 1},
+        {'q': "What is diversification in investing mainly for?", 'options': ['Increase taxes','Reduce risk','Guarantee profit','Increase fees'], 'answer': 1},
+    ]
+}
+
+ROUNDS = 3
+ROUND_SIZE = 10
+MAX_KEY = (1 << 63) - 1
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT NOT NULL,
+        round INTEGER,
+        difficulty INTEGER NOT NULL DEFAULT 1,
+        text TEXT NOT NULL,
+        options TEXT NOT NULL,
+        answer INTEGER NOT NULL,
+        rkey INTEGER NOT NULL DEFAULT (random() & {MAX_KEY}),
+        content_hash TEXT,
+        slot INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_questions_cat ON questions(category, rkey)",
+    "DROP INDEX IF EXISTS idx_questions_diff",  # served the removed difficulty-filtered sampler
+    """
+    CREATE TABLE IF NOT EXISTS question_tags (
+        tag TEXT NOT NULL,
+        category TEXT NOT NULL,
+        rkey INTEGER NOT NULL,
+        question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+        PRIMARY KEY (tag, category, rkey, question_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_question_tags_qid ON question_tags(question_id)",
+]
+# created after the content_hash backfill for databases that predate the column
+HASH_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_hash ON questions(content_hash)"
+
+COLS = "id, category, round, difficulty, text, options, answer"
+
+
+def content_hash(category, text, options, answer):
+    # Identity of a question for de-duplication: same category, wording, options and answer.
+    payload = json.dumps([category, text.strip(), [str(o).strip() for o in options], int(answer)],
+                         ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _backfill_hashes(conn, chunk=5000):
+    last = 0
+    while True:
+        rows = conn.execute("SELECT id, category, text, options, answer FROM questions "
+                            "WHERE id > ? AND content_hash IS NULL ORDER BY id LIMIT ?", (last, chunk)).fetchall()
+        if not rows:
+            return
+        conn.executemany("UPDATE OR IGNORE questions SET content_hash=? WHERE id=?",
+                         [(content_hash(c, t, json.loads(o), a), i) for i, c, t, o, a in rows])
+        last = rows[-1][0]
+
+
+def ensure(conn):
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(questions)")}
+    if 'content_hash' not in cols:
+        conn.execute("ALTER TABLE questions ADD COLUMN content_hash TEXT")
+        _backfill_hashes(conn)
+    conn.execute(HASH_INDEX)
+    if conn.execute("SELECT 1 FROM questions LIMIT 1").fetchone() is None:
+        for cat, bank in QUESTION_BANK.items():
+            for q in bank:
+                add(conn, cat, q['q'], q['options'], q['answer'])  # rounds.plan() deals them into rounds
+
+
+def add(conn, category, text, options, answer, round=None, difficulty=1, tags=()):
+    if not 0 <= int(answer) < len(options):
+        raise ValueError(f"answer index {answer} out of range for {len(options)} options")
+    # round=None leaves placement to rounds.plan(), which must run before the question is served.
+    # Raises sqlite3.IntegrityError if an identical question is already stored.
+    qid = conn.execute(
+        "INSERT INTO questions (category, round, difficulty, text, options, answer, content_hash) VALUES (?,?,?,?,?,?,?)",
+        (category, round, difficulty, text, json.dumps(list(options)), int(answer),
+         content_hash(category, text, options, answer))).lastrowid
+    for tag in tags:
+        conn.execute("INSERT OR IGNORE INTO question_tags (tag, category, rkey, question_id) "
+                     "SELECT ?, category, rkey, id FROM questions WHERE id=?", (tag, qid))
+    return qid
+
+
+def to_dict(row):
+    qid, category, rnd, difficulty, text, options, answer = row
+    return {'id': qid, 'q': text, 'options': json.loads(options), 'answer': answer,
+            'category': category, 'round': rnd, 'difficulty': difficulty}
+
+
+def fetch(conn, ids):
+    # Load full questions for a list of ids, preserving the given order.
+    if not ids:
+        return []
+    rows = conn.execute(f"SELECT {COLS} FROM questions WHERE id IN ({','.join('?' * len(ids))})", list(ids)).fetchall()
+    by_id = {r[0]: to_dict(r) for r in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+
@@ -0,0 +1,103 @@
+# quiz_client.py
+# Remote engine: the QuizEngine interface spoken over HTTP to server.py, so the Tk frames
+# and the load harness can run against a shared server unchanged.
+# Each thread keeps one keep-alive connection. The server's bearer token travels inside the
+# user dict that login() returns, so one RemoteEngine can carry many users, as the load test does.
+import http.client
+import json
+import threading
+from urllib.parse import urlencode, urlsplit
+
+from quiz_engine import AuthError, QuizError, QuizSession, RateLimitError, RegistrationError
+
+
+class RemoteError(QuizError):
+    pass
+
+
+class RemoteEngine:
+    def __init__(self, base_url, timeout=15):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _conn(self, fresh=False):
+        conn = getattr(self.local, "conn", None)
+        if conn is None or fresh:
+            if conn is not None: conn.close()
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def call(self, method, path, payload=None, params=None, user=None):
+        if params:
+            path += "?" + urlencode({k: v for k, v in params.items() if v is not None})
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if user and user.get("token"):
+            headers["Authorization"] = "Bearer " + user["token"]
+        for attempt in (0, 1):
+            conn = self._conn(fresh=attempt > 0)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = json.loads(resp.read() or b"{}")
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                if attempt: raise  # the server dropped an idle keep-alive connection: reconnect once
+        if resp.status == 429: raise RateLimitError(data.get("error", "Too many attempts."))
+        if resp.status == 401: raise AuthError(data.get("error", "Please log in."))
+        if resp.status == 409: raise RegistrationError(data.get("error", "Conflict."))
+        if resp.status >= 400: raise RemoteError(data.get("error", f"server error {resp.status}"))
+        return data
+
+    def ping(self):
+        return self.call("GET", "/api/health")
+
+    def login(self, ident, pw):
+        data = self.call("POST", "/api/login", {"ident": ident, "password": pw})
+        return dict(data["user"], token=data["token"])
+
+    def register(self, username, email, pw, age, gender):
+        return self.call("POST", "/api/register", {"username": username, "email": email, "password": pw,
+                                                   "age": age, "gender": gender})["category"]
+
+    def reset_password(self, email, code, new_pw):
+        raise RemoteError("Password reset is only available on the server machine.")
+
+    def start_round(self, user, category, round_number, **_):
+        data = self.call("POST", "/api/rounds", {"category": category, "round": round_number}, user=user)
+        qs = [dict(q, answer=None) for q in data["questions"]]  # answers stay on the server
+        session = QuizSession(user, category, round_number, qs)
+        session.attempt_key = data["attempt"]
+        return session
+
+    def submit(self, session):
+        session.visit(None)
+        data = self.call("POST", "/api/submit", {"attempt": session.attempt_key, "answers": session.answers,
+                                                 "time_spent": session.time_spent}, user=session.user)
+        return data["score"], data["total"]
+
+    def scores(self, view='all', user=None, category=None, after=None):
+        data = self.call("GET", "/api/scores", params={"view": view, "category": category,
+                                                       "after": json.dumps(after) if after else None}, user=user)
+        return [tuple(r) for r in data["rows"]], data["cursor"]
+
+    def leaderboard(self, after=None):
+        return self.scores('all', after=after)
+
+    def board_version(self):
+        return tuple(self.call("GET", "/api/scores/version")["version"])
+
+    def clear_scores(self, user):
+        return self.call("POST", "/api/scores/clear", {}, user=user)["cleared"]
+
+    # checkpoints are local-only; the server keeps open rounds in memory instead
+    def save_checkpoint(self, snapshot):
+        pass
+
+    def resume(self, user):
+        return None
+
+    def discard_checkpoint(self, user):
+        pass
@@ -0,0 +1,497 @@
+# quiz_db.py
+# Data-access layer for the quiz app.
+# All frames go through a Repository instead of opening sqlite3.connect(DB) per click:
+#  - a small pool of long-lived connections (created lazily, reused across calls/threads)
+#  - WAL journaling so readers don't block the writer ("database is locked")
+#  - sqlite3's per-connection statement cache keeps the prepared statements warm
+#  - transaction() groups several writes into one commit
+import sqlite3
+import threading
+import queue
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import adaptive
+import analytics
+import attempt_log
+import checkpoints
+import leaderboard
+import migrations
+import perf
+import questions
+import rounds
+
+DB = "quiz_app_colored.db"
+
+# Layout version migrations.LATEST; an older file is upgraded by init_schema() first.
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE,
+        email TEXT UNIQUE,
+        password_hash TEXT,
+        age INTEGER,
+        gender TEXT,
+        category TEXT,
+        created INTEGER,
+        username_norm TEXT,
+        email_norm TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        score INTEGER,
+        total INTEGER,
+        category_id INTEGER REFERENCES categories(id),
+        ts INTEGER,
+        attempt_key TEXT
+    )
+    """,
+    # one-time password reset codes (quiz_engine.issue_reset_code); only a hash of the code is kept
+    """
+    CREATE TABLE IF NOT EXISTS password_resets (
+        user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        code_hash TEXT NOT NULL,
+        expires INTEGER NOT NULL
+    )
+    """,
+]
+
+# profile columns only: the hash is read per login (password_hash()), never served from the cache
+USER_COLS = "id, username, email, age, gender, category"
+USER_CACHE_SIZE = 1024
+
+
+def normalize(ident):
+    # Usernames and emails match case-insensitively and ignore surrounding spaces.
+    return ident.strip().casefold() if ident else ident
+
+
+def _ensure_user_lookup(conn):
+    # username_norm/email_norm back login lookups with one index seek each (the old
+    # "username=? OR email=?" couldn't use a single index).
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(users)")}
+    for col in ('username_norm', 'email_norm'):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE users ADD COLUMN {col} TEXT")
+    rows = conn.execute("SELECT id, username, email FROM users WHERE username_norm IS NULL").fetchall()
+    conn.executemany("UPDATE users SET username_norm=?, email_norm=? WHERE id=?",
+                     [(normalize(u), normalize(e), i) for i, u, e in rows])
+    for col in ('username_norm', 'email_norm'):
+        try:
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_users_{col} ON users({col})")
+        except sqlite3.IntegrityError:
+            # older rows differ only by case; keep them loginable, just without the uniqueness guarantee
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_users_{col}_dup ON users({col})")
+
+
+def _ensure_score_attempts(conn):
+    # scores.attempt_key marks an attempt as submitted, so a late checkpoint can't revive it.
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(scores)")}
+    if 'attempt_key' not in cols:
+        conn.execute("ALTER TABLE scores ADD COLUMN attempt_key TEXT")
+    # UNIQUE: one scores row per attempt, however often a failed submit is retried
+    unique = {r[1]: r[2] for r in conn.execute("PRAGMA index_list(scores)")}
+    if unique.get('idx_scores_attempt') == 0:
+        conn.execute("DROP INDEX idx_scores_attempt")
+    try:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_scores_attempt ON scores(attempt_key) WHERE attempt_key IS NOT NULL")
+    except sqlite3.IntegrityError:
+        # attempts stored twice before the guard existed; keep them, just without the uniqueness guarantee
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_attempt_dup ON scores(attempt_key) WHERE attempt_key IS NOT NULL")
+
+
+# --------------------------
+# Connection pool
+# --------------------------
+class ConnectionPool:
+    def __init__(self, path=DB, size=4, timeout=10.0, cached_statements=256):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        # pool exhausted: wait for another caller to hand one back
+        return self._idle.get(timeout=self.timeout)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all = []
+            self._idle = queue.LifoQueue()
+
+
+# --------------------------
+# Repository (one per database file)
+# --------------------------
+class Repository:
+    def __init__(self, path=DB, pool_size=4, question_cache=0):
+        self.path = path
+        self.pool = ConnectionPool(path, size=pool_size)
+        # question_cache > 0 keeps that many question dicts in an LRU (long-running servers)
+        self.question_cache = question_cache
+        self._questions = OrderedDict()
+        self._questions_lock = threading.Lock()
+        self._users = OrderedDict()  # normalized ident -> user row (LRU of find_user hits)
+        self._users_lock = threading.Lock()
+        self._categories = {}  # category name -> categories.id; rows are never deleted
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+        self.answer_log = attempt_log.AnswerLog(self)
+
+    @contextmanager
+    def transaction(self):
+        # Batch several statements into a single commit.
+        with self.pool.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def query(self, sql, params=()):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def execute(self, sql, params=()):
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def insert(self, sql, params=()):
+        with self.transaction() as conn:
+            return conn.execute(sql, params).lastrowid
+
+    def executemany(self, sql, rows):
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
+
+    def init_schema(self):
+        # Idempotent and cheap after the first call, so callers needn't coordinate.
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            migrations.upgrade(self)
+            with self.transaction() as conn:
+                for stmt in SCHEMA:
+                    conn.execute(stmt)
+                _ensure_user_lookup(conn)
+                _ensure_score_attempts(conn)
+                leaderboard.ensure(conn)
+                questions.ensure(conn)
+                rounds.ensure(conn)
+                adaptive.ensure(conn)
+                attempt_log.ensure(conn)
+                checkpoints.ensure(conn)
+                analytics.ensure(conn)
+            self._schema_ready = True
+
+    def close(self):
+        try:
+            self.answer_log.close()  # write out buffered answers before the pool goes away
+        finally:
+            self.pool.close()
+
+    # ---- users ----
+    def find_user(self, ident):
+        # Exact matches first (a legacy file may hold 'Bob' and 'bob' as two accounts), then the
+        # case-insensitive ones; username wins over email at each step. All four are index seeks.
+        key = ident.strip() if ident else ident
+        with self._users_lock:
+            row = self._users.get(key)
+            if row is not None:
+                self._users.move_to_end(key)
+                return row
+        norm = normalize(key)
+        row = self.query_one(f"SELECT {USER_COLS} FROM users WHERE username=? UNION ALL "
+                             f"SELECT {USER_COLS} FROM users WHERE email=? UNION ALL "
+                             f"SELECT {USER_COLS} FROM users WHERE username_norm=? UNION ALL "
+                             f"SELECT {USER_COLS} FROM users WHERE email_norm=? LIMIT 1", (key, key, norm, norm))
+        if row is not None:
+            with self._users_lock:
+                self._users[key] = row
+                while len(self._users) > USER_CACHE_SIZE:
+                    self._users.popitem(last=False)
+        return row
+
+    def forget_users(self, user_id=None, idents=()):
+        # Drop cached lookups for a user (password changed) and/or identities (new registration).
+        keys = {normalize(i) for i in idents if i}
+        with self._users_lock:
+            for key in [k for k, row in self._users.items() if row[0] == user_id or normalize(k) in keys]:
+                del self._users[key]
+
+    def password_hash(self, user_id):
+        # Always from the database, so a reset made by another process takes effect at once.
+        row = self.query_one("SELECT password_hash FROM users WHERE id=?", (user_id,))
+        return row[0] if row else None
+
+    def find_user_id_by_email(self, email):
+        row = self.query_one("SELECT id FROM users WHERE email_norm=?", (normalize(email),))
+        return row[0] if row else None
+
+    def set_password_hash(self, user_id, phash):
+        n = self.execute("UPDATE users SET password_hash=? WHERE id=?", (phash, user_id))
+        self.forget_users(user_id)
+        return n
+
+    def set_reset_code(self, user_id, code_hash, expires):
+        # Replaces any earlier code for this user.
+        self.execute("INSERT OR REPLACE INTO password_resets (user_id, code_hash, expires) VALUES (?,?,?)",
+                     (user_id, code_hash, expires))
+
+    def reset_password(self, user_id, code_hash, phash, now):
+        # Sets the new hash only if the user holds an unexpired code with this hash; the code is
+        # used up in the same transaction. Returns whether the password was changed.
+        with self.transaction() as conn:
+            n = conn.execute("""
+                UPDATE users SET password_hash=? WHERE id=? AND EXISTS (
+                    SELECT 1 FROM password_resets WHERE user_id=? AND code_hash=? AND expires > ?)
+            """, (phash, user_id, user_id, code_hash, now)).rowcount
+            if n:
+                conn.execute("DELETE FROM password_resets WHERE user_id=?", (user_id,))
+        self.forget_users(user_id)
+        return bool(n)
+
+    def create_user(self, username, email, phash, age, gender, category):
+        # Raises sqlite3.IntegrityError on duplicate username/email (case-insensitive). The
+        # explicit check covers legacy files where the norm columns only have non-unique indexes.
+        with self.transaction() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM users WHERE username_norm=? UNION ALL SELECT 1 FROM users WHERE email_norm=?",
+                            (normalize(username), normalize(email))).fetchone():
+                raise sqlite3.IntegrityError("username or email already exists")
+            uid = conn.execute(
+                "INSERT INTO users (username, email, password_hash, age, gender, category, created, username_norm, email_norm) "
+                "VALUES (?,?,?,?,?,?,?,?,?)",
+                (username, email, phash, age, gender, category, int(time.time()),
+                 normalize(username), normalize(email))).lastrowid
+        self.forget_users(idents=(username, email))  # e.g. a cached email match this username now outranks
+        return uid
+
+    # ---- scores ----
+    def add_score(self, user_id, score, total, category, attempt_key=None):
+        # The scores row, the best_scores upsert and the link from the attempt's logged
+        # answers (flush the answer log first) all commit together. Returns the score id, or
+        # None if attempt_key is already recorded.
+        with self.transaction() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return self._add_score(conn, user_id, score, total, category, attempt_key)
+
+    def submit_attempt(self, user_id, score, total, category, attempt_key, round_category, results, reset_round=None):
+        # add_score() plus the round bookkeeping in one transaction, so a submit that fails can be
+        # retried without storing the attempt twice. results: [(question_id, correct)], marked seen
+        # and fed into the ability/difficulty estimates. Returns the score id, or None (and writes
+        # nothing) if attempt_key is already recorded.
+        with self.transaction() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # the seen bits and ratings are read, then rewritten
+            score_id = self._add_score(conn, user_id, score, total, category, attempt_key)
+            if score_id is not None:
+                rounds.mark_seen(conn, user_id, round_category, [qid for qid, _ in results], reset_round)
+                adaptive.update(conn, user_id, round_category, results)
+            return score_id
+
+    def _add_score(self, conn, user_id, score, total, category, attempt_key):
+        if attempt_key and conn.execute("SELECT 1 FROM scores WHERE attempt_key=?", (attempt_key,)).fetchone():
+            return None
+        ts = int(time.time())
+        cid = self._category_id(conn, category)
+        score_id = conn.execute(
+            "INSERT INTO scores (user_id, score, total, category_id, ts, attempt_key) VALUES (?,?,?,?,?,?)",
+            (user_id, score, total, cid, ts, attempt_key)).lastrowid
+        leaderboard.record(conn, score_id, user_id, score, total, cid, ts)
+        if attempt_key:
+            conn.execute("UPDATE attempt_answers SET score_id=? WHERE attempt_key=?", (score_id, attempt_key))
+            checkpoints.delete(conn, attempt_key=attempt_key)  # a submitted attempt can't be resumed
+        return score_id
+
+    def add_scores(self, rows):
+        # rows: iterable of (user_id, score, total, category, ts) committed as one batch;
+        # ts is epoch seconds
+        last_id = None
+        with self.transaction() as conn:
+            for user_id, score, total, category, ts in rows:
+                cid = self._category_id(conn, category)
+                last_id = conn.execute(
+                    "INSERT INTO scores (user_id, score, total, category_id, ts) VALUES (?,?,?,?,?)",
+                    (user_id, score, total, cid, ts)).lastrowid
+                leaderboard.record(conn, last_id, user_id, score, total, cid, ts)
+        return last_id
+
+    def _category_id(self, conn, name):
+        # Runs in the caller's transaction. A row inserted here is only cached on a later
+        # call, once it is committed, so a rolled-back insert can't leave a stale id behind.
+        if name is None:
+            return None
+        cid = self._categories.get(name)
+        if cid is None:
+            added = conn.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,)).rowcount
+            cid = conn.execute("SELECT id FROM categories WHERE name=?", (name,)).fetchone()[0]
+            if not added:
+                self._categories[name] = cid
+        return cid
+
+    def top_scores(self, limit=leaderboard.PAGE_SIZE, after=None):
+        # Returns (rows, cursor); pass cursor back as `after` for the next page.
+        with self.pool.connection() as conn:
+            return leaderboard.top(conn, after=after, limit=limit)
+
+    def user_scores(self, user_id, limit=leaderboard.PAGE_SIZE, after=None):
+        with self.pool.connection() as conn:
+            return leaderboard.for_user(conn, user_id, after=after, limit=limit)
+
+    def category_best(self, category, limit=leaderboard.PAGE_SIZE, after=None):
+        with self.pool.connection() as conn:
+            return leaderboard.for_category(conn, category, after=after, limit=limit)
+
+    def board_version(self):
+        with self.pool.connection() as conn:
+            return leaderboard.version(conn)
+
+    # ---- checkpoints ----
+    def save_checkpoint(self, *fields):
+        with self.transaction() as conn:
+            checkpoints.save(conn, *fields)
+
+    def load_checkpoint(self, user_id):
+        with self.pool.connection() as conn:
+            return checkpoints.load(conn, user_id)
+
+    def delete_checkpoint(self, user_id):
+        with self.transaction() as conn:
+            checkpoints.delete(conn, user_id=user_id)
+
+    # ---- analytics ----
+    def score_stats(self, category=None, refresh=True):
+        # Folds in new attempts (incremental) and returns analytics.summarize() output.
+        if refresh:
+            with self.transaction() as conn:
+                analytics.refresh(conn)
+        with self.pool.connection() as conn:
+            return analytics.summarize(conn, category)
+
+    def user_ranks(self, user_id, stats):
+        # The user's best score per category with its percentile rank within `stats` (from score_stats()).
+        with self.pool.connection() as conn:
+            return analytics.user_ranks(conn, stats, user_id)
+
+    def question_stats(self, category=None, limit=20):
+        # Hardest questions first; call score_stats() (or analytics.refresh) to fold in new attempts.
+        with self.pool.connection() as conn:
+            return analytics.item_stats(conn, category, limit)
+
+    # ---- questions ----
+    def round_questions(self, category, round_number, k=questions.ROUND_SIZE, user_id=None, by_ability=False):
+        # Returns (questions, exhausted); with a user_id, questions they have seen come last.
+        # by_ability=True picks around the user's ability instead of at random (needs user_id).
+        pick = adaptive.pick_ids if by_ability and user_id is not None else rounds.pick_ids
+        with self.pool.connection() as conn:
+            ids, exhausted = pick(conn, category, round_number, k, user_id)
+            return self._fetch_questions(conn, ids), exhausted
+
+    def _fetch_questions(self, conn, ids):
+        if not self.question_cache:
+            return questions.fetch(conn, ids)
+        with self._questions_lock:
+            hit = {i: self._questions[i] for i in ids if i in self._questions}
+            for i in hit: self._questions.move_to_end(i)
+        missing = [i for i in ids if i not in hit]
+        if missing:
+            loaded = questions.fetch(conn, missing)
+            with self._questions_lock:
+                for q in loaded:
+                    hit[q['id']] = self._questions[q['id']] = q
+                while len(self._questions) > self.question_cache:
+                    self._questions.popitem(last=False)
+        # callers shuffle and annotate the list, never the dicts, so sharing them is safe
+        return [hit[i] for i in ids if i in hit]
+
+    def plan_rounds(self, category=None, rebuild=False, seed=None):
+        # Places new questions into rounds; rebuild=True re-deals the category (or all of them).
+        with self.transaction() as conn:
+            if not rebuild:
+                return rounds.plan(conn, category)
+            cats = [category] if category else [r[0] for r in conn.execute("SELECT DISTINCT category FROM questions")]
+            return sum(rounds.partition(conn, c, seed) for c in cats)
+
+    def round_sizes(self, category=None):
+        with self.pool.connection() as conn:
+            return rounds.sizes(conn, category)
+
+    def clear_scores(self, user_id):
+        with self.transaction() as conn:
+            analytics.forget_user(conn, user_id)
+            conn.execute("DELETE FROM attempt_answers WHERE user_id=?", (user_id,))
+            n = conn.execute("DELETE FROM scores WHERE user_id=?", (user_id,)).rowcount
+            leaderboard.rebuild_user(conn, user_id)
+        return n
+
+
+# every public Repository method is a "db.<name>" span; pool waits show up as db.pool.acquire
+perf.instrument(Repository, "db", skip=("close", "forget_users"))
+perf.instrument(ConnectionPool, "db.pool", skip=("connection", "release", "close"))
+
+
+_repos = {}
+_repos_lock = threading.Lock()
+
+def get_repo(path=DB):
+    # One shared Repository (and therefore one pool) per database file.
+    with _repos_lock:
+        repo = _repos.get(path)
+        if repo is None:
+            repo = _repos[path] = Repository(path)
+        return repo
+
+def close_all():
+    with _repos_lock:
+        for repo in _repos.values():
+            repo.close()
+        _repos.clear()
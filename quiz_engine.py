@@ -0,0 +1,242 @@
+# quiz_engine.py
+# GUI-free quiz core: accounts, round selection, sessions and scoring on top of a Repository.
+# The Tk frames and the load-test harness both drive this API; nothing here touches tkinter.
+import hashlib
+import math
+import random
+import secrets
+import sqlite3
+import time
+import uuid
+
+import adaptive
+import checkpoints
+import perf
+import questions
+import ratelimit
+from passwords import hash_password, verify_password
+from questions import ROUND_SIZE
+
+
+class QuizError(Exception):
+    # Carries a user-facing message.
+    pass
+
+class AuthError(QuizError):
+    pass
+
+class RegistrationError(QuizError):
+    pass
+
+class RateLimitError(AuthError):
+    pass
+
+
+RESET_CODE_TTL = 3600  # seconds a password reset code stays valid
+
+
+def _code_hash(code):
+    # Reset codes are random, so a plain digest is enough; it keeps them out of the database.
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def determine_category(age):
+    age = int(age)
+    if 8 <= age <= 12:
+        return "Children"
+    if 13 <= age <= 19:
+        return "Teenagers"
+    if 20 <= age <= 40:
+        return "Adults"
+    return "Adults"
+
+
+def score_answers(questions, answers):
+    score = 0
+    for q, ans in zip(questions, answers):
+        if ans is not None and ans == q['answer']: score += 1
+    return score, len(questions)
+
+
+class QuizSession:
+    def __init__(self, user, category, round_number, questions, log=None):
+        self.user = user
+        self.category = category
+        self.round_number = round_number
+        self.questions = questions
+        self.answers = [None] * len(questions)
+        self.current_index = 0
+        self.attempt_key = uuid.uuid4().hex
+        self.log = log  # AnswerLog or None
+        self.time_spent = [0.0] * len(questions)  # seconds each question has been on screen
+        self._shown = None  # (index, monotonic time it was shown)
+        self.recycle = False  # the round had too few unseen questions; submit starts a new cycle
+
+    def visit(self, index, now=None):
+        # Call whenever a question is displayed; charges elapsed time to the previous one.
+        now = time.monotonic() if now is None else now
+        if self._shown is not None:
+            prev, since = self._shown
+            self.time_spent[prev] += now - since
+        self._shown = (index, now) if index is not None else None
+
+    def answer(self, index, choice):
+        new = None if choice is None or choice == -1 else int(choice)
+        if new == self.answers[index]:
+            return  # navigation re-saves the current choice; only log real changes
+        self.answers[index] = new
+        if self.log is not None and self.questions[index].get('id') is not None:
+            spent = self.time_spent[index]
+            if self._shown and self._shown[0] == index:
+                spent += time.monotonic() - self._shown[1]
+            q = self.questions[index]
+            self.log.record(self.attempt_key, self.user['id'] if self.user else 0, q['id'], index, new,
+                            new is not None and new == q['answer'], spent * 1000)
+
+    def score(self):
+        return score_answers(self.questions, self.answers)
+
+    def snapshot(self, remaining_seconds=None):
+        # Packed checkpoint fields; cheap, so it can be taken on the UI thread and saved elsewhere.
+        return (self.user['id'], self.attempt_key, self.category, self.round_number,
+                checkpoints.pack_ids([q['id'] for q in self.questions]), checkpoints.pack_answers(self.answers),
+                self.current_index, remaining_seconds)
+
+
+class QuizEngine:
+    def __init__(self, repo, identity_limit=ratelimit.LOGIN_IDENTITY, client_limit=ratelimit.LOGIN_CLIENT):
+        self.repo = repo
+        self.identity_limit = identity_limit
+        self.client_limit = client_limit
+
+    def login(self, ident, pw, client=None):
+        # client: the caller's address when there is one (the server passes it); failed attempts
+        # are charged to the identity and the client, and empty buckets are refused up front.
+        ident = (ident or "").strip()
+        if not ident or not pw:
+            raise AuthError("Enter username/email and password.")
+        buckets = [(self.identity_limit, ident.casefold())]
+        if client is not None: buckets.append((self.client_limit, client))
+        wait = max(limit.wait(key) for limit, key in buckets)
+        if wait:
+            raise RateLimitError(f"Too many failed attempts. Try again in {math.ceil(wait)} s.")
+        try:
+            return self._login(ident, pw)
+        except AuthError:
+            for limit, key in buckets: limit.charge(key)
+            raise
+
+    def _login(self, ident, pw):
+        row = self.repo.find_user(ident)
+        phash = self.repo.password_hash(row[0]) if row else None
+        if phash is None:
+            raise AuthError("User not found. Please register.")
+        uid, username, email, age, gender, category = row
+        ok, stale = verify_password(pw, phash)
+        if not ok:
+            raise AuthError("Incorrect password.")
+        if stale:
+            # legacy sha256 row or an older cost factor: upgrade while we have the plaintext
+            self.repo.set_password_hash(uid, hash_password(pw))
+        return {'id':uid,'username':username,'email':email,'age':age,'gender':gender,'category':category}
+
+    def register(self, username, email, pw, age, gender):
+        # Returns the category the new user was placed in.
+        if not (username and email and pw):
+            raise RegistrationError("Please fill all fields.")
+        cat = determine_category(age)
+        try:
+            self.repo.create_user(username, email, hash_password(pw), int(age), gender, cat)
+        except sqlite3.IntegrityError:
+            raise RegistrationError("Username or email already exists.")
+        return cat
+
+    def issue_reset_code(self, ident):
+        # For the operator (niksha.py reset-code): a one-time code the user must quote to reset
+        # their password. Returns (username, code).
+        row = self.repo.find_user(ident)
+        if row is None:
+            raise AuthError("User not found.")
+        code = secrets.token_urlsafe(9)
+        self.repo.set_reset_code(row[0], _code_hash(code), int(time.time()) + RESET_CODE_TTL)
+        return row[1], code
+
+    def reset_password(self, email, code, new_pw):
+        # Needs the email plus an unexpired code from issue_reset_code(); wrong codes are
+        # charged to the same per-identity bucket as failed logins.
+        email, code = (email or "").strip(), (code or "").strip()
+        if not (email and code and new_pw):
+            raise AuthError("Enter your email, reset code and new password.")
+        key = email.casefold()
+        wait = self.identity_limit.wait(key)
+        if wait:
+            raise RateLimitError(f"Too many failed attempts. Try again in {math.ceil(wait)} s.")
+        uid = self.repo.find_user_id_by_email(email)
+        if uid is None or not self.repo.reset_password(uid, _code_hash(code), hash_password(new_pw), int(time.time())):
+            self.identity_limit.charge(key)
+            raise AuthError("Invalid or expired reset code.")
+
+    def start_round(self, user, category, round_number, k=ROUND_SIZE, shuffle=True, by_ability=None):
+        # by_ability defaults to adaptive.ADAPTIVE (env QUIZ_ADAPTIVE=0 turns it off)
+        by_ability = adaptive.ADAPTIVE if by_ability is None else by_ability
+        qs, exhausted = self.repo.round_questions(category, round_number, k, user_id=user['id'] if user else None,
+                                                  by_ability=by_ability)
+        if shuffle: random.shuffle(qs)
+        session = QuizSession(user, category, round_number, qs, log=self.repo.answer_log)
+        session.recycle = exhausted
+        return session
+
+    def save_checkpoint(self, snapshot):
+        self.repo.save_checkpoint(*snapshot)
+
+    def resume(self, user):
+        # Rebuilds the user's checkpointed session; returns (session, remaining_seconds) or None.
+        cp = self.repo.load_checkpoint(user['id'])
+        if cp is None:
+            return None
+        with self.repo.pool.connection() as conn:
+            qs = questions.fetch(conn, cp['question_ids'])
+        if len(qs) != len(cp['question_ids']):
+            self.repo.delete_checkpoint(user['id'])  # questions were removed since; can't resume faithfully
+            return None
+        session = QuizSession(user, cp['category'], cp['round_number'], qs, log=self.repo.answer_log)
+        session.attempt_key = cp['attempt_key']  # answers logged before the crash stay with this attempt
+        session.answers[:] = cp['answers']
+        session.current_index = min(cp['current_index'], max(0, len(qs) - 1))
+        return session, cp['remaining_seconds']
+
+    def discard_checkpoint(self, user):
+        self.repo.delete_checkpoint(user['id'])
+
+    def submit(self, session):
+        # Scores the session and stores the attempt; returns (score, total).
+        session.visit(None)
+        score, total = session.score()
+        user = session.user
+        self.repo.answer_log.flush()  # so the score row can claim this attempt's answers
+        # a retry after a failed submit finds the attempt already stored and writes nothing
+        self.repo.submit_attempt(user['id'], score, total, user['category'], session.attempt_key, session.category,
+                                 [(q['id'], a is not None and a == q['answer']) for q, a in zip(session.questions, session.answers)],
+                                 reset_round=session.round_number if session.recycle else None)
+        return score, total
+
+    def leaderboard(self, after=None):
+        return self.repo.top_scores(after=after)
+
+    def scores(self, view='all', user=None, category=None, after=None):
+        # One scoreboard page: view 'all', 'mine' (needs user) or 'best' (needs category).
+        if view == 'mine':
+            return self.repo.user_scores(user['id'], after=after) if user else ([], None)
+        if view == 'best':
+            return self.repo.category_best(category, after=after)
+        return self.repo.top_scores(after=after)
+
+    def board_version(self):
+        # Compare with an earlier value to skip re-reading an unchanged scoreboard.
+        return self.repo.board_version()
+
+    def clear_scores(self, user):
+        return self.repo.clear_scores(user['id'])
+
+
+perf.instrument(QuizEngine, "engine")
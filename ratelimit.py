@@ -0,0 +1,47 @@
+# ratelimit.py
+# In-memory token buckets for throttling failed logins.
+# Each key (a normalized username/email, or a client address) holds up to `burst` tokens that
+# refill at `per_second`. A failed attempt spends one token; while a key's bucket is empty,
+# attempts are refused before any database lookup or password hashing. Buckets live in a
+# bounded LRU, so a flood of made-up identities can't grow memory without limit.
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimiter:
+    def __init__(self, burst, per_second, max_keys=10000):
+        self.burst = float(burst)
+        self.rate = float(per_second)
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()  # key -> (tokens, monotonic time of last update)
+        self.lock = threading.Lock()
+
+    def _level(self, key, now):
+        tokens, last = self.buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - last) * self.rate)
+
+    def wait(self, key, now=None):
+        # Seconds until `key` may try again; 0 when a token is available.
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            tokens = self._level(key, now)
+        return 0.0 if tokens >= 1.0 else (1.0 - tokens) / self.rate
+
+    def charge(self, key, cost=1.0, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.buckets[key] = (max(0.0, self._level(key, now) - cost), now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+
+    def reset(self, key):
+        with self.lock:
+            self.buckets.pop(key, None)
+
+
+# per identity: 5 quick failures, then one more try every 30 s
+LOGIN_IDENTITY = RateLimiter(burst=5, per_second=1 / 30)
+# per client address (server only): 30 failures, then one every 2 s across all identities
+LOGIN_CLIENT = RateLimiter(burst=30, per_second=0.5)
@@ -0,0 +1,190 @@
+# rounds.py
+# Round scheduler: each category is partitioned into ROUNDS fixed rounds once, and the
+# partition is stored in questions.round.
+# The first partition of a category is a seeded, difficulty-stratified deal: questions are sorted
+# by (difficulty, hash(seed, content_hash)) and dealt round-robin, so every round gets an even
+# share of each difficulty and the result does not depend on insertion order. Questions added
+# later are placed one by one into the round with the fewest questions of their difficulty,
+# which keeps the balance without moving anything already dealt.
+# Every question also gets a `slot`, a dense per-category ordinal that never changes. A user's
+# already-seen questions are a bitset over slots (one blob per user and category), so picking
+# a quiz skips repeats with one bit test per candidate instead of a lookup per past answer.
+import hashlib
+import os
+import random
+
+from questions import MAX_KEY, ROUNDS
+
+SEED = int(os.environ.get("QUIZ_ROUND_SEED", "0"))
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS round_plan (category TEXT PRIMARY KEY, seed INTEGER NOT NULL, next_slot INTEGER NOT NULL)",
+    """
+    CREATE TABLE IF NOT EXISTS seen_questions (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        category TEXT NOT NULL,
+        bits BLOB NOT NULL,
+        PRIMARY KEY (user_id, category)
+    ) WITHOUT ROWID
+    """,
+]
+# created once questions.slot exists (older databases get the column added first)
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_questions_plan ON questions(category, round, rkey, slot)",
+    "CREATE INDEX IF NOT EXISTS idx_questions_unplanned ON questions(category) WHERE slot IS NULL",
+    "DROP INDEX IF EXISTS idx_questions_round",  # idx_questions_plan covers it
+]
+
+
+def ensure(conn):
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(questions)")}
+    if 'slot' not in cols:
+        conn.execute("ALTER TABLE questions ADD COLUMN slot INTEGER")
+    for stmt in INDEXES:
+        conn.execute(stmt)
+    plan(conn)
+
+
+def _order(seed, rows):
+    # rows start with (id, difficulty, content_hash); stable seeded order within each difficulty
+    def key(r):
+        qid, diff, h = r[:3]
+        return diff, hashlib.sha1(f"{seed}:{h or qid}".encode()).digest()
+    return sorted(rows, key=key)
+
+
+def partition(conn, category, seed=None):
+    # Full deterministic re-deal of a category. Slots (and so seen bitsets) are unaffected.
+    seed = SEED if seed is None else seed
+    rows = _order(seed, conn.execute("SELECT id, difficulty, content_hash, slot FROM questions WHERE category=?",
+                                     (category,)).fetchall())
+    state = conn.execute("SELECT next_slot FROM round_plan WHERE category=?", (category,)).fetchone()
+    next_slot = state[0] if state else 0
+    updates = []
+    for i, (qid, _, _, slot) in enumerate(rows):
+        if slot is None:
+            slot, next_slot = next_slot, next_slot + 1
+        updates.append((i % ROUNDS + 1, slot, qid))
+    conn.executemany("UPDATE questions SET round=?, slot=? WHERE id=?", updates)
+    conn.execute("INSERT OR REPLACE INTO round_plan (category, seed, next_slot) VALUES (?,?,?)", (category, seed, next_slot))
+    return len(rows)
+
+
+class Placer:
+    # Incremental placement: the emptiest round for the question's difficulty (ties go to the
+    # smaller round), plus the next free slot. Bulk importers call place() before inserting so
+    # rows arrive already planned; save() must run in the same transaction as the inserts.
+    def __init__(self):
+        self.cats = {}  # category -> [counts {(difficulty, round): n}, totals per round, next_slot]
+
+    def _load(self, conn, category):
+        state = conn.execute("SELECT next_slot FROM round_plan WHERE category=?", (category,)).fetchone()
+        if state is None:
+            conn.execute("INSERT INTO round_plan (category, seed, next_slot) VALUES (?,?,0)", (category, SEED))
+        counts, totals = {}, [0] * (ROUNDS + 1)
+        for diff, rnd, n in conn.execute("SELECT difficulty, round, count(*) FROM questions WHERE category=? "
+                                         "AND slot IS NOT NULL AND round BETWEEN 1 AND ? GROUP BY 1, 2", (category, ROUNDS)):
+            counts[diff, rnd] = n; totals[rnd] += n
+        st = self.cats[category] = [counts, totals, state[0] if state else 0]
+        return st
+
+    def place(self, conn, category, difficulty, round=None):
+        # Returns (round, slot); an explicit valid round is kept.
+        st = self.cats.get(category) or self._load(conn, category)
+        counts, totals = st[0], st[1]
+        if round is None or not 1 <= round <= ROUNDS:
+            round = min(range(1, ROUNDS + 1), key=lambda r: (counts.get((difficulty, r), 0), totals[r], r))
+        counts[difficulty, round] = counts.get((difficulty, round), 0) + 1; totals[round] += 1
+        slot = st[2]; st[2] += 1
+        return round, slot
+
+    def save(self, conn):
+        conn.executemany("UPDATE round_plan SET next_slot=? WHERE category=?", [(st[2], c) for c, st in self.cats.items()])
+
+
+def _place(conn, category, seed):
+    # Places the category's unplanned questions, in seeded order.
+    pending = conn.execute("SELECT id, difficulty, content_hash, round FROM questions WHERE category=? AND slot IS NULL",
+                           (category,)).fetchall()
+    placer = Placer()
+    updates = [(*placer.place(conn, category, diff, rnd), qid) for qid, diff, _, rnd in _order(seed, pending)]
+    conn.executemany("UPDATE questions SET round=?, slot=? WHERE id=?", updates)
+    placer.save(conn)
+    return len(pending)
+
+
+def plan(conn, category=None):
+    # Places every question that has no slot yet; call after inserting questions. Returns rows placed.
+    if category is None:
+        cats = [r[0] for r in conn.execute("SELECT DISTINCT category FROM questions WHERE slot IS NULL")]
+    else:
+        cats = [category]
+    placed = 0
+    for cat in cats:
+        state = conn.execute("SELECT seed FROM round_plan WHERE category=?", (cat,)).fetchone()
+        # first sight of a category (or a database from before the scheduler): deal it from scratch
+        placed += partition(conn, cat) if state is None else _place(conn, cat, state[0])
+    return placed
+
+
+def sizes(conn, category=None):
+    # [(category, round, difficulty, n)]
+    where, params = ("WHERE category=?", (category,)) if category else ("", ())
+    return conn.execute(f"SELECT category, round, difficulty, count(*) FROM questions {where} GROUP BY 1, 2, 3 ORDER BY 1, 2, 3",
+                        params).fetchall()
+
+
+# --------------------------
+# per-user seen bitsets
+# --------------------------
+def load_bits(conn, user_id, category):
+    row = conn.execute("SELECT bits FROM seen_questions WHERE user_id=? AND category=?", (user_id, category)).fetchone()
+    return bytearray(row[0]) if row else bytearray()
+
+def is_seen(bits, slot):
+    return slot >> 3 < len(bits) and bits[slot >> 3] >> (slot & 7) & 1
+
+
+def pick_ids(conn, category, round_number, k, user_id=None):
+    # Up to k question ids from one round, unseen ones first. Walks the round in rkey order from a
+    # random point and stops after k unseen hits. Returns (ids, exhausted): exhausted means the
+    # user has seen (nearly) the whole round.
+    bits = load_bits(conn, user_id, category) if user_id is not None else bytearray()
+    start = random.randint(0, MAX_KEY)
+    fresh, stale = [], []
+    for cond in ("rkey >= ?", "rkey < ?"):
+        cur = conn.execute(f"SELECT id, slot FROM questions WHERE category=? AND round=? AND {cond} ORDER BY rkey",
+                           (category, round_number, start))
+        try:
+            for qid, slot in cur:
+                if slot is not None and is_seen(bits, slot):
+                    if len(stale) < k: stale.append(qid)
+                    continue
+                fresh.append(qid)
+                if len(fresh) == k:
+                    return fresh, False
+        finally:
+            cur.close()
+    return fresh + stale[:k - len(fresh)], True
+
+
+def mark_seen(conn, user_id, category, question_ids, reset_round=None):
+    # Sets the bits for question_ids. reset_round first clears that round's bits, starting a new
+    # cycle through it (the questions being marked stay set). Read-modify-write: call it in a
+    # transaction that already holds the write lock (BEGIN IMMEDIATE), or overlapping submits lose bits.
+    bits = load_bits(conn, user_id, category)
+    if reset_round is not None:
+        for (slot,) in conn.execute("SELECT slot FROM questions WHERE category=? AND round=? AND slot IS NOT NULL",
+                                    (category, reset_round)):
+            if slot >> 3 < len(bits): bits[slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+    ids = list(question_ids)
+    if ids:
+        for (slot,) in conn.execute(f"SELECT slot FROM questions WHERE id IN ({','.join('?' * len(ids))}) "
+                                    "AND category=? AND slot IS NOT NULL", ids + [category]):
+            if slot >> 3 >= len(bits): bits.extend(bytes((slot >> 3) + 1 - len(bits)))
+            bits[slot >> 3] |= 1 << (slot & 7)
+    conn.execute("INSERT OR REPLACE INTO seen_questions (user_id, category, bits) VALUES (?,?,?)",
+                 (user_id, category, bytes(bits)))
+
@@ -0,0 +1,317 @@
+# server.py
+# Multi-client quiz server: a small HTTP/1.1 + JSON front end (asyncio, stdlib only) over the
+# same QuizEngine the desktop app uses, so many lab seats can share one database.
+# The event loop only parses requests and routes them. Every engine/database call runs on a
+# fixed-size thread pool. When more than `queue` calls are waiting, new requests get a
+# 503 right away instead of piling up. Quiz sessions live in memory between start-round and
+# submit. The first page of each scoreboard view is cached for CACHE_TTL seconds and dropped
+# on every submit.
+# Run: python server.py [--host 127.0.0.1] [--port 8765] [--db quiz_app_colored.db] [--workers 8]
+#
+# API (JSON bodies; authenticated calls send "Authorization: Bearer <token>"):
+#   POST /api/login         {ident, password}                     -> {token, user}
+#   POST /api/register      {username, email, password, age, gender} -> {category}
+#   POST /api/rounds        {category, round}                     -> {attempt, questions}   (auth)
+#   POST /api/submit        {attempt, answers, time_spent}        -> {score, total}         (auth)
+#   GET  /api/scores?view=all|mine|best&category=..&after=<json>  -> {rows, cursor}         (auth for mine)
+#   GET  /api/scores/version                                      -> {version}
+#   POST /api/scores/clear                                        -> {cleared}              (auth)
+#   GET  /api/health                                              -> {ok, pending, sessions}
+import argparse
+import asyncio
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs, urlsplit
+
+from quiz_db import DB, Repository
+from quiz_engine import AuthError, QuizEngine, QuizError, RateLimitError, RegistrationError
+
+CACHE_TTL = 2.0
+MAX_BODY = 1 << 20
+MAX_TOKENS = 10000
+MAX_SESSIONS = 10000
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 409: "Conflict",
+           413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TTLCache:
+    # Tiny cache for hot read-only results; only touched from the event loop thread.
+    def __init__(self, ttl, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+
+    def get(self, key):
+        hit = self.items.get(key)
+        if hit is None or hit[0] < time.monotonic():
+            return None
+        return hit[1]
+
+    def put(self, key, value):
+        self.items[key] = (time.monotonic() + self.ttl, value)
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+
+def _public(q):
+    # What a client may see of a question: never the answer.
+    return {k: q[k] for k in ('id', 'q', 'options', 'category', 'round', 'difficulty')}
+
+
+class QuizServer:
+    def __init__(self, repo, host="127.0.0.1", port=8765, workers=8, queue=256):
+        self.repo = repo
+        self.engine = QuizEngine(repo)
+        self.host, self.port = host, port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiz-db")
+        self.max_pending = workers + queue
+        self.pending = 0
+        self.tokens = OrderedDict()     # token -> user dict
+        self.sessions = OrderedDict()   # attempt key -> QuizSession
+        self.cache = TTLCache(CACHE_TTL)
+        self.routes = {
+            ("POST", "/api/login"): self.login,
+            ("POST", "/api/register"): self.register,
+            ("POST", "/api/rounds"): self.start_round,
+            ("POST", "/api/submit"): self.submit,
+            ("GET", "/api/scores"): self.scores,
+            ("GET", "/api/scores/version"): self.board_version,
+            ("POST", "/api/scores/clear"): self.clear_scores,
+            ("GET", "/api/health"): self.health,
+        }
+        self.server = None
+        self.clients = set()            # writers of open connections
+        self._loop = None
+        self._thread = None
+
+    # ---- plumbing ----
+    async def db(self, fn, *args, **kwargs):
+        # Run blocking engine/DB work on the bounded pool.
+        if self.pending >= self.max_pending:
+            raise HTTPError(503, "server busy, try again")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, partial(fn, *args, **kwargs))
+        finally:
+            self.pending -= 1
+
+    def user_for(self, headers):
+        auth = headers.get("authorization", "")
+        user = self.tokens.get(auth[7:]) if auth.startswith("Bearer ") else None
+        if user is None:
+            raise HTTPError(401, "Please log in.")
+        return user
+
+    @staticmethod
+    def _remember(table, key, value, cap):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > cap:
+            table.popitem(last=False)
+
+    async def handle(self, reader, writer):
+        # One connection; HTTP/1.1 keep-alive, requests answered in order.
+        self.clients.add(writer)
+        peer = (writer.get_extra_info("peername") or ("?",))[0]
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length") or 0)
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if length > MAX_BODY:
+                    status, payload, keep = 413, {"error": "request too large"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target, headers, body, peer)
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n"
+                             .encode() + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def dispatch(self, method, target, headers, body, peer=None):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            return 404, {"error": f"no route for {method} {url.path}"}
+        try:
+            data = json.loads(body) if body else {}
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            return 200, await handler(data, query, headers, peer)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except RateLimitError as e:
+            return 429, {"error": str(e)}
+        except AuthError as e:
+            return 401, {"error": str(e)}
+        except RegistrationError as e:
+            return 409, {"error": str(e)}
+        except QuizError as e:
+            return 400, {"error": str(e)}
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"bad request: {e}"}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    # ---- endpoints ----
+    async def login(self, data, query, headers, peer):
+        user = await self.db(self.engine.login, data.get("ident"), data.get("password"), client=peer)
+        token = secrets.token_urlsafe(24)
+        self._remember(self.tokens, token, user, MAX_TOKENS)
+        return {"token": token, "user": user}
+
+    async def register(self, data, query, headers, peer):
+        cat = await self.db(self.engine.register, data.get("username"), data.get("email"), data.get("password"),
+                            int(data.get("age") or 0), data.get("gender"))
+        return {"category": cat}
+
+    async def start_round(self, data, query, headers, peer):
+        user = self.user_for(headers)
+        session = await self.db(self.engine.start_round, user, data["category"], int(data["round"]))
+        self._remember(self.sessions, session.attempt_key, session, MAX_SESSIONS)
+        return {"attempt": session.attempt_key, "questions": [_public(q) for q in session.questions]}
+
+    async def submit(self, data, query, headers, peer):
+        user = self.user_for(headers)
+        session = self.sessions.get(data.get("attempt"))
+        if session is None or session.user['id'] != user['id']:
+            raise HTTPError(404, "Unknown or expired quiz; start a new round.")
+        del self.sessions[session.attempt_key]  # a second submit of the same attempt gets a 404
+        answers = data.get("answers") or []
+        spent = data.get("time_spent") or []
+        if len(answers) != len(session.questions):
+            raise HTTPError(400, "answers must have one entry per question")
+        def finish():
+            for i, t in enumerate(spent[:len(session.time_spent)]):
+                session.time_spent[i] = max(0.0, float(t))
+            for i, a in enumerate(answers):
+                session.answer(i, a)
+            return self.engine.submit(session)
+        try:
+            score, total = await self.db(finish)
+        except Exception:
+            self.sessions[session.attempt_key] = session  # let the client retry
+            raise
+        self.cache.clear()
+        return {"score": score, "total": total}
+
+    async def scores(self, data, query, headers, peer):
+        view = query.get("view", "all")
+        after = json.loads(query["after"]) if query.get("after") else None
+        user = self.user_for(headers) if view == "mine" else None
+        key = (view, query.get("category"))
+        if after is None and view != "mine":
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        rows, cursor = await self.db(self.engine.scores, view, user, query.get("category"), after)
+        page = {"rows": rows, "cursor": cursor}
+        if after is None and view != "mine":
+            self.cache.put(key, page)
+        return page
+
+    async def board_version(self, data, query, headers, peer):
+        return {"version": await self.db(self.engine.board_version)}
+
+    async def clear_scores(self, data, query, headers, peer):
+        n = await self.db(self.engine.clear_scores, self.user_for(headers))
+        self.cache.clear()
+        return {"cleared": n}
+
+    async def health(self, data, query, headers, peer):
+        return {"ok": True, "pending": self.pending, "sessions": len(self.sessions)}
+
+    # ---- lifecycle ----
+    async def start(self):
+        await self.db(self.repo.init_schema)
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"quiz server on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def start_in_thread(self):
+        # For tests and the load harness: runs the server on a private loop; returns its base URL.
+        ready = threading.Event()
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+        self._thread = threading.Thread(target=run, name="quiz-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return f"http://{self.host}:{self.port}"
+
+    def stop(self):
+        if self._loop is not None:
+            async def close():
+                self.server.close()
+                # idle keep-alive connections are parked in handle(); hanging up lets them return
+                for w in list(self.clients): w.close()
+                while self.clients: await asyncio.sleep(0.01)
+                await self.server.wait_closed()
+            asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+        self.executor.shutdown(wait=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--db", default=DB)
+    ap.add_argument("--workers", type=int, default=8, help="DB worker threads (and pooled connections)")
+    ap.add_argument("--queue", type=int, default=256, help="requests allowed to wait for a worker before 503s")
+    args = ap.parse_args(argv)
+    repo = Repository(args.db, pool_size=args.workers, question_cache=50000)
+    server = QuizServer(repo, args.host, args.port, workers=args.workers, queue=args.queue)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=True)
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
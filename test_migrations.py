@@ -0,0 +1,91 @@
+# test_migrations.py
+# An interrupted v1 -> v2 upgrade must finish on the next run (Repository.init_schema() retries
+# it on every start). Run: python -m unittest test_migrations
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import migrations
+from quiz_db import Repository
+
+USERS, SCORES = 30, 200
+
+
+def build_v1(path):
+    # The original layout, as the first release created it.
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, email TEXT UNIQUE,
+                    password_hash TEXT, age INTEGER, gender TEXT, category TEXT, created_at TEXT)""")
+    conn.execute("""CREATE TABLE scores (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, score INTEGER,
+                    total INTEGER, category TEXT, timestamp TEXT, FOREIGN KEY(user_id) REFERENCES users(id))""")
+    conn.executemany("INSERT INTO users (username, email, password_hash, age, gender, category, created_at) "
+                     "VALUES (?,?,'x',25,'Other','Adults','2024-01-01T10:00:00')",
+                     [(f"user{i}", f"user{i}@example.com") for i in range(USERS)])
+    conn.executemany("INSERT INTO scores (user_id, score, total, category, timestamp) "
+                     "VALUES (?,?,10,'Adults','2024-01-02T10:00:00')",
+                     [(i % USERS + 1, i % 11) for i in range(SCORES)])
+    conn.commit()
+    conn.close()
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptedUpgradeTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "quiz.db")
+        build_v1(self.path)
+        self.repo = Repository(self.path)
+
+    def tearDown(self):
+        self.repo.close()
+        self.dir.cleanup()
+
+    def assert_finished(self, scores=SCORES):
+        with self.repo.pool.connection() as conn:
+            self.assertEqual(migrations.version(conn), migrations.LATEST)
+            self.assertIn("category_id", migrations._columns(conn, "scores"))
+            self.assertIn("created", migrations._columns(conn, "users"))
+            self.assertEqual(conn.execute("SELECT count(*) FROM users").fetchone()[0], USERS)
+            self.assertEqual(conn.execute("SELECT count(*) FROM scores").fetchone()[0], scores)
+            leftovers = conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%\\_new' ESCAPE '\\' "
+                                     "OR name LIKE 'mig\\_%' ESCAPE '\\'").fetchall()
+            self.assertEqual(leftovers, [])
+            self.assertEqual(conn.execute("SELECT count(*) FROM migration_state").fetchone()[0], 0)
+        self.repo.init_schema()  # what the app does on start
+
+    def test_rerun_after_stop_between_tables(self):
+        copy = migrations.copy_online
+        def stop_before_scores(conn, table, *args, **kwargs):
+            if table == "scores":
+                raise Interrupted
+            return copy(conn, table, *args, **kwargs)
+        migrations.copy_online = stop_before_scores
+        try:
+            with self.assertRaises(Interrupted):
+                migrations.upgrade(self.repo, chunk=50)
+        finally:
+            migrations.copy_online = copy
+        self.assertEqual(migrations.upgrade(self.repo, chunk=50), ["integer timestamps, category ids, foreign keys"])
+        self.assert_finished()
+
+    def test_rerun_after_stop_mid_table(self):
+        def stop_in_scores(table, done, total):
+            if table == "scores":
+                raise Interrupted
+        with self.assertRaises(Interrupted):
+            migrations.upgrade(self.repo, chunk=50, progress=stop_in_scores)
+        # the app keeps writing to the old table in between; the sync triggers carry it over
+        with self.repo.pool.connection() as conn:
+            conn.execute("INSERT INTO scores (user_id, score, total, category, timestamp) "
+                         "VALUES (1, 7, 10, 'Adults', '2024-01-03T10:00:00')")
+            conn.commit()
+        migrations.upgrade(self.repo, chunk=50)
+        self.assert_finished(scores=SCORES + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
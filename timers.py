@@ -0,0 +1,110 @@
+# timers.py
+# Deadline timers driven by one scheduler chain.
+# A timer stores its deadline on the time.monotonic() clock rather than counting ticks, so a
+# busy Tk loop makes an update late but never makes the quiz longer: the next wake-up reads the
+# clock again. All timers share one after() chain on the scheduler (any object with Tk's
+# after/after_cancel, e.g. the QuizApp root), which sleeps exactly until the next deadline or
+# the next whole second a visible countdown has to redraw.
+# Cancelled timers are dropped from the active set and every callback checks `active` first, so
+# once cancel() returns that timer can't fire, even if its wake-up is already queued.
+import math
+import time
+
+
+class Timer:
+    __slots__ = ("service", "deadline", "period", "on_expire", "on_tick", "active", "shown")
+
+    def __init__(self, service, deadline, period, on_expire, on_tick):
+        self.service = service
+        self.deadline = deadline
+        self.period = period          # seconds between firings for repeating timers, else None
+        self.on_expire = on_expire
+        self.on_tick = on_tick        # on_tick(seconds_left) whenever the whole-second count changes
+        self.active = True
+        self.shown = None
+
+    def remaining(self):
+        return max(0.0, self.deadline - self.service.clock()) if self.active else 0.0
+
+    def seconds_left(self):
+        # what a countdown label shows: 2.3 s left is "3"
+        return math.ceil(self.remaining())
+
+    def cancel(self):
+        self.service.cancel(self)
+
+
+class TimerService:
+    def __init__(self, scheduler, clock=time.monotonic, max_sleep_ms=1000):
+        self.scheduler = scheduler
+        self.clock = clock
+        self.max_sleep_ms = max_sleep_ms
+        self.timers = []
+        self._wake_id = None
+        self._wake_at = None
+
+    def start(self, seconds, on_expire, on_tick=None):
+        # One-shot: on_expire() once `seconds` have passed on the monotonic clock.
+        return self._add(Timer(self, self.clock() + seconds, None, on_expire, on_tick))
+
+    def every(self, seconds, fn):
+        # Repeating: fn() every `seconds`; deadlines advance by the period, so they don't drift.
+        # Periods missed while the loop was blocked are skipped, not fired in a burst.
+        return self._add(Timer(self, self.clock() + seconds, seconds, fn, None))
+
+    def cancel(self, timer):
+        if timer is None or not timer.active:
+            return
+        timer.active = False
+        self.timers.remove(timer)
+        if not self.timers and self._wake_id is not None:
+            self.scheduler.after_cancel(self._wake_id)
+            self._wake_id = self._wake_at = None
+
+    def _add(self, timer):
+        self.timers.append(timer)
+        if timer.on_tick:
+            timer.shown = timer.seconds_left()
+            timer.on_tick(timer.shown)
+        self._schedule()
+        return timer
+
+    def _next_event(self, now):
+        due = now + self.max_sleep_ms / 1000
+        for t in self.timers:
+            due = min(due, t.deadline)
+            if t.on_tick:
+                # the moment the displayed whole-second count drops next
+                due = min(due, t.deadline - (math.ceil(t.deadline - now) - 1))
+        return due
+
+    def _schedule(self):
+        if not self.timers:
+            return
+        now = self.clock()
+        due = self._next_event(now)
+        if self._wake_id is not None:
+            if self._wake_at <= due:
+                return  # the pending wake-up comes first anyway
+            self.scheduler.after_cancel(self._wake_id)
+        self._wake_at = due
+        self._wake_id = self.scheduler.after(max(1, math.ceil((due - now) * 1000)), self._run)
+
+    def _run(self):
+        self._wake_id = self._wake_at = None
+        now = self.clock()
+        for t in list(self.timers):
+            if not t.active:
+                continue  # cancelled by an earlier callback in this pass
+            if t.deadline <= now:
+                if t.period is None:
+                    self.cancel(t)
+                else:
+                    t.deadline += t.period * (int((now - t.deadline) // t.period) + 1)
+                t.on_expire()
+            elif t.on_tick:
+                left = t.seconds_left()
+                if left != t.shown:
+                    t.shown = left
+                    t.on_tick(left)
+        self._schedule()